@@ -1,36 +1,144 @@
-import os
 import time
 import random
-from collections import Counter
+from collections import OrderedDict, namedtuple
+
+from eventos import (
+    ACUMULACION,
+    ADNA,
+    ESTRATEGIA,
+    GANADOR,
+    INICIO,
+    JUGADA,
+    JUGADA_BOT,
+    MEZCLA,
+    NO_PUEDE,
+    PENALIDAD,
+    PENALIDAD_ADNA,
+    POZO_INICIAL,
+    REVERSA,
+    SALTA,
+    SIN_CARTAS,
+    TOMA,
+    TURNO,
+    VUELTA,
+    SalidaNula,
+    SalidaTerminal,
+)
+from pantalla import PantallaTexto, elegir_pantalla
+from reglamento import EFECTO_REVERSA, EFECTO_SALTA, EFECTO_TOMA, reglamento_activo
+
+# las reglas (colores, valores, copias de cada carta, mano, penalidades)
+# salen del reglamento, que ya viene compilado en tablas (ver reglamento.py)
+REGLAMENTO = reglamento_activo()
 
+# colores y tipos de cartas
+COLORES = REGLAMENTO.colores
+VALORES_NUMERICOS = REGLAMENTO.numeros  # Del 1 al 9
+TIPOS_ACCION = [accion["nombre"] for accion in REGLAMENTO.acciones]
+VALORES = REGLAMENTO.valores
+
+# cada combinación (color, valor) tiene un código chico: color * 13 + valor,
+# o sea 4 x 13 = 52 códigos con las reglas de siempre. Con eso las validaciones son lookups en tablas
+CODIGOS = REGLAMENTO.codigos
+CANTIDAD_CODIGOS = REGLAMENTO.cantidad_codigos
+COLOR_CODIGO = REGLAMENTO.color_codigo  # índice = código
+IDX_COLOR_CODIGO = REGLAMENTO.idx_color_codigo
+RANGO_COLORES = range(len(COLORES))
+VALOR_CODIGO = REGLAMENTO.valor_codigo
+ES_ACCION_CODIGO = REGLAMENTO.es_accion_codigo
+ES_TOMA_CODIGO = REGLAMENTO.es_toma_codigo
+# qué hace cada código al jugarlo (EFECTO_*) y cuántas cartas suma si es toma
+EFECTO_CODIGO = REGLAMENTO.efecto_codigo
+TOMA_CODIGO = REGLAMENTO.toma_codigo
+
+# JUGABLES[tope] tiene prendidos los códigos que se pueden jugar sobre ese tope:
+# mismo color, o mismo valor (un número nunca es igual a una acción)
+JUGABLES = REGLAMENTO.jugables
+# ACUMULABLES[tope]: cartas de acción del mismo valor que el tope (para acumular)
+ACUMULABLES = REGLAMENTO.acumulables
+MASCARA_ACCIONES = REGLAMENTO.mascara_acciones
+# MISMO_COLOR[codigo]: todos los códigos de su color
+MISMO_COLOR = REGLAMENTO.mismo_color
+MASCARA_COLOR = [MISMO_COLOR[i * len(VALORES)] for i in RANGO_COLORES]  # por color
+MASCARA_TOMAS = sum(1 << codigo for codigo, toma in enumerate(ES_TOMA_CODIGO) if toma)
+TODOS_LOS_CODIGOS = (1 << CANTIDAD_CODIGOS) - 1
+
+CARTAS_MANO = REGLAMENTO.cartas_mano  # las que se reparten al empezar
+CARTAS_PENALIDAD_ADNA = REGLAMENTO.penalidad_adna
+
+
+def primer_codigo(mascara):
+    # el código más chico de la máscara (bit prendido más bajo)
+    return (mascara & -mascara).bit_length() - 1
+
+
+def codigos_de(mascara):
+    # recorre los códigos prendidos de menor a mayor
+    while mascara:
+        bajo = mascara & -mascara
+        yield bajo.bit_length() - 1
+        mascara ^= bajo
+
+
+# un mazo alcanza para esta cantidad de jugadores; en mesas más grandes se
+# juntan varios mazos
+JUGADORES_POR_MAZO = REGLAMENTO.jugadores_por_mazo
+
+
+def cantidad_mazos(jugadores):
+    return max(1, -(-jugadores // JUGADORES_POR_MAZO))
+
+
+def nombres_asientos(cantidad):
+    """
+    Nombres de los asientos en orden: A, B, C... y después A2, B2...
+    """
+    letras = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [
+        letras[i % len(letras)]
+        + (str(i // len(letras) + 1) if i >= len(letras) else "")
+        for i in range(cantidad)
+    ]
 
-# limpio la pantalla
-def clear_screen():
-    if os.name == "nt":
-        os.system("cls")
-    else:
-        os.system("clear")
 
+# tope de turnos para las partidas headless, por si nadie puede cerrar el juego
+MAX_TURNOS_SIMULACION = 10_000
 
-# colores y tipos de cartas
-COLORES = ["marrón", "naranja", "rosa", "violeta"]
-VALORES_NUMERICOS = list(range(1, 10))  # Del 1 al 9
-TIPOS_ACCION = [
-    "Toma 2",
-    "Reversa",
-    "Salta",
-    "Toma 4",
-]
+# resultado de una partida terminada (ganador es None si no ganó nadie)
+ResultadoPartida = namedtuple(
+    "ResultadoPartida", ["ganador", "ganador_idx", "turnos", "mezclas"]
+)
 
 
 class Carta:
     """
     Representa una carta individual del juego.
+    Hay una sola instancia por (color, valor): Carta(color, valor) devuelve
+    siempre la misma, así todos los mazos de todas las partidas comparten
+    las 52 cartas. Por eso no se pueden modificar.
     """
 
-    def __init__(self, color, valor):
-        self.color = color
-        self.valor = valor  # Puede ser un número (1-9) o un tipo de acción
+    __slots__ = ("color", "valor", "codigo")
+    _internadas = {}  # código -> la carta
+
+    def __new__(cls, color, valor):
+        codigo = CODIGOS[(color, valor)]  # para las tablas de validación
+        carta = cls._internadas.get(codigo)
+        if carta is None:
+            carta = super().__new__(cls)
+            object.__setattr__(carta, "color", color)
+            # Puede ser un número (1-9) o un tipo de acción
+            object.__setattr__(carta, "valor", valor)
+            object.__setattr__(carta, "codigo", codigo)
+            cls._internadas[codigo] = carta
+        return carta
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Las cartas no se modifican (son compartidas)")
+
+    def __reduce__(self):
+        # al deserializar vuelve a la instancia compartida
+        return (Carta, (self.color, self.valor))
 
     def __str__(self):
         # Dice valor y color
@@ -38,11 +146,34 @@ class Carta:
 
     def es_accion(self):
         # chequea si el valor está en los tipos de acción
-        return self.valor in TIPOS_ACCION
+        return ES_ACCION_CODIGO[self.codigo]
 
     def es_numerica(self):
-        # isinstance valida el tipo de valor de la variable
-        return isinstance(self.valor, int)
+        return not ES_ACCION_CODIGO[self.codigo]
+
+
+# una carta de cada código, para cuando solo se tiene el código
+# (el estado compacto de las búsquedas trabaja con códigos)
+CARTAS_CODIGO = [Carta(color, valor) for color, valor in CODIGOS]
+
+
+def armar_mazo_base():
+    """
+    Las cartas de un mazo según el reglamento, en orden (con las reglas de
+    siempre, 100: por color los números dos veces, 2 Toma 2, 2 Reversa,
+    2 Salta y 1 Toma 4)
+    """
+    return [CARTAS_CODIGO[codigo] for codigo in REGLAMENTO.mazo_base]
+
+
+# se arma una vez: los mazos se llenan copiando de acá
+MAZO_BASE = armar_mazo_base()
+CARTAS_POR_MAZO = len(MAZO_BASE)
+
+
+def _poner_en_cero(conteos):
+    # en el lugar, sin crear otra lista
+    conteos[:] = bytes(len(conteos))
 
 
 class Mazo:
@@ -50,43 +181,59 @@ class Mazo:
     Representa el Mazo y el Pozo.
     """
 
-    def __init__(self):
+    def __init__(self, headless=False, rng=None, eventos=None, mazos=1):
         self.cartas = []
+        self.mazos = mazos  # cuántos mazos (de 100 cartas) se juntan
         self.pozo = []
+        # en modo headless no se imprime nada (simulaciones)
+        self.headless = headless
+        # a dónde van los mensajes de la partida (ver eventos.py)
+        if eventos is None:
+            eventos = SalidaNula() if headless else SalidaTerminal()
+        self.eventos = eventos
+        # generador para mezclar, por defecto el random global
+        # (los torneos pasan un random.Random propio para poder reproducir)
+        self.rng = rng if rng is not None else random
+        # cuántas veces se regeneró el mazo a partir del pozo
+        self.mezclas = 0
+        # conteos del pozo que se mantienen al agregar/regenerar,
+        # para que los bots no tengan que recorrer todo el pozo
+        self._pozo_colores = [0] * len(COLORES)
+        self._pozo_valores = [0] * len(VALORES)
+        self._pozo_codigos = [0] * CANTIDAD_CODIGOS
+        # cartas que pasaron por el pozo en toda la partida (no se reinicia)
+        self._vistas = [0] * CANTIDAD_CODIGOS
+        self._total_vistas = 0
         self.crear_mazo()
         self.mezclar()
 
     def crear_mazo(self):
         """
-        Crea el mazo de 100 cartas según las reglas
+        Llena el mazo con las cartas de MAZO_BASE (una vez por cada mazo).
+        Las cartas son las compartidas y la lista se reusa, no se crea nada.
         """
-        self.cartas = []
-
-        for color in COLORES:
-            # 72 cartas numéricas
-            for valor in VALORES_NUMERICOS:
-                self.cartas.append(Carta(color, valor))
-                self.cartas.append(Carta(color, valor))
+        self.cartas.clear()
+        for _ in range(self.mazos):
+            self.cartas.extend(MAZO_BASE)
 
-            # 28 cartas de acción
-            # 8 "Toma Dos"
-            self.cartas.append(Carta(color, "Toma 2"))
-            self.cartas.append(Carta(color, "Toma 2"))
-
-            # 8 "Reversa"
-            self.cartas.append(Carta(color, "Reversa"))
-            self.cartas.append(Carta(color, "Reversa"))
-
-            # 8 "Salta"
-            self.cartas.append(Carta(color, "Salta"))
-            self.cartas.append(Carta(color, "Salta"))
-
-            # 4 "Toma Cuatro"
-            self.cartas.append(Carta(color, "Toma 4"))
+    def reiniciar(self):
+        """
+        Deja el mazo como recién creado y mezclado para otra partida,
+        reusando sus listas
+        """
+        self.pozo.clear()
+        self.mezclas = 0
+        _poner_en_cero(self._pozo_colores)
+        _poner_en_cero(self._pozo_valores)
+        _poner_en_cero(self._pozo_codigos)
+        _poner_en_cero(self._vistas)
+        self._total_vistas = 0
+        self.crear_mazo()
+        self.mezclar()
 
     def mezclar(self):
-        # usa random.shuffle que mezcla la lista en el lugar
-        random.shuffle(self.cartas)
+        # usa shuffle que mezcla la lista en el lugar
+        self.rng.shuffle(self.cartas)
 
     def sacar_carta(self):
         """
@@ -94,12 +241,12 @@ class Mazo:
         Maneja el coso de cuando el mazo se termina y comienza de nuevo
         """
         if not self.cartas:
-            print("Mezclando el pozo...")
+            self.eventos.emitir(MEZCLA)
             self.regenerar_mazo()
 
             # no hay cartas ni en el pozo para regenerar
             if not self.cartas:
-                print("no hay más cartas en juego! no ganó nadie...")
+                self.eventos.emitir(SIN_CARTAS)
                 return None
 
         return self.cartas.pop()
@@ -110,10 +257,18 @@ class Mazo:
         """
         # La carta superior del pozo se queda
         carta_tope = self.pozo.pop()
-        self.cartas = self.pozo
+        # el pozo pasa a ser el mazo y la lista del mazo (vacía) el pozo
+        self.cartas, self.pozo = self.pozo, self.cartas
 
         # renuevo el pozo con la carta topa
-        self.pozo = [carta_tope]
+        self.pozo.append(carta_tope)
+        self.mezclas += 1
+
+        # el pozo queda con una sola carta, reinicio los conteos
+        _poner_en_cero(self._pozo_colores)
+        _poner_en_cero(self._pozo_valores)
+        _poner_en_cero(self._pozo_codigos)
+        self._contar_en_pozo(carta_tope.codigo)
 
         # mezclo el nuevo mazo
         self.mezclar()
@@ -124,18 +279,138 @@ class Mazo:
         """
         carta = self.sacar_carta()
         while carta.es_accion():
-            print(f"Salió una carta de acción ({carta}). Agarrando la siguiente...")
-            self.pozo.append(carta)  # Se pone en el pozo igualmente
+            self.eventos.emitir(VUELTA, carta=carta)
+            self.agregar_al_pozo(carta)  # Se pone en el pozo igualmente
             carta = self.sacar_carta()
 
-        self.pozo.append(carta)
-        print(f"El pozo inicia con: {self.ver_tope_pozo()}")
+        self.agregar_al_pozo(carta)
+        self.eventos.emitir(POZO_INICIAL, carta=carta)
 
     def ver_tope_pozo(self):
         return self.pozo[-1] if self.pozo else None
 
     def agregar_al_pozo(self, carta):
         self.pozo.append(carta)
+        self._contar_en_pozo(carta.codigo)
+        self._vistas[carta.codigo] += 1
+        self._total_vistas += 1
+
+    def _contar_en_pozo(self, codigo):
+        self._pozo_colores[IDX_COLOR_CODIGO[codigo]] += 1
+        self._pozo_valores[codigo % len(VALORES)] += 1
+        self._pozo_codigos[codigo] += 1
+
+    # --- consultas O(1) sobre el pozo (solo lectura) ---
+
+    def cantidad_color_pozo(self, idx_color):
+        return self._pozo_colores[idx_color]
+
+    def colores_pozo(self):
+        """
+        Las cantidades de cantidad_color_pozo de todos los colores (no modificar)
+        """
+        return self._pozo_colores
+
+    def cantidad_valor_pozo(self, idx_valor):
+        return self._pozo_valores[idx_valor]
+
+    def cantidad_codigo_pozo(self, codigo):
+        return self._pozo_codigos[codigo]
+
+    def cantidad_vistas(self, codigo):
+        """
+        Cuántas cartas de ese código se jugaron al pozo en toda la partida
+        """
+        return self._vistas[codigo]
+
+    def total_vistas(self):
+        return self._total_vistas
+
+    def vistas(self):
+        """
+        Las cantidades de cantidad_vistas de todos los códigos (no modificar)
+        """
+        return self._vistas
+
+
+class Mano:
+    """
+    Cartas de un jugador agrupadas por código.
+    Lleva la cantidad de cada código, por color y una máscara con los códigos
+    presentes, así "qué puedo jugar sobre este tope" y "sacar una carta de
+    tal código" no dependen del tamaño de la mano.
+    Se recorre ordenada por código (color y después valor).
+    """
+
+    __slots__ = ("cartas", "conteo", "conteo_colores", "presentes", "cantidad")
+
+    def __init__(self):
+        self.cartas = [[] for _ in range(CANTIDAD_CODIGOS)]  # por código
+        self.conteo = [0] * CANTIDAD_CODIGOS
+        self.conteo_colores = [0] * len(COLORES)
+        self.presentes = 0  # bit k prendido si tengo alguna carta de código k
+        self.cantidad = 0
+
+    def agregar(self, carta):
+        codigo = carta.codigo
+        self.cartas[codigo].append(carta)
+        self.conteo[codigo] += 1
+        self.conteo_colores[IDX_COLOR_CODIGO[codigo]] += 1
+        self.presentes |= 1 << codigo
+        self.cantidad += 1
+
+    def sacar_codigo(self, codigo):
+        """
+        Saca una carta del código pedido (tiene que haber)
+        """
+        carta = self.cartas[codigo].pop()
+        self.conteo[codigo] -= 1
+        self.conteo_colores[IDX_COLOR_CODIGO[codigo]] -= 1
+        if not self.conteo[codigo]:
+            self.presentes &= ~(1 << codigo)
+        self.cantidad -= 1
+        return carta
+
+    def ver_codigo(self, codigo):
+        return self.cartas[codigo][-1]
+
+    def vaciar(self):
+        """
+        Deja la mano sin cartas reusando sus listas
+        """
+        for codigo in codigos_de(self.presentes):
+            self.cartas[codigo].clear()
+            self.conteo[codigo] = 0
+        _poner_en_cero(self.conteo_colores)
+        self.presentes = 0
+        self.cantidad = 0
+
+    def jugables(self, codigo_tope):
+        """
+        Máscara de los códigos de la mano que se pueden jugar sobre el tope
+        """
+        return self.presentes & JUGABLES[codigo_tope]
+
+    def pop(self, idx):
+        # por posición, como se la muestra a los humanos
+        return self.sacar_codigo(self[idx].codigo)
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self.cantidad
+        if not 0 <= idx < self.cantidad:
+            raise IndexError("no hay carta en esa posición")
+        for codigo in codigos_de(self.presentes):
+            if idx < self.conteo[codigo]:
+                return self.cartas[codigo][idx]
+            idx -= self.conteo[codigo]
+
+    def __iter__(self):
+        for codigo in codigos_de(self.presentes):
+            yield from self.cartas[codigo]
+
+    def __len__(self):
+        return self.cantidad
 
 
 class Jugador:
@@ -145,15 +420,23 @@ class Jugador:
 
     def __init__(self, nombre):
         self.nombre = nombre
-        self.mano = []
+        self.mano = Mano()
+        self.dijo_adna = False
+
+    def reiniciar(self):
+        """
+        Listo para otra partida (mano vacía, sin Adná)
+        """
+        self.mano.vaciar()
         self.dijo_adna = False
 
     def tomar_cartas_del_mazo(self, mazo, cantidad=1):
-        print(f"{self.nombre} toma {cantidad} carta(s).")
+        if mazo.eventos.activa:
+            mazo.eventos.emitir(TOMA, jugador=self.nombre, cantidad=cantidad)
         for i in range(cantidad):
             carta = mazo.sacar_carta()
             if carta:
-                self.mano.append(carta)
+                self.mano.agregar(carta)
             else:
                 break
         self.dijo_adna = False  # Si agarra cartas, no va a tener adná
@@ -164,7 +447,18 @@ class Jugador:
         """
         carta = self.mano.pop(carta_idx)
         mazo.agregar_al_pozo(carta)
-        print(f"{self.nombre} juega: {carta}")
+        if mazo.eventos.activa:
+            mazo.eventos.emitir(JUGADA, jugador=self.nombre, carta=carta)
+
+    def jugar_codigo(self, codigo, mazo):
+        """
+        Igual que jugar_carta pero eligiendo por código (lo usan los bots)
+        """
+        carta = self.mano.sacar_codigo(codigo)
+        mazo.agregar_al_pozo(carta)
+        if mazo.eventos.activa:
+            mazo.eventos.emitir(JUGADA, jugador=self.nombre, carta=carta)
+        return carta
 
     def decir_adna(self):
         print(f"Adná!")
@@ -200,8 +494,7 @@ class JugadorHumano(Jugador):
         """
         Lógica para que el humano elija qué hacer
         """
-        self.mostrar_mano()
-        print(f"Tope del pozo: {juego.mazo.ver_tope_pozo()}")
+        juego.pantalla.mostrar_mano(self, juego)
 
         if juego.mazo.ver_tope_pozo().valor in TIPOS_ACCION and juego.accion_pendiente:
             # chequeo si el jugador tiene cartas de acción para continuar la acumulación
@@ -271,308 +564,651 @@ class JugadorHumano(Jugador):
                 return None
 
 
-class JugadorBotB(Jugador):
-    def __init__(self, nombre):
-        super().__init__(nombre)
-        self.es_humano = False
+class CacheDecisiones:
+    """
+    LRU acotado de jugadas de un bot heurístico: clave -> código a jugar.
+    Cada bot arma la clave con exactamente lo que mira su elegir(), así dos
+    situaciones con la misma clave tienen la misma jugada y el resultado de
+    las partidas no cambia. Cuenta aciertos y fallos para ver si conviene.
+    Es de una clase de bot: no se comparte entre B y D.
+    """
 
-    def jugar(self, juego):
-        """
-        Estrategia "Agresiva":
-        1. Prioriza "atacar" jugando cartas de acción
-            a. Responde a carta de ataque
-            b. Jugar cartas de "Toma" (Toma Cuatro, Toma Dos)
-            c. Jugar "Salta" o "Reversa"
-        2. Jugar numéricas, intentando cambiar a un color que C "no tenga". Usando el Pozo para inferir qué colores son "raros"
-        """
-
-        carta_pozo = juego.mazo.ver_tope_pozo()
-        pozo_completo = juego.mazo.pozo
-        jugadas_validas = []
-        for carta in self.mano:
-            if juego.es_jugada_valida(carta, carta_pozo):
-                jugadas_validas.append(carta)
-
-        # donde guardo las acumulaciones
-        acumulables = []
-        # donde voy a guardar las cartas de acción en el orden deseado
-        accion = []
-        # guardo las numéricas para el SINO
-        numericas = []
-
-        carta_a_jugar = None
-
-        # Clasificar las cartas jugables
-        for carta in jugadas_validas:
-            # 1. Prioridad Acumular
-            if carta.valor == juego.mazo.ver_tope_pozo().valor and carta.es_accion():
-                acumulables.append(carta)
-            # 2. Prioridad Cartas de Toma
-            elif carta.valor == "Toma 4":
-                accion.append(carta)
-            elif carta.valor == "Toma 2":
-                accion.append(carta)
-            # 3. Prioridad Salta/Reversa
-            elif carta.valor in ["Salta", "Reversa"]:
-                accion.append(carta)
-            # 4. Cartas numéricas
-            elif carta.es_numerica():
-                numericas.append(carta)
-
-        # --- Tomar Decisión (Orden de Prioridad) ---
-
-        if acumulables:
-            # Prioridad 1: Siempre acumular o jugar acción.
-            carta_a_jugar = acumulables[0]
-        if accion:
-            carta_a_jugar = accion[0]  # Prioridad 1: Siempre acumular o jugar acción.
-
-        elif numericas:
-            # cuenta qué colores han salido MENOS en el pozo.
-            # La estrategia es jugar uno de esos colores "raros",
-            # asumiendo que el siguiente jugador tiene menos probabilidad de tenerlo.
-            conteo_colores_pozo = Counter(c.color for c in pozo_completo)
-
-            # Ordena las cartas numéricas jugables, prefiriendo las de colores
-            # que han aparecido MENOS veces en el pozo.
-            numericas.sort(key=lambda c: conteo_colores_pozo[c.color])
-            carta_a_jugar = numericas[0]
-        elif jugadas_validas:
-            carta_a_jugar = jugadas_validas[0]
-
-        if not acumulables and juego.mazo.ver_tope_pozo().es_accion():
-            print("Bot B no puede jugar, cumple penalidad")
-            self.tomar_cartas_del_mazo(juego.mazo, juego.cartas_acumuladas)
-            juego.cartas_acumuladas = 0
-            juego.accion_pendiente = None
-        elif carta_a_jugar:
-            # Juega la carta seleccionada
-            carta_idx = self.mano.index(carta_a_jugar)
-            self.jugar_carta(carta_idx, juego.mazo)
-            print(f"Bot D: Jugando carta {carta_a_jugar}")
-            if len(self.mano) == 1:
-                print("Bot D dice Adná!")
-                self.dijo_adna = True
-            return carta_a_jugar
+    __slots__ = ("capacidad", "jugadas", "aciertos", "fallos")
+
+    def __init__(self, capacidad=1 << 16):
+        self.capacidad = capacidad
+        self.jugadas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def buscar(self, clave):
+        # None si no está (las jugadas guardadas nunca son None)
+        codigo = self.jugadas.get(clave)
+        if codigo is None:
+            self.fallos += 1
         else:
-            print(f"Bot B: no puedo hacer nada, tomo carta")
-            self.tomar_cartas_del_mazo(juego.mazo, 1)
+            self.aciertos += 1
+            self.jugadas.move_to_end(clave)
+        return codigo
+
+    def guardar(self, clave, codigo):
+        self.jugadas[clave] = codigo
+        if len(self.jugadas) > self.capacidad:
+            self.jugadas.popitem(last=False)  # la usada hace más tiempo
+
+    def tasa_aciertos(self):
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+
+# --- estrategias de los bots heurísticos ---
+# Una estrategia es una lista ordenada de reglas. Cada regla dice qué grupo
+# de cartas jugar (una función del código del tope que devuelve la máscara
+# del grupo) y con qué desempates elegir adentro del grupo. Juega la primera
+# regla que tenga algo jugable; si ninguna tiene, el bot toma.
+# Todo se pasa a tablas una sola vez, al armar la Estrategia: decidir una
+# jugada es un AND por regla y, si hace falta, una vuelta por los colores.
+
+
+def acumular(tope):
+    # las que siguen una acumulación (solo hay si el tope es una acción)
+    return ACUMULABLES[tope]
+
+
+def acciones(tope):
+    # acciones que no acumulan sobre ese tope
+    return MASCARA_ACCIONES & ~ACUMULABLES[tope]
+
+
+def numericas(tope):
+    return TODOS_LOS_CODIGOS & ~MASCARA_ACCIONES
+
+
+def tomas(tope):
+    return MASCARA_TOMAS
+
+
+def no_tomas(tope):
+    return TODOS_LOS_CODIGOS & ~MASCARA_TOMAS
+
+
+def mismo_color(tope):
+    return MISMO_COLOR[tope]
+
+
+def otro_color(tope):
+    return TODOS_LOS_CODIGOS & ~MISMO_COLOR[tope]
+
+
+def cualquiera(tope):
+    return TODOS_LOS_CODIGOS
+
+
+# de dónde salen las cantidades por color para desempatar
+MANO = 0  # cartas de cada color en la mano del bot
+POZO = 1  # cartas de cada color en el pozo
+
+# preferidas es un grupo (como los de arriba); si no, desempata por la
+# cantidad de cartas del color en fuente (MANO o POZO): signo 1 la mayor,
+# -1 la menor
+Desempate = namedtuple("Desempate", ["preferidas", "fuente", "signo"])
+
+
+def preferir(grupo):
+    return Desempate(grupo, None, 0)
+
+
+def mas(fuente):
+    return Desempate(None, fuente, 1)
+
+
+def menos(fuente):
+    return Desempate(None, fuente, -1)
+
+
+class Regla:
+    """
+    Un grupo de cartas y los desempates para elegir dentro de él, en orden;
+    si todavía empatan, el código más chico. motivo (opcional) es lo que
+    cuenta el bot cuando juega por esta regla.
+    """
+
+    def __init__(self, grupo, *desempates, motivo=None):
+        self.grupo = grupo
+        self.desempates = desempates
+        self.motivo = motivo
+
+
+def _desempatar(desempate, siguiente):
+    # un paso de desempate compilado: recibe la máscara de candidatas y se
+    # la pasa achicada a siguiente (o se queda con el código más chico)
+    if desempate.preferidas is not None:
+        tabla = [desempate.preferidas(tope) for tope in range(CANTIDAD_CODIGOS)]
+
+        def elegir(candidatas, tope, colores_mano, colores_pozo):
+            preferidas = candidatas & tabla[tope]
+            if preferidas:
+                candidatas = preferidas
+            if siguiente is None:
+                return (candidatas & -candidatas).bit_length() - 1
+            return siguiente(candidatas, tope, colores_mano, colores_pozo)
+
+        return elegir
+
+    fuente, signo = desempate.fuente, desempate.signo
+    colores = list(enumerate(MASCARA_COLOR))
+
+    if siguiente is None:
+        # la primera de las de mejor color: como los códigos van por color,
+        # es la del color mejor y de índice más chico
+        def elegir(candidatas, tope, colores_mano, colores_pozo):
+            conteo = colores_pozo if fuente else colores_mano
+            mejor = None
+            for color, mascara in colores:
+                del_color = candidatas & mascara
+                if del_color:
+                    valor = conteo[color] * signo
+                    if mejor is None or valor > mejor:
+                        mejor, elegidas = valor, del_color
+            return (elegidas & -elegidas).bit_length() - 1
+
+        return elegir
+
+    def elegir(candidatas, tope, colores_mano, colores_pozo):
+        # los colores empatados siguen juntos al próximo desempate
+        conteo = colores_pozo if fuente else colores_mano
+        mejor = None
+        for color, mascara in colores:
+            del_color = candidatas & mascara
+            if del_color:
+                valor = conteo[color] * signo
+                if mejor is None or valor > mejor:
+                    mejor, elegidas = valor, del_color
+                elif valor == mejor:
+                    elegidas |= del_color
+        return siguiente(elegidas, tope, colores_mano, colores_pozo)
+
+    return elegir
+
+
+class Estrategia:
+    """
+    Un bot heurístico escrito como lista de reglas (ver Regla). Al crearla
+    los grupos se vuelven tablas por tope y los desempates funciones, así
+    decidir() es una sola pasada por las reglas sin armar listas ni ordenar.
+
+    cumple_y_juega es la maña de D: con una acción en el tope y nada para
+    acumular cumple la penalidad y después igual juega lo que eligió (B la
+    cumple y pasa).
+    """
+
+    def __init__(self, nombre, reglas, cumple_y_juega=False):
+        self.nombre = nombre
+        self.reglas = reglas
+        self.cumple_y_juega = cumple_y_juega
+        fuentes = {d.fuente for regla in reglas for d in regla.desempates}
+        self.usa_mano = MANO in fuentes
+        self.usa_pozo = POZO in fuentes
+        self.tablas = []
+        self.elecciones = []
+        self.claves = []
+        for regla in reglas:
+            self.tablas.append([regla.grupo(tope) for tope in range(CANTIDAD_CODIGOS)])
+            elegir = None  # el código más chico
+            for desempate in reversed(regla.desempates):
+                elegir = _desempatar(desempate, elegir)
+            self.elecciones.append(elegir)
+            self.claves.append(self._clave_cache(regla))
+        self.decidir = self._compilar()
+
+    def _compilar(self):
+        reglas = list(zip(self.tablas, self.elecciones))
+
+        def decidir(jugadas_validas, codigo_tope, colores_mano, colores_pozo):
+            """
+            Código a jugar (o None) entre jugadas_validas (máscara de lo
+            jugable sobre el tope), con las cartas por color de la mano y
+            del pozo (listas, o None si la estrategia no las usa)
+            """
+            for tabla, elegir in reglas:
+                candidatas = jugadas_validas & tabla[codigo_tope]
+                if candidatas:
+                    if elegir is None:
+                        return (candidatas & -candidatas).bit_length() - 1
+                    return elegir(candidatas, codigo_tope, colores_mano, colores_pozo)
             return None
 
+        return decidir
 
-class JugadorBotD(Jugador):
-    def __init__(self, nombre):
+    @staticmethod
+    def _clave_cache(regla):
+        """
+        Cómo armar la clave de CacheDecisiones para esta regla, o None si
+        no vale la pena (sin desempates por color elegir es un par de AND)
+        """
+        por_color = [d for d in regla.desempates if d.preferidas is None]
+        if not por_color:
+            return None
+        solo_colores = len(por_color) == len(regla.desempates)
+        ultimo = regla.desempates[-1]
+        fuentes = sorted({d.fuente for d in por_color})
+
+        def clave(i, candidatas, tope, colores_mano, colores_pozo):
+            if (
+                solo_colores
+                and not candidatas & ~MISMO_COLOR[primer_codigo(candidatas)]
+            ):
+                return None  # un solo color: gana la primera, no hay qué guardar
+            if len(por_color) == 1 and ultimo.preferidas is None:
+                # lo único que importa es el orden de los colores
+                conteo = colores_pozo if ultimo.fuente else colores_mano
+                orden = sorted(
+                    RANGO_COLORES, key=conteo.__getitem__, reverse=ultimo.signo > 0
+                )
+            else:
+                orden = [
+                    cantidad
+                    for fuente in fuentes
+                    for cantidad in (colores_pozo if fuente else colores_mano)
+                ]
+            return (i, candidatas, tope if not solo_colores else 0, *orden)
+
+        return clave
+
+    def decidir_con_cache(
+        self, jugadas_validas, codigo_tope, colores_mano, colores_pozo, cache
+    ):
+        """
+        Como decidir, pero buscando antes en cache las elecciones que
+        cuestan algo. La clave lleva todo lo que mira la regla que juega,
+        así la jugada es la misma que sin cache.
+        """
+        for i, tabla in enumerate(self.tablas):
+            candidatas = jugadas_validas & tabla[codigo_tope]
+            if not candidatas:
+                continue
+            elegir = self.elecciones[i]
+            if elegir is None:
+                return primer_codigo(candidatas)
+            clave_de = self.claves[i]
+            clave = None
+            if clave_de is not None:
+                clave = clave_de(i, candidatas, codigo_tope, colores_mano, colores_pozo)
+            if clave is None:
+                return elegir(candidatas, codigo_tope, colores_mano, colores_pozo)
+            codigo = cache.buscar(clave)
+            if codigo is None:
+                codigo = elegir(candidatas, codigo_tope, colores_mano, colores_pozo)
+                cache.guardar(clave, codigo)
+            return codigo
+        return None
+
+    def motivo(self, jugadas_validas, codigo_tope):
+        # el de la regla que juega (para contarlo, no hace falta que sea rápido)
+        for tabla, regla in zip(self.tablas, self.reglas):
+            if jugadas_validas & tabla[codigo_tope]:
+                return regla.motivo
+        return None
+
+
+# Estrategia "Agresiva": prioriza "atacar" jugando cartas de acción (Toma,
+# Salta, Reversa), después numéricas del color que menos salió en el pozo
+# (los lleva el mazo: el siguiente tendría menos chances de tenerlo) y
+# recién después acumular. Siempre jugó así: en la versión a mano el
+# "si puede acumular" quedaba pisado por los if de abajo.
+ESTRATEGIA_B = Estrategia(
+    "B",
+    [
+        Regla(acciones),
+        Regla(numericas, menos(POZO)),
+        Regla(acumular),
+    ],
+)
+
+# Estrategia "conservadora": se defiende acumulando, después juega la
+# numérica del color que más tiene en la mano (le deja más chances de seguir
+# jugando si vuelve ese color) y guarda las acciones para el final,
+# primero las que no son Toma.
+ESTRATEGIA_D = Estrategia(
+    "D",
+    [
+        Regla(acumular, motivo="Defendiendo/Acumulando con"),
+        Regla(numericas, mas(MANO), motivo="Jugando numérica (optimizando mano)"),
+        Regla(acciones, preferir(no_tomas), motivo="Jugando acción (último recurso)"),
+    ],
+    cumple_y_juega=True,
+)
+
+
+class JugadorHeuristico(Jugador):
+    """
+    Bot que juega según su estrategia (una Estrategia). Para otro bot
+    alcanza con una subclase que defina estrategia; para elegir de otra
+    forma, con las mismas penalidades y eventos, una que redefina elegir.
+    cache (opcional) es una CacheDecisiones, de una sola clase de bot.
+    """
+
+    estrategia = None
+
+    def __init__(self, nombre, cache=None):
         super().__init__(nombre)
         self.es_humano = False
+        self.cache = cache
 
-    def jugar(self, juego):
+    def elegir(self, jugadas_validas, codigo_tope, juego):
         """
-        Estrategia "conservadora":
-        1. Juega acciones solo para responder a acciones Toma 2 y Toma 4
-        2. Prioriza jugar cartas numéricas. Usa el pozo para seleccionar que numero/color jugar
-        3. Guardar cartas de acción (Toma, Salta, Reversa) para jugar a lo último y solo las juega si no queda otra
-        """
-
-        carta_pozo = juego.mazo.ver_tope_pozo()
-        pozo_completo = juego.mazo.pozo
-        jugadas_validas = []
-        for carta in self.mano:
-            if juego.es_jugada_valida(carta, carta_pozo):
-                jugadas_validas.append(carta)
-
-        # --- Listas de Prioridades ---
-        acumulables = []
-        numericas = []
-        otras_acciones = []  # saltar y reversa
-        carta_a_jugar = None
-
-        for carta in jugadas_validas:
-            # 1. Prioridad Acumular (Defensivo)
-            if carta.valor == juego.mazo.ver_tope_pozo().valor and carta.es_accion():
-                acumulables.append(carta)
-            # 2. Prioridad Cartas Numéricas
-            elif carta.es_numerica():
-                numericas.append(carta)
-            else:
-                otras_acciones.append(carta)
-
-        # --- Decisión por prioridad ---
-        if acumulables:
-            print(f"Bot D: Defendiendo/Acumulando con {acumulables[0]}")
-            carta_a_jugar = acumulables[0]  # Prioridad 1: Siempre defenderse.
-
-        elif numericas:
-            # Contar qué colores y números hay en mi PROPIA mano.
-            conteo_colores_mano = Counter(c.color for c in self.mano)
-
-            # La estrategia es jugar una carta de un color que TENGO MUCHO.
-            # ¿Por qué? Maximiza las chances de poder jugar en el futuro
-            # si la ronda vuelve al mismo color.
-            # Ordena las cartas numéricas, prefiriendo las de colores
-            # que tiene MÁS en su mano.
-            numericas.sort(key=lambda c: conteo_colores_mano[c.color], reverse=True)
-
-            print(f"Bot D: Jugando numérica (optimizando mano) {numericas[0]}")
-            carta_a_jugar = numericas[0]
-
-        elif otras_acciones:
-            # Último recurso: jugar una carta de acción (ej. un "Salta" sobre un 5)
-            # Ordena jugar primero las que no son "Toma"
-            otras_acciones.sort(
-                key=lambda c: c.valor == "Toma 2" or c.valor == "Toma 4"
+        Código a jugar (o None) entre jugadas_validas, la máscara de lo que
+        se puede jugar sobre el tope
+        """
+        # la mano y el mazo ya llevan contados sus colores
+        if self.cache is None:
+            return self.estrategia.decidir(
+                jugadas_validas,
+                codigo_tope,
+                self.mano.conteo_colores,
+                juego.mazo.colores_pozo(),
             )
-            print(f"Bot D: Jugando acción (último recurso) {otras_acciones[0]}")
-            carta_a_jugar = otras_acciones[0]
-        elif jugadas_validas:
-            print("Bot D: juego cualquier cosa válida")
-            carta_a_jugar = jugadas_validas[0]
-
-        if not acumulables and juego.mazo.ver_tope_pozo().es_accion():
-            print("Bot D no puede jugar, cumple penalidad")
+        return self.estrategia.decidir_con_cache(
+            jugadas_validas,
+            codigo_tope,
+            self.mano.conteo_colores,
+            juego.mazo.colores_pozo(),
+            self.cache,
+        )
+
+    def jugar(self, juego):
+        estrategia = self.estrategia
+        eventos = juego.eventos
+        codigo_tope = juego.mazo.ver_tope_pozo().codigo
+        # máscara con los códigos de la mano que se pueden jugar sobre el tope
+        jugadas_validas = self.mano.jugables(codigo_tope)
+        codigo_a_jugar = self.elegir(jugadas_validas, codigo_tope, juego)
+
+        if codigo_a_jugar is not None and eventos.activa:
+            # solo se arma si alguien lo va a mirar
+            motivo = estrategia.motivo(jugadas_validas, codigo_tope)
+            if motivo is not None:
+                carta = self.mano.ver_codigo(codigo_a_jugar)
+                eventos.emitir(
+                    ESTRATEGIA, bot=estrategia.nombre, motivo=motivo, carta=carta
+                )
+
+        if ES_ACCION_CODIGO[codigo_tope] and not (
+            jugadas_validas & ACUMULABLES[codigo_tope]
+        ):
+            if eventos.activa:
+                eventos.emitir(PENALIDAD, bot=estrategia.nombre)
             self.tomar_cartas_del_mazo(juego.mazo, juego.cartas_acumuladas)
             juego.cartas_acumuladas = 0
             juego.accion_pendiente = None
-        if carta_a_jugar:
+            if not estrategia.cumple_y_juega:
+                return None
+
+        if codigo_a_jugar is not None:
             # Juega la carta seleccionada
-            carta_idx = self.mano.index(carta_a_jugar)
-            self.jugar_carta(carta_idx, juego.mazo)
-            print(f"Bot D: Jugando carta {carta_a_jugar}")
+            carta_a_jugar = self.jugar_codigo(codigo_a_jugar, juego.mazo)
+            if eventos.activa:
+                eventos.emitir(JUGADA_BOT, bot=estrategia.nombre, carta=carta_a_jugar)
             if len(self.mano) == 1:
-                print("Bot D dice Adná!")
+                eventos.emitir(ADNA, bot=estrategia.nombre)
                 self.dijo_adna = True
             return carta_a_jugar
-        else:
-            print("Bot D: no puedo hacer nada, tomo carta")
-            self.tomar_cartas_del_mazo(juego.mazo, 1)
-            return None
 
+        if eventos.activa:
+            eventos.emitir(NO_PUEDE, bot=estrategia.nombre)
+        self.tomar_cartas_del_mazo(juego.mazo, 1)
+        return None
+
+
+class JugadorBotB(JugadorHeuristico):
+    estrategia = ESTRATEGIA_B
+
+
+class JugadorBotD(JugadorHeuristico):
+    estrategia = ESTRATEGIA_D
+
+
+class Reglas:
+    """
+    Reglas de turno y de cartas de acción.
+    Las comparten Juego y el EstadoJuego compacto de las búsquedas:
+    solo tocan jugador_actual_idx, direccion, cartas_acumuladas,
+    accion_pendiente y turno_activo (y avisan a eventos), y leen
+    cantidad_jugadores.
+    """
+
+    def avanzar_turno(self):
+        """
+        Pasa al siguiente jugador según la dirección.
+        """
+        self.jugador_actual_idx = (
+            self.jugador_actual_idx + self.direccion
+        ) % self.cantidad_jugadores
+        self.turno_activo = True  # El nuevo jugador tiene un turno activo
+
+    def es_jugada_valida(self, carta, carta_tope_pozo):
+        # mismo color, o mismo número, o misma acción: está todo en la tabla
+        return JUGABLES[carta_tope_pozo.codigo] >> carta.codigo & 1 == 1
 
-class Juego:
+    def procesar_accion(self, carta):
+        """
+        Procesa los efectos de las cartas de acción
+        """
+        if not carta:
+            # El jugador tomó carta, no hay acción que procesar
+            return
+
+        # qué hace la carta sale de la tabla del reglamento
+        efecto = EFECTO_CODIGO[carta.codigo]
+        if efecto == EFECTO_REVERSA:
+            self.direccion *= -1
+            if self.eventos.activa:
+                self.eventos.emitir(REVERSA, direccion=self.direccion)
+            if self.cantidad_jugadores == 2:
+                # entre dos cambiar el sentido no cambia nada: hace de Salta
+                self.avanzar_turno()
+
+        elif efecto == EFECTO_SALTA:
+            self.avanzar_turno()  # Salta al siguiente
+            if self.eventos.activa:
+                saltado = self.jugadores[self.jugador_actual_idx].nombre
+                self.eventos.emitir(SALTA, jugador=saltado)
+
+        elif efecto == EFECTO_TOMA:
+            # Toma 2, Toma 4 o las que tenga el reglamento
+            self.cartas_acumuladas += TOMA_CODIGO[carta.codigo]
+            self.accion_pendiente = carta.valor
+            if self.eventos.activa:
+                self.eventos.emitir(
+                    ACUMULACION, cantidad=self.cartas_acumuladas, accion=carta.valor
+                )
+
+
+class Juego(Reglas):
     """
     Controla todo el flujo de la partida.
     """
 
-    def __init__(self):
-        self.mazo = Mazo()
-        self.jugadores = [
-            JugadorHumano("A"),  #
-            JugadorBotB("B"),  #
-            JugadorHumano("C"),  #
-            JugadorBotD("D"),  #
-        ]
+    def __init__(
+        self,
+        jugadores=None,
+        headless=False,
+        max_turnos=None,
+        rng=None,
+        eventos=None,
+        instrumentacion=None,
+        mazos=None,
+        pantalla=None,
+    ):
+        self.headless = headless
+        # cómo se muestra la mesa a los humanos (ver pantalla.py): panel ANSI
+        # en una terminal, texto si la salida va a un archivo
+        if pantalla is None:
+            pantalla = PantallaTexto() if headless else elegir_pantalla()
+        self.pantalla = pantalla
+        if jugadores is None:
+            jugadores = [
+                JugadorHumano("A"),  #
+                JugadorBotB("B"),  #
+                JugadorHumano("C"),  #
+                JugadorBotD("D"),  #
+            ]
+        if headless and any(isinstance(j, JugadorHumano) for j in jugadores):
+            # sin input() un humano de la terminal no puede jugar
+            raise ValueError("En modo headless solo pueden jugar bots")
+        if len(jugadores) < 2:
+            raise ValueError("Hacen falta al menos 2 jugadores")
+        self.jugadores = jugadores
+        self.cantidad_jugadores = len(jugadores)
+        # por defecto la cantidad de mazos va con el tamaño de la mesa
+        if mazos is None:
+            mazos = cantidad_mazos(len(jugadores))
+        self.mazo = Mazo(headless=headless, rng=rng, eventos=eventos, mazos=mazos)
+        # la misma salida que el mazo: terminal, nula (headless) o la que pasen
+        self.eventos = self.mazo.eventos
         self.jugador_actual_idx = 0
-        self.direccion = 1  # 1 para A->B->C->D, -1 para A->D->C->B
+        self.direccion = 1  # 1 para A->B->C->D..., -1 para A->...->D->C->B
         self.turno_activo = True
 
+        # contadores de la partida
+        self.turnos = 0
+        if max_turnos is None and headless:
+            max_turnos = MAX_TURNOS_SIMULACION
+        self.max_turnos = max_turnos
+        self.ganador = None
+
+        # objetos que quieren enterarse de lo que pasa en la mesa (ej. creencias
+        # de los bots). Tienen que tener al_jugar, al_tomar, al_mezclar
+        # y al_terminar_turno
+        self.observadores = []
+        # mediciones opcionales de cada turno (ver instrumentacion.py)
+        self.instrumentacion = instrumentacion
+
         # Variables para acumulación de acciones
         self.cartas_acumuladas = 0
-        self.accion_pendiente = None  # "TomaDos", "TomaCuatro"
+        self.accion_pendiente = None  # el valor de la toma: "Toma 2", "Toma 4"
+
+    def reiniciar(self):
+        """
+        Deja la mesa lista para otra partida con los mismos jugadores,
+        reusando el mazo y las manos (para simular muchas partidas sin
+        crear objetos). Los observadores se sueltan: son de la partida.
+        """
+        self.mazo.reiniciar()
+        for jugador in self.jugadores:
+            jugador.reiniciar()
+        self.jugador_actual_idx = 0
+        self.direccion = 1
+        self.turno_activo = True
+        self.turnos = 0
+        self.ganador = None
+        self.observadores.clear()
+        self.cartas_acumuladas = 0
+        self.accion_pendiente = None
 
     def repartir_inicial(self):
         """
-        Reparte 5 cartas a cada jugador en orden
+        Reparte CARTAS_MANO cartas (5 con las reglas de siempre) a cada
+        jugador en orden
         """
-        # cambiar cartas para probar con menos
-        cartas = 5
-        for i in range(cartas):
+        for i in range(CARTAS_MANO):
             for jugador in self.jugadores:
                 jugador.tomar_cartas_del_mazo(self.mazo, 1)
 
-    def iniciar_juego(self):
-        print("Iniciando partida de ADNA!")
+    def preparar_partida(self):
+        """
+        Pozo, reparto y primer jugador: todo lo de antes del primer turno
+        """
+        self.eventos.emitir(INICIO)
         self.mazo.iniciar_pozo()
         self.repartir_inicial()
         self.jugador_actual_idx = 0  # Comienza A
+
+    def iniciar_juego(self):
+        self.preparar_partida()
         # TODO
         # ver si comienzo acá o en __main__
-        self.jugar_ronda()
+        try:
+            self.jugar_ronda()
+        finally:
+            # también con Ctrl+C en el input() o una excepción: que la
+            # terminal no quede con el panel y la región de desplazamiento
+            if not self.headless:
+                self.pantalla.terminar()
+        if self.instrumentacion is not None:
+            self.instrumentacion.al_terminar_partida(self)
+        return self.resultado()
+
+    def resultado(self):
+        """
+        Resumen de la partida para las simulaciones
+        """
+        if self.ganador is None:
+            return ResultadoPartida(None, None, self.turnos, self.mazo.mezclas)
+        return ResultadoPartida(
+            self.ganador.nombre,
+            self.jugadores.index(self.ganador),
+            self.turnos,
+            self.mazo.mezclas,
+        )
 
     def mostrar_juego(self):
         """
         Muestra el estado constante del juego
         """
-
-        print("=============================")
-        print(f"Tope del Pozo: {self.mazo.ver_tope_pozo()}")
-        print(f"Cartas en el Mazo: {len(self.mazo.cartas)}")
-        print("--- Manos (Humanos) ---")
-        jugadores_humanos = [j for j in self.jugadores if j.es_humano]
-        for jugador in jugadores_humanos:
-            print(f"  {jugador.nombre}: {len(jugador.mano)} cartas")
-            jugador.mostrar_mano()
-        print("--- Estado (Robots) ---")
-        jugadores_robots = [j for j in self.jugadores if not j.es_humano]
-        for jugador in jugadores_robots:
-            print(f"  {jugador.nombre}: {len(jugador.mano)} cartas")
-            # DESCOMENTAR PARA DEBUG Y MOSTRAR LA MANO DEL
-            # jugador.mostrar_mano()
-        print("=============================")
+        self.pantalla.mostrar_juego(self)
 
     def penalidad_adna(self, jugador):
         """
         Penalidad por no decir "adná" al ganar
         """
-        print(f"¡{jugador.nombre} no dijo 'Adná!'! Penalidad.")
-        jugador.tomar_cartas_del_mazo(self.mazo, 2)
+        self.eventos.emitir(PENALIDAD_ADNA, jugador=jugador.nombre)
+        mezclas = self.mazo.mezclas
+        jugador.tomar_cartas_del_mazo(self.mazo, CARTAS_PENALIDAD_ADNA)
         jugador.dijo_adna = False
-        input("Presione una tecla para continuar...")
+        if self.observadores:
+            self.notificar_tomar(
+                jugador, CARTAS_PENALIDAD_ADNA, mezclas, voluntaria=False
+            )
+        if self.instrumentacion is not None:
+            self.instrumentacion.al_penalidad_adna(jugador)
+        if not self.headless:
+            input("Presione una tecla para continuar...")
 
-    def avanzar_turno(self):
+    def notificar_tomar(self, jugador, cantidad, mezclas_antes, voluntaria, tope=None):
         """
-        Pasa al siguiente jugador según la dirección.
+        Avisa a los observadores que jugador tomó cartas
+        (y si en el medio se regeneró el mazo)
         """
-        self.jugador_actual_idx = (self.jugador_actual_idx + self.direccion) % 4
-        self.turno_activo = True  # El nuevo jugador tiene un turno activo
-
-    def es_jugada_valida(self, carta, carta_tope_pozo):
-        # Lógica de validación
-        if carta.color == carta_tope_pozo.color:
-            return True
-        if (
-            carta.es_numerica()
-            and carta_tope_pozo.es_numerica()
-            and carta.valor == carta_tope_pozo.valor
-        ):
-            return True
-        if (
-            carta.es_accion()
-            and carta_tope_pozo.es_accion()
-            and carta.valor == carta_tope_pozo.valor
-        ):
-            return True
-        return False
-
-    def procesar_accion(self, carta):
+        idx = self.jugadores.index(jugador)
+        codigo_tope = tope.codigo if tope else self.mazo.ver_tope_pozo().codigo
+        for observador in self.observadores:
+            for _ in range(self.mazo.mezclas - mezclas_antes):
+                observador.al_mezclar()
+            observador.al_tomar(idx, cantidad, codigo_tope, voluntaria)
+
+    def notificar_turno(
+        self, jugador, carta_jugada, cartas_antes, mezclas, pendiente, tope
+    ):
         """
-        Procesa los efectos de las cartas de acción
+        Reconstruye lo que hizo el jugador en su turno mirando cómo quedó
+        su mano, así los jugadores no tienen que avisar nada
         """
-        if not carta:
-            # El jugador tomó carta, no hay acción que procesar
-            return
-
-        if carta.valor == "Reversa":
-            self.direccion *= -1
-            print(f"¡Cambia el sentido! Nueva dirección: {self.direccion}")
-
-        elif carta.valor == "Salta":
-            self.avanzar_turno()  # Salta al siguiente
-            print(
-                f"¡Salta! {self.jugadores[self.jugador_actual_idx].nombre} pierde el turno."
-            )
-
-        elif carta.valor == "Toma 2":
-            self.cartas_acumuladas += 2
-            self.accion_pendiente = "Toma 2"
-            print(
-                f"¡Acumulación! Próximo jugador debe tomar {self.cartas_acumuladas} cartas o jugar otro 'Toma 2'."
-            )
-
-        elif carta.valor == "Toma 4":
-            self.cartas_acumuladas += 4
-            self.accion_pendiente = "Toma 4"
-            print(
-                f"¡Acumulación! Próximo jugador debe tomar {self.cartas_acumuladas} cartas o jugar otro 'Toma 4'."
-            )
+        jugadas = 1 if carta_jugada else 0
+        tomadas = len(jugador.mano) - cartas_antes + jugadas
+        if tomadas or self.mazo.mezclas != mezclas:
+            # tomar por no poder (o no querer) jugar, sin acción pendiente,
+            # es lo único que dice algo de la mano del jugador
+            voluntaria = not jugadas and pendiente is None
+            self.notificar_tomar(jugador, tomadas, mezclas, voluntaria, tope)
+        idx = self.jugadores.index(jugador)
+        if carta_jugada:
+            for observador in self.observadores:
+                observador.al_jugar(idx, carta_jugada.codigo)
+        # si había una acción pendiente y ya no está, cumplió la penalidad
+        cumplio = pendiente is not None and self.accion_pendiente is None
+        for observador in self.observadores:
+            observador.al_terminar_turno(idx, carta_jugada, tomadas, cumplio)
 
     def verificar_ganador(self, jugador):
         if len(jugador.mano) == 0:
@@ -582,49 +1218,127 @@ class Juego:
                 return False
             else:
                 # Ganó
-                print(f"\n¡¡¡ {jugador.nombre} ha ganado la partida !!!")
+                self.eventos.emitir(GANADOR, jugador=jugador.nombre)
                 return True
         return False
 
+    def revisar_adna(self, jugador):
+        """
+        Si le queda una carta y no dijo Adná, lo penaliza y pierde el turno
+        """
+        if len(jugador.mano) == 1 and not jugador.dijo_adna:
+            self.penalidad_adna(jugador)
+            self.turno_activo = False
+
+    def jugar_turno(self, jugador):
+        """
+        Turno activo de jugador: decide, se avisa a quien corresponda y se
+        aplica la carta. Devuelve True si con eso ganó.
+        """
+        self.turnos += 1
+        if self.eventos.activa:
+            self.eventos.emitir(TURNO, jugador=jugador.nombre)
+        if not self.headless:
+            # Mostrar estado (solo si es humano, o siempre?)
+            # La consigna dice "constantemente"
+            if jugador.es_humano:
+                self.mostrar_juego()
+
+            elif not jugador.es_humano:
+                self.pantalla.actualizar(self)
+                print("Jugar robot")
+
+        # El jugador decide (sea humano o robot)
+        # (se guarda siempre: un bot puede anotar observadores en su jugada)
+        cartas_antes = len(jugador.mano)
+        mezclas = self.mazo.mezclas
+        pendiente = self.accion_pendiente
+        tope = self.mazo.ver_tope_pozo()
+        instrumentacion = self.instrumentacion  # sin instrumentar no cuesta nada
+        if instrumentacion is None:
+            carta_jugada = jugador.jugar(self)
+        else:
+            inicio = time.perf_counter()
+            carta_jugada = jugador.jugar(self)
+            instrumentacion.al_jugar(
+                jugador,
+                time.perf_counter() - inicio,
+                carta_jugada,
+                cartas_antes,
+                pendiente,
+                self,
+            )
+        if self.observadores:
+            self.notificar_turno(
+                jugador, carta_jugada, cartas_antes, mezclas, pendiente, tope
+            )
+
+        if self.verificar_ganador(jugador):
+            return True
+
+        # Procesar la acción de la carta (si se jugó una)
+        self.procesar_accion(carta_jugada)
+        return False
+
     def jugar_ronda(self):
         """
         Ejecuta un turno completo.
+        Devuelve el jugador que ganó o None si se cortó por tope de turnos.
         """
         # COMENTAR PARA DEBUG Y NO BORRAR LA PANTALLA
-        clear_screen()
+        if not self.headless:
+            self.pantalla.empezar(self)
         while True:  # Bucle principal del juego
+            if self.max_turnos is not None and self.turnos >= self.max_turnos:
+                return None  # nadie pudo ganar
+
             jugador = self.jugadores[self.jugador_actual_idx]
 
             # si no dijo ADNA, lo penalizo y paso al siguiente
-            if len(jugador.mano) == 1 and not jugador.dijo_adna:
-                self.penalidad_adna(jugador)
-                self.turno_activo = False
+            self.revisar_adna(jugador)
 
             # Turno activo y sus cosas
-            if self.turno_activo:
-                print(f"\n--- Turno de {jugador.nombre} ---")
-
-                # Mostrar estado (solo si es humano, o siempre?)
-                # La consigna dice "constantemente"
-                if jugador.es_humano:
-                    self.mostrar_juego()
-
-                elif not jugador.es_humano:
-                    print("Jugar robot")
-
-                # El jugador decide (sea humano o robot)
-                carta_jugada = jugador.jugar(self)
-
-                if self.verificar_ganador(jugador):
-                    break  # Termina el juego
-
-                # Procesar la acción de la carta (si se jugó una)
-                self.procesar_accion(carta_jugada)
+            if self.turno_activo and self.jugar_turno(jugador):
+                self.ganador = jugador
+                return jugador  # Termina el juego
 
             # Pasar al siguiente turno
             self.avanzar_turno()
 
 
+def simular(n, clases=None, max_turnos=None, rng=None, instrumentacion=None):
+    """
+    Juega n partidas headless entre bots y devuelve la lista de resultados.
+    clases es la lista de clases de bot por asiento (por defecto B, D, B, D),
+    tantas como jugadores tenga la mesa,
+    y rng un random.Random opcional para que las partidas sean reproducibles.
+    instrumentacion (opcional) junta las mediciones de todas las partidas.
+    """
+    if clases is None:
+        clases = [JugadorBotB, JugadorBotD, JugadorBotB, JugadorBotD]
+
+    resultados = []
+    juego = None
+    for _ in range(n):
+        if juego is None:
+            jugadores = [
+                clase(nombre)
+                for clase, nombre in zip(clases, nombres_asientos(len(clases)))
+            ]
+            juego = Juego(
+                jugadores=jugadores,
+                headless=True,
+                max_turnos=max_turnos,
+                rng=rng,
+                instrumentacion=instrumentacion,
+            )
+        else:
+            # la misma mesa: mazo y manos se reusan, no se crea nada
+            juego.reiniciar()
+        resultados.append(juego.iniciar_juego())
+    return resultados
+
+
 if __name__ == "__main__":
     juego = Juego()
     juego.iniciar_juego()
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from functools import partial
+
+from app import (
+    CARTAS_CODIGO,
+    CacheDecisiones,
+    Juego,
+    JugadorBotB,
+    JugadorBotD,
+    Mazo,
+    simular,
+)
+
+SEMILLA = 1234
+REPETICIONES = 5  # de cada benchmark se queda con la mejor corrida
+TOLERANCIA = 0.15  # cuánto más lento que la base se considera regresión
+# corrida de referencia guardada en el repo (python benchmarks.py --guardar)
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "base_benchmarks.json")
+
+
+def _medir(preparar, correr, repeticiones):
+    """
+    preparar() arma lo necesario (no se mide) y devuelve (datos, operaciones);
+    correr(datos) es lo que se mide. Devuelve los segundos por operación
+    de la mejor repetición.
+    """
+    mejor = None
+    for i in range(repeticiones):
+        datos, operaciones = preparar(i)
+        inicio = time.perf_counter()
+        correr(datos)
+        por_op = (time.perf_counter() - inicio) / operaciones
+        if mejor is None or por_op < mejor:
+            mejor = por_op
+    return mejor
+
+
+# --- Mazo ---
+
+
+def bench_crear_mazo(repeticiones):
+    def preparar(i):
+        return Mazo(headless=True, rng=random.Random(SEMILLA + i)), 2000
+
+    def correr(mazo):
+        for _ in range(2000):
+            mazo.crear_mazo()
+
+    return _medir(preparar, correr, repeticiones)
+
+
+def bench_mezclar(repeticiones):
+    def preparar(i):
+        return Mazo(headless=True, rng=random.Random(SEMILLA + i)), 2000
+
+    def correr(mazo):
+        for _ in range(2000):
+            mazo.mezclar()
+
+    return _medir(preparar, correr, repeticiones)
+
+
+def bench_sacar_carta(repeticiones):
+    # cada carta sacada vuelve al pozo, así cada ~100 cartas se regenera el mazo
+    def preparar(i):
+        mazo = Mazo(headless=True, rng=random.Random(SEMILLA + i))
+        mazo.iniciar_pozo()
+        return mazo, 20_000
+
+    def correr(mazo):
+        sacar = mazo.sacar_carta
+        agregar = mazo.agregar_al_pozo
+        for _ in range(20_000):
+            agregar(sacar())
+
+    return _medir(preparar, correr, repeticiones)
+
+
+# --- reglas ---
+
+
+def bench_es_jugada_valida(repeticiones):
+    # todos los pares (carta, tope) posibles
+    def preparar(i):
+        juego = Juego(jugadores=[JugadorBotD(n) for n in "ABCD"], headless=True)
+        pares = [(c, t) for c in CARTAS_CODIGO for t in CARTAS_CODIGO] * 4
+        return (juego, pares), len(pares)
+
+    def correr(datos):
+        juego, pares = datos
+        valida = juego.es_jugada_valida
+        for carta, tope in pares:
+            valida(carta, tope)
+
+    return _medir(preparar, correr, repeticiones)
+
+
+# --- bots ---
+
+
+def _juegos_con_mano(clase, cartas, cantidad, semilla):
+    """
+    cantidad de partidas recién empezadas donde al bot que arranca le
+    repartieron cartas cartas (el resto del mazo queda para tomar)
+    """
+    rng = random.Random(semilla)
+    juegos = []
+    for _ in range(cantidad):
+        jugadores = [clase(n) for n in "ABCD"]
+        juego = Juego(jugadores=jugadores, headless=True, rng=rng)
+        juego.mazo.iniciar_pozo()
+        jugadores[0].tomar_cartas_del_mazo(juego.mazo, cartas)
+        juegos.append(juego)
+    return juegos
+
+
+def _bench_bot(clase, cartas, repeticiones):
+    partidas = 3000 if cartas < 20 else 1000
+
+    def preparar(i):
+        return _juegos_con_mano(clase, cartas, partidas, SEMILLA + i), partidas
+
+    def correr(juegos):
+        for juego in juegos:
+            juego.jugadores[0].jugar(juego)
+
+    return _medir(preparar, correr, repeticiones)
+
+
+# --- de punta a punta ---
+
+
+def bench_partidas(repeticiones):
+    # devuelve segundos por partida (B, D, B, D)
+    def preparar(i):
+        return random.Random(SEMILLA + i), 500
+
+    def correr(rng):
+        simular(500, rng=rng)
+
+    return _medir(preparar, correr, repeticiones)
+
+
+def bench_partidas_jugadores(jugadores, repeticiones):
+    # mesas de otros tamaños (B, D, B, D...), con los mazos que les tocan
+    clases = [(JugadorBotB, JugadorBotD)[i % 2] for i in range(jugadores)]
+
+    def preparar(i):
+        return random.Random(SEMILLA + i), 200
+
+    def correr(rng):
+        simular(200, clases=clases, rng=rng)
+
+    return _medir(preparar, correr, repeticiones)
+
+
+def bench_partidas_cache(repeticiones):
+    # como bench_partidas pero con cache de jugadas (ya caliente) en B y D
+    cache_b, cache_d = CacheDecisiones(), CacheDecisiones()
+    clases = [
+        partial(JugadorBotB, cache=cache_b),
+        partial(JugadorBotD, cache=cache_d),
+    ] * 2
+    simular(500, clases=clases, rng=random.Random(SEMILLA - 1))
+
+    def preparar(i):
+        return random.Random(SEMILLA + i), 500
+
+    def correr(rng):
+        simular(500, clases=clases, rng=rng)
+
+    return _medir(preparar, correr, repeticiones)
+
+
+BENCHMARKS = {
+    "mazo.crear_mazo": bench_crear_mazo,
+    "mazo.mezclar": bench_mezclar,
+    "mazo.sacar_carta": bench_sacar_carta,
+    "juego.es_jugada_valida": bench_es_jugada_valida,
+    "bot_b.jugar.mano_5": lambda r: _bench_bot(JugadorBotB, 5, r),
+    "bot_b.jugar.mano_60": lambda r: _bench_bot(JugadorBotB, 60, r),
+    "bot_d.jugar.mano_5": lambda r: _bench_bot(JugadorBotD, 5, r),
+    "bot_d.jugar.mano_60": lambda r: _bench_bot(JugadorBotD, 60, r),
+    "partidas": bench_partidas,
+    "partidas.cache_decisiones": bench_partidas_cache,
+    "partidas.2_jugadores": lambda r: bench_partidas_jugadores(2, r),
+    "partidas.6_jugadores": lambda r: bench_partidas_jugadores(6, r),
+    "partidas.10_jugadores": lambda r: bench_partidas_jugadores(10, r),
+}
+
+
+def correr_benchmarks(nombres=None, repeticiones=REPETICIONES):
+    """
+    Corre los benchmarks pedidos (todos por defecto) y devuelve un dict
+    listo para guardar como JSON
+    """
+    resultados = {}
+    for nombre, bench in BENCHMARKS.items():
+        if nombres and nombre not in nombres:
+            continue
+        segundos = bench(repeticiones)
+        resultados[nombre] = {
+            "ns_por_op": segundos * 1e9,
+            "ops_por_segundo": 1 / segundos,
+        }
+    return {
+        "python": platform.python_version(),
+        "semilla": SEMILLA,
+        "resultados": resultados,
+    }
+
+
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    """
+    Compara contra una corrida guardada. Devuelve (líneas, regresiones)
+    """
+    lineas = []
+    regresiones = []
+    for nombre, resultado in actual["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None:
+            lineas.append(f"{nombre:28} {resultado['ns_por_op']:12.0f} ns  (nuevo)")
+            continue
+        relacion = resultado["ns_por_op"] / anterior["ns_por_op"]
+        if relacion > 1 + tolerancia:
+            marca = "REGRESIÓN"
+            regresiones.append(nombre)
+        elif relacion < 1 - tolerancia:
+            marca = "mejora"
+        else:
+            marca = ""
+        lineas.append(
+            f"{nombre:28} {resultado['ns_por_op']:12.0f} ns  "
+            f"base {anterior['ns_por_op']:12.0f} ns  x{relacion:.2f} {marca}"
+        )
+    return lineas, regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de ADNA")
+    parser.add_argument("--solo", nargs="*", help="nombres de benchmarks a correr")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--guardar", help="guarda los resultados en este JSON")
+    parser.add_argument(
+        "--comparar",
+        nargs="?",
+        const=BASE,
+        help="JSON de base contra el que comparar (solo, base_benchmarks.json)",
+    )
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args()
+    if args.solo:
+        desconocidos = [nombre for nombre in args.solo if nombre not in BENCHMARKS]
+        if desconocidos:
+            parser.error(
+                f"no hay benchmarks {', '.join(desconocidos)} "
+                f"(hay: {', '.join(BENCHMARKS)})"
+            )
+
+    actual = correr_benchmarks(args.solo, args.repeticiones)
+    if args.guardar:
+        with open(args.guardar, "w") as archivo:
+            json.dump(actual, archivo, indent=2)
+
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            base = json.load(archivo)
+        lineas, regresiones = comparar(actual, base, args.tolerancia)
+        print("\n".join(lineas))
+        if regresiones:
+            print(f"Regresiones: {', '.join(regresiones)}")
+            sys.exit(1)
+    else:
+        for nombre, resultado in actual["resultados"].items():
+            print(
+                f"{nombre:28} {resultado['ns_por_op']:12.0f} ns  "
+                f"({resultado['ops_por_segundo']:.0f}/s)"
+            )
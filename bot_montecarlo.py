@@ -0,0 +1,237 @@
+import random
+import time
+
+from app import CANTIDAD_CODIGOS, Jugador
+from creencias import Creencias
+from estado import POLITICAS, TOMAR, EstadoJuego, turno_de
+from eventos import ADNA, BUSQUEDA, JUGADA_BOT, NO_PUEDE, PENALIDAD
+
+
+class JugadorMontecarlo(Jugador):
+    """
+    Bot de Monte Carlo sobre conjuntos de información.
+    En cada turno reparte al azar las cartas que no ve (respetando lo que
+    sabe que los rivales no tienen), prueba cada jugada posible y termina
+    la partida simulada con los bots de siempre: a los rivales B y D los
+    simula como juegan en Juego, y para sí mismo usa la política elegida.
+    Se queda con la jugada que más partidas simuladas ganó.
+
+    Las simulaciones se cortan a profundidad_max turnos y ahí se estima el
+    resultado por el tamaño de las manos: son más cortas y ruidosas que una
+    partida entera, así entran muchos más repartos en el mismo tiempo.
+
+    El presupuesto por jugada es tiempo_max (segundos) y/o iteraciones_max
+    (repartos); el tiempo se controla también adentro de cada simulación,
+    así no se pasa aunque una simulación sea larga.
+    """
+
+    def __init__(
+        self,
+        nombre,
+        tiempo_max=0.05,
+        iteraciones_max=None,
+        politica="D",
+        profundidad_max=12,
+        rng=None,
+    ):
+        super().__init__(nombre)
+        self.es_humano = False
+        self.tiempo_max = tiempo_max
+        self.iteraciones_max = iteraciones_max
+        self.politica = POLITICAS[politica]
+        self.profundidad_max = profundidad_max
+        self.rng = rng if rng is not None else random.Random()
+        self.creencias = None
+        self.modelos = None  # cómo simular a cada asiento
+
+        # estadísticas de rendimiento
+        self.simulaciones_total = 0
+        self.nodos_total = 0
+        self.segundos_total = 0.0
+        self.ultima_busqueda = None  # (simulaciones, nodos, segundos)
+
+    def nodos_por_segundo(self):
+        if not self.segundos_total:
+            return 0.0
+        return self.nodos_total / self.segundos_total
+
+    def jugar(self, juego):
+        if self.creencias is None or self.creencias not in juego.observadores:
+            # primera jugada de esta partida: empiezo a llevar la cuenta
+            self.creencias = Creencias(juego, self)
+            self.modelos = [turno_de(type(j)) for j in juego.jugadores]
+            self.modelos[self.creencias.yo] = None
+
+        base = EstadoJuego.desde_juego(juego, rng=self.rng)
+        legales = base.jugadas_legales()
+        # la jugada de la política va primero (desempata a su favor)
+        preferida = self.politica(base)
+        legales.remove(preferida)
+        legales.insert(0, preferida)
+        if len(legales) == 1:
+            jugada = legales[0]  # no hay nada que pensar
+        else:
+            jugada = self.buscar(base, legales)
+            simulaciones, nodos, segundos = self.ultima_busqueda
+            juego.eventos.emitir(
+                BUSQUEDA,
+                bot="MC",
+                simulaciones=simulaciones,
+                nodos_por_segundo=nodos / segundos if segundos else 0,
+            )
+        return self.ejecutar(juego, jugada)
+
+    def ejecutar(self, juego, jugada):
+        """
+        Hace en el Juego real la jugada elegida sobre el estado
+        """
+        if jugada == TOMAR:
+            if juego.accion_pendiente:
+                juego.eventos.emitir(PENALIDAD, bot="MC")
+                self.tomar_cartas_del_mazo(juego.mazo, juego.cartas_acumuladas)
+                juego.cartas_acumuladas = 0
+                juego.accion_pendiente = None
+            else:
+                juego.eventos.emitir(NO_PUEDE, bot="MC")
+                self.tomar_cartas_del_mazo(juego.mazo, 1)
+            return None
+
+        carta_a_jugar = self.jugar_codigo(jugada, juego.mazo)
+        juego.eventos.emitir(JUGADA_BOT, bot="MC", carta=carta_a_jugar)
+        if len(self.mano) == 1:
+            juego.eventos.emitir(ADNA, bot="MC")
+            self.dijo_adna = True
+        return carta_a_jugar
+
+    def buscar(self, base, legales):
+        """
+        En cada iteración hace un reparto nuevo y prueba todas las jugadas
+        con ese mismo reparto: como las políticas son deterministas, las
+        jugadas se comparan en igualdad de condiciones y hacen falta muchas
+        menos simulaciones para separarlas
+        """
+        inicio = time.perf_counter()
+        limite = inicio + self.tiempo_max if self.tiempo_max else None
+        desconocidas = self.cartas_desconocidas()
+
+        ganadas = [0.0] * len(legales)
+        iteraciones = 0
+        simulaciones = 0
+        nodos = 0
+        completa = True
+        while completa:
+            if self.iteraciones_max and iteraciones >= self.iteraciones_max:
+                break
+            if limite and time.perf_counter() >= limite:
+                break
+
+            reparto = self.determinizar(base, desconocidas)
+            resultados = []
+            for jugada in legales:
+                estado = reparto.copiar()
+                estado.hacer(jugada)
+                resultado, recorridos = self.simular(estado, limite)
+                nodos += recorridos + 1
+                if resultado is None:
+                    completa = False  # se terminó el tiempo en el medio
+                    break
+                resultados.append(resultado)
+            if completa:
+                # solo cuento iteraciones con todas las jugadas probadas
+                for i, resultado in enumerate(resultados):
+                    ganadas[i] += resultado
+                iteraciones += 1
+                simulaciones += len(resultados)
+
+        segundos = time.perf_counter() - inicio
+        self.ultima_busqueda = (simulaciones, nodos, segundos)
+        self.simulaciones_total += simulaciones
+        self.nodos_total += nodos
+        self.segundos_total += segundos
+
+        # ante empates gana la primera, que es la que elegiría la política
+        return legales[max(range(len(legales)), key=lambda i: ganadas[i])]
+
+    def cartas_desconocidas(self):
+        """
+        Códigos de las cartas que no vi (mazo + manos rivales), uno por carta
+        """
+        desconocidas = []
+        for codigo in range(CANTIDAD_CODIGOS):
+            desconocidas.extend([codigo] * self.creencias.desconocidas(codigo))
+        return desconocidas
+
+    def determinizar(self, base, desconocidas):
+        """
+        Copia del estado con las manos rivales y el mazo repartidos al azar
+        entre las cartas que no vi. A cada rival no le tocan más cartas de lo
+        que no pudo jugar que las que tomó después (si se puede).
+        """
+        estado = base.copiar()
+        yo = self.creencias.yo
+        pila = desconocidas[:]
+        self.rng.shuffle(pila)
+
+        for idx in range(len(estado.manos)):
+            if idx == yo:
+                continue
+            cantidad = estado.cantidades[idx]
+            restricciones = [
+                [mascara, permitidas]
+                for mascara, permitidas in self.creencias.restricciones(idx)
+                if permitidas < cantidad
+            ]
+            mano = [0] * CANTIDAD_CODIGOS
+            presentes = 0
+            tomadas = 0
+            resto = []
+            for codigo in pila:
+                if tomadas < cantidad and all(
+                    permitidas > 0 or not mascara >> codigo & 1
+                    for mascara, permitidas in restricciones
+                ):
+                    mano[codigo] += 1
+                    presentes |= 1 << codigo
+                    tomadas += 1
+                    for restriccion in restricciones:
+                        if restriccion[0] >> codigo & 1:
+                            restriccion[1] -= 1
+                else:
+                    resto.append(codigo)
+            # si las restricciones no dejan completar la mano, relleno igual
+            while tomadas < cantidad and resto:
+                codigo = resto.pop()
+                mano[codigo] += 1
+                presentes |= 1 << codigo
+                tomadas += 1
+            estado.manos[idx] = mano
+            estado.presentes[idx] = presentes
+            estado.cantidades[idx] = tomadas
+            pila = resto
+
+        estado.mazo = pila
+        return estado
+
+    def simular(self, estado, limite):
+        """
+        Sigue la partida con la política y los modelos de los rivales.
+        Devuelve (resultado, nodos), resultado es None si se pasó del tiempo
+        """
+        yo = self.creencias.yo
+        politica = self.politica
+        modelos = self.modelos
+        nodos = 0
+        while estado.ganador is None and nodos < self.profundidad_max:
+            if limite and not nodos & 15 and time.perf_counter() >= limite:
+                return None, nodos
+            turno = modelos[estado.jugador_actual_idx]
+            if turno is None:
+                estado.hacer(politica(estado))
+            else:
+                turno(estado)
+            nodos += 1
+        if estado.ganador is None:
+            # no terminó: estimo por tamaño de las manos (menos cartas, más chances)
+            inversas = [1.0 / (cantidad * cantidad) for cantidad in estado.cantidades]
+            return inversas[yo] / sum(inversas), nodos
+        return (1.0 if estado.ganador == yo else 0.0), nodos
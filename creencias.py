@@ -0,0 +1,141 @@
+from app import CANTIDAD_CODIGOS, COLORES, IDX_COLOR_CODIGO, JUGABLES, MAZO_BASE
+
+
+def _copias_por_codigo():
+    # cuántas cartas de cada código trae un mazo (de 100 con las reglas de siempre)
+    copias = [0] * CANTIDAD_CODIGOS
+    for carta in MAZO_BASE:
+        copias[carta.codigo] += 1
+    return copias
+
+
+COPIAS_CODIGO = _copias_por_codigo()
+
+# cuántas restricciones "no tenía nada jugable" se guardan por rival
+MAX_RESTRICCIONES = 4
+
+
+class Creencias:
+    """
+    Lo que un jugador "sabe" de la mesa: cuántas cartas de cada código
+    siguen sin aparecer y qué colores parece no tener cada rival.
+    Se alimenta de los eventos del Juego (jugadas, tomas, mezclas) y cada
+    evento se procesa sin recorrer el historial.
+    """
+
+    def __init__(self, juego, jugador):
+        self.juego = juego
+        self.jugador = jugador
+        self.yo = juego.jugadores.index(jugador)
+        mazo = juego.mazo
+        cantidad_jugadores = len(juego.jugadores)
+
+        # cartas que no están en el pozo: en el mazo o en alguna mano
+        self.fuera_del_pozo = [
+            COPIAS_CODIGO[c] * mazo.mazos - mazo.cantidad_codigo_pozo(c)
+            for c in range(CANTIDAD_CODIGOS)
+        ]
+        self.fuera_del_pozo_color = [0] * len(COLORES)
+        for codigo, cantidad in enumerate(self.fuera_del_pozo):
+            self.fuera_del_pozo_color[IDX_COLOR_CODIGO[codigo]] += cantidad
+        self.total_fuera_del_pozo = sum(self.fuera_del_pozo)
+        # copia propia del pozo para saber qué vuelve al mazo cuando se mezcla
+        self.pozo = [mazo.cantidad_codigo_pozo(c) for c in range(CANTIDAD_CODIGOS)]
+        self.codigo_tope = mazo.ver_tope_pozo().codigo
+
+        # por rival: cuántas cartas tomó en total y, para cada color,
+        # desde qué toma sabemos que no tiene ese color (None = no sabemos nada)
+        self.tomadas = [0] * cantidad_jugadores
+        self.vacio_desde = [[None] * len(COLORES) for _ in range(cantidad_jugadores)]
+        # por rival, las últimas veces que tomó sin poder jugar:
+        # [máscara de lo que no tenía, tomadas hasta ese momento, jugadas de la
+        # máscara desde entonces]. De la máscara solo puede tener lo que tomó después
+        self._restricciones = [[] for _ in range(cantidad_jugadores)]
+
+        juego.observadores.append(self)
+
+    # --- eventos ---
+
+    def al_jugar(self, idx, codigo):
+        self.fuera_del_pozo[codigo] -= 1
+        self.fuera_del_pozo_color[IDX_COLOR_CODIGO[codigo]] -= 1
+        self.total_fuera_del_pozo -= 1
+        self.pozo[codigo] += 1
+        self.codigo_tope = codigo
+        for restriccion in self._restricciones[idx]:
+            if restriccion[0] >> codigo & 1:
+                restriccion[2] += 1  # esa la había tomado después
+
+    def al_tomar(self, idx, cantidad, codigo_tope, voluntaria):
+        if voluntaria and cantidad and idx != self.yo:
+            # no pudo seguir el color del tope: hasta esta toma no lo tenía
+            self.vacio_desde[idx][IDX_COLOR_CODIGO[codigo_tope]] = self.tomadas[idx]
+            # en realidad no tenía nada de lo jugable sobre el tope
+            restricciones = self._restricciones[idx]
+            restricciones.insert(0, [JUGABLES[codigo_tope], self.tomadas[idx], 0])
+            del restricciones[MAX_RESTRICCIONES:]
+        self.tomadas[idx] += cantidad
+
+    def al_mezclar(self):
+        # todo el pozo menos el tope vuelve al mazo
+        for codigo in range(CANTIDAD_CODIGOS):
+            cantidad = self.pozo[codigo] - (codigo == self.codigo_tope)
+            if cantidad:
+                self.fuera_del_pozo[codigo] += cantidad
+                self.fuera_del_pozo_color[IDX_COLOR_CODIGO[codigo]] += cantidad
+                self.total_fuera_del_pozo += cantidad
+                self.pozo[codigo] -= cantidad
+
+    def al_terminar_turno(self, idx, carta_jugada, tomadas, cumplio):
+        pass  # ya se enteró de todo con los otros eventos
+
+    # --- consultas ---
+
+    def desconocidas(self, codigo):
+        """
+        Cartas de ese código que no vi: están en el mazo o en manos rivales
+        """
+        return self.fuera_del_pozo[codigo] - self.jugador.mano.conteo[codigo]
+
+    def desconocidas_color(self, idx_color):
+        return (
+            self.fuera_del_pozo_color[idx_color]
+            - self.jugador.mano.conteo_colores[idx_color]
+        )
+
+    def total_desconocidas(self):
+        return self.total_fuera_del_pozo - len(self.jugador.mano)
+
+    def esta_vacio(self, idx, idx_color):
+        """
+        True si el rival no tenía ese color y desde entonces no tomó cartas
+        """
+        desde = self.vacio_desde[idx][idx_color]
+        return desde is not None and self.tomadas[idx] == desde
+
+    def restricciones(self, idx):
+        """
+        Lista de (máscara, cantidad): el rival idx tiene como mucho
+        esa cantidad de cartas con código dentro de la máscara
+        """
+        return [
+            (mascara, self.tomadas[idx] - desde - usadas)
+            for mascara, desde, usadas in self._restricciones[idx]
+        ]
+
+    def prob_puede_seguir_color(self, idx, idx_color):
+        """
+        Probabilidad aproximada de que el rival idx tenga alguna carta del color.
+        Supone que sus cartas desconocidas salen al azar de las que no vi
+        (con reposición, para que sea O(1)).
+        """
+        total = self.total_desconocidas()
+        if total <= 0:
+            return 0.0
+        cartas = len(self.juego.jugadores[idx].mano)
+        desde = self.vacio_desde[idx][idx_color]
+        if desde is not None:
+            # solo pueden ser de ese color las que tomó después de quedar vacío
+            cartas = min(cartas, self.tomadas[idx] - desde)
+        p_color = self.desconocidas_color(idx_color) / total
+        return 1.0 - (1.0 - p_color) ** cartas
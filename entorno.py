@@ -0,0 +1,322 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app import (
+    ACUMULABLES,
+    CANTIDAD_CODIGOS,
+    JUGABLES,
+    Juego,
+    Jugador,
+    nombres_asientos,
+)
+from torneo import BOTS
+
+# acciones: jugar el código k (0 a CANTIDAD_CODIGOS - 1) o tomar (la última)
+ACCION_TOMAR = CANTIDAD_CODIGOS
+CANTIDAD_ACCIONES = CANTIDAD_CODIGOS + 1
+
+# observación (float32), por bloques:
+#   mano     cantidad de cada código en la mano propia
+#   tope     el código del tope del pozo (one-hot)
+#   vistas   cuántas de cada código pasaron por el pozo en la partida
+#   acumuladas, dirección (1 o -1), cartas en el mazo
+#   rivales  cartas en la mano de cada rival, en orden de asiento desde el agente
+MANO = slice(0, CANTIDAD_CODIGOS)
+TOPE = slice(CANTIDAD_CODIGOS, 2 * CANTIDAD_CODIGOS)
+VISTAS = slice(2 * CANTIDAD_CODIGOS, 3 * CANTIDAD_CODIGOS)
+ACUMULADAS = 3 * CANTIDAD_CODIGOS
+DIRECCION = ACUMULADAS + 1
+EN_MAZO = ACUMULADAS + 2
+RIVALES = ACUMULADAS + 3
+
+
+def tamano_observacion(jugadores):
+    return RIVALES + jugadores - 1
+
+
+class JugadorAgente(Jugador):
+    """
+    El asiento que maneja el aprendiz: juega la acción que le dejó el
+    entorno, con las reglas de EstadoJuego (con acción pendiente solo se
+    acumula o se cumple la penalidad). Dice Adná solo, como los bots.
+    """
+
+    def __init__(self, nombre):
+        super().__init__(nombre)
+        self.es_humano = False
+        self.accion = None
+
+    def jugar(self, juego):
+        accion, self.accion = self.accion, None
+        if accion == ACCION_TOMAR:
+            if juego.accion_pendiente:
+                self.tomar_cartas_del_mazo(juego.mazo, juego.cartas_acumuladas)
+                juego.cartas_acumuladas = 0
+                juego.accion_pendiente = None
+            else:
+                self.tomar_cartas_del_mazo(juego.mazo, 1)
+            return None
+
+        carta = self.jugar_codigo(accion, juego.mazo)
+        if len(self.mano) == 1:
+            self.dijo_adna = True
+        return carta
+
+
+class EntornoAdna:
+    """
+    Una partida contra bots con la interfaz de siempre de los entornos de
+    aprendizaje: reset() y step(accion), con la máscara de acciones legales
+    en info["mascara"]. La partida es un Juego de verdad (mismas reglas,
+    penalidades y bots); entre una acción y la siguiente juegan los rivales.
+
+    Recompensa 1 si gana el agente, -1 si gana otro y 0 mientras tanto.
+    Si la partida llega a max_turnos termina truncada, con 0.
+    """
+
+    def __init__(self, oponentes="DDD", asiento=0, max_turnos=None, semilla=None):
+        self.oponentes = oponentes
+        self.asiento = asiento
+        self.max_turnos = max_turnos
+        self.rng = random.Random(semilla)
+        self.juego = None
+        self.agente = None
+        self.cantidad_jugadores = len(oponentes) + 1
+        self.tamano_observacion = tamano_observacion(self.cantidad_jugadores)
+
+    def _armar_juego(self):
+        bots = iter(self.oponentes)
+        jugadores = []
+        for i, nombre in enumerate(nombres_asientos(self.cantidad_jugadores)):
+            if i == self.asiento:
+                self.agente = JugadorAgente(nombre)
+                jugadores.append(self.agente)
+            else:
+                jugadores.append(BOTS[next(bots)](nombre))
+        return Juego(
+            jugadores=jugadores,
+            headless=True,
+            max_turnos=self.max_turnos,
+            rng=self.rng,
+        )
+
+    # --- interfaz ---
+
+    def reset(self):
+        """
+        Empieza otra partida (reusando la mesa) y juega hasta que le toque
+        al agente. Devuelve (observación, info).
+        """
+        if self.juego is None:
+            self.juego = self._armar_juego()
+        else:
+            self.juego.reiniciar()
+        self.juego.preparar_partida()
+        self._jugar_rivales()
+        observacion, mascara = self._observar()
+        return observacion, {"mascara": mascara}
+
+    def step(self, accion):
+        """
+        Devuelve (observación, recompensa, terminado, truncado, info)
+        """
+        recompensa, terminado, truncado = self.paso(accion)
+        observacion, mascara = self._observar()
+        return observacion, recompensa, terminado, truncado, {"mascara": mascara}
+
+    def _observar(self):
+        observacion = np.zeros((1, self.tamano_observacion), dtype=np.float32)
+        mascara = np.zeros((1, CANTIDAD_ACCIONES), dtype=bool)
+        observar([self], observacion, mascara)
+        return observacion[0], mascara[0]
+
+    # --- lo que usa también la versión vectorizada ---
+
+    def paso(self, accion):
+        """
+        Aplica la acción y juegan los rivales. Devuelve (recompensa,
+        terminado, truncado), sin armar la observación
+        """
+        juego = self.juego
+        if juego.ganador is not None or self.agotado():
+            raise ValueError("La partida terminó, hay que llamar a reset()")
+        # un entero de NumPy no sirve para desplazar máscaras de más de 64 bits
+        accion = int(accion)
+        if not self.legales() >> accion & 1:
+            raise ValueError(f"Acción ilegal: {accion}")
+
+        self.agente.accion = accion
+        if juego.jugar_turno(self.agente):
+            juego.ganador = self.agente
+            return 1.0, True, False
+        juego.avanzar_turno()
+        self._jugar_rivales()
+        if juego.ganador is not None:
+            return -1.0, True, False
+        return 0.0, False, self.agotado()
+
+    def agotado(self):
+        juego = self.juego
+        return juego.max_turnos is not None and juego.turnos >= juego.max_turnos
+
+    def _jugar_rivales(self):
+        # el mismo bucle de Juego.jugar_ronda, hasta el próximo turno del agente
+        juego = self.juego
+        while not self.agotado():
+            jugador = juego.jugadores[juego.jugador_actual_idx]
+            juego.revisar_adna(jugador)
+            if juego.turno_activo:
+                if jugador is self.agente:
+                    return
+                if juego.jugar_turno(jugador):
+                    juego.ganador = jugador
+                    return
+            juego.avanzar_turno()
+
+    def manos_rivales(self):
+        # cartas de cada rival, en orden de asiento a partir del agente
+        jugadores = self.juego.jugadores
+        n = len(jugadores)
+        return [len(jugadores[(self.asiento + i) % n].mano) for i in range(1, n)]
+
+    def legales(self):
+        """
+        Máscara (int) de acciones legales: lo jugable sobre el tope, o solo
+        lo acumulable si hay acción pendiente, y siempre tomar
+        """
+        juego = self.juego
+        tope = juego.mazo.ver_tope_pozo().codigo
+        tabla = ACUMULABLES if juego.accion_pendiente else JUGABLES
+        return self.agente.mano.presentes & tabla[tope] | 1 << ACCION_TOMAR
+
+
+# la máscara de legales de un entorno, en bytes (cualquier cantidad de códigos)
+BYTES_ACCIONES = (CANTIDAD_ACCIONES + 7) // 8
+
+
+def observar(entornos, observaciones, mascaras):
+    """
+    Escribe la observación y la máscara de cada entorno en su fila de
+    observaciones y mascaras. Se arma todo junto con NumPy (una conversión
+    por bloque para todos los entornos) en vez de fila por fila.
+    """
+    juegos = [entorno.juego for entorno in entornos]
+    observaciones[:, MANO] = [entorno.agente.mano.conteo for entorno in entornos]
+    observaciones[:, TOPE] = 0.0
+    topes = [juego.mazo.ver_tope_pozo().codigo for juego in juegos]
+    observaciones[np.arange(len(entornos)), TOPE.start + np.array(topes)] = 1.0
+    observaciones[:, VISTAS] = [juego.mazo.vistas() for juego in juegos]
+    observaciones[:, ACUMULADAS] = [juego.cartas_acumuladas for juego in juegos]
+    observaciones[:, DIRECCION] = [juego.direccion for juego in juegos]
+    observaciones[:, EN_MAZO] = [len(juego.mazo.cartas) for juego in juegos]
+    observaciones[:, RIVALES:] = [entorno.manos_rivales() for entorno in entornos]
+
+    legales = b"".join(
+        entorno.legales().to_bytes(BYTES_ACCIONES, "little") for entorno in entornos
+    )
+    bits = np.frombuffer(legales, dtype=np.uint8).reshape(len(entornos), -1)
+    mascaras[:] = np.unpackbits(bits, axis=1, bitorder="little")[:, :CANTIDAD_ACCIONES]
+
+
+class EntornosVectorizados:
+    """
+    n entornos a la par: step() recibe un array con una acción por entorno
+    y devuelve todo en arrays (n filas). Las partidas que terminan vuelven
+    a empezar solas, y la observación que devuelven ya es la de la partida
+    nueva. Los arrays devueltos se reusan: el próximo step() los pisa.
+
+    Los asientos del agente se reparten rotando (entorno i en el asiento
+    i % jugadores), así aprende a jugar desde cualquier lugar de la mesa.
+    """
+
+    def __init__(self, n, oponentes="DDD", max_turnos=None, semilla=None):
+        jugadores = len(oponentes) + 1
+        self.entornos = [
+            EntornoAdna(
+                oponentes,
+                asiento=i % jugadores,
+                max_turnos=max_turnos,
+                semilla=None if semilla is None else f"{semilla}:{i}",
+            )
+            for i in range(n)
+        ]
+        self.n = n
+        self.observaciones = np.zeros((n, tamano_observacion(jugadores)), np.float32)
+        self.mascaras = np.zeros((n, CANTIDAD_ACCIONES), dtype=bool)
+        self.recompensas = np.zeros(n, dtype=np.float32)
+        self.terminados = np.zeros(n, dtype=bool)
+        self.truncados = np.zeros(n, dtype=bool)
+
+    def reset(self):
+        """
+        Devuelve (observaciones, máscaras)
+        """
+        for entorno in self.entornos:
+            entorno.reset()
+        observar(self.entornos, self.observaciones, self.mascaras)
+        return self.observaciones, self.mascaras
+
+    def step(self, acciones):
+        """
+        Devuelve (observaciones, recompensas, terminados, truncados, máscaras)
+        """
+        for i, entorno in enumerate(self.entornos):
+            recompensa, terminado, truncado = entorno.paso(int(acciones[i]))
+            self.recompensas[i] = recompensa
+            self.terminados[i] = terminado
+            self.truncados[i] = truncado
+            if terminado or truncado:
+                entorno.reset()
+        observar(self.entornos, self.observaciones, self.mascaras)
+        return (
+            self.observaciones,
+            self.recompensas,
+            self.terminados,
+            self.truncados,
+            self.mascaras,
+        )
+
+
+def acciones_al_azar(mascaras, rng):
+    """
+    Una acción legal al azar por fila (para probar, o como política base)
+    """
+    puntajes = rng.random(mascaras.shape)
+    puntajes[~mascaras] = -1.0
+    return puntajes.argmax(axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Juega con acciones al azar en entornos vectorizados"
+    )
+    parser.add_argument("pasos", type=int)
+    parser.add_argument("--entornos", type=int, default=256)
+    parser.add_argument("--oponentes", default="DDD")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    entornos = EntornosVectorizados(
+        args.entornos, oponentes=args.oponentes, semilla=args.semilla
+    )
+    rng = np.random.default_rng(args.semilla)
+    _, mascaras = entornos.reset()
+    ganadas = perdidas = cortadas = 0
+    inicio = time.perf_counter()
+    for _ in range(args.pasos):
+        _, recompensas, terminados, truncados, mascaras = entornos.step(
+            acciones_al_azar(mascaras, rng)
+        )
+        ganadas += int((recompensas > 0).sum())
+        perdidas += int((recompensas < 0).sum())
+        cortadas += int(truncados.sum())
+    segundos = time.perf_counter() - inicio
+    partidas = ganadas + perdidas + cortadas
+    print(f"{args.pasos * args.entornos / segundos:.0f} pasos/s")
+    print(
+        f"Partidas: {partidas}, ganadas al azar: {ganadas / max(partidas, 1):.1%}, "
+        f"cortadas: {cortadas}"
+    )
@@ -0,0 +1,384 @@
+from app import (
+    ACUMULABLES,
+    CARTAS_CODIGO,
+    CARTAS_PENALIDAD_ADNA,
+    COLORES,
+    ES_ACCION_CODIGO,
+    IDX_COLOR_CODIGO,
+    ESTRATEGIA_B,
+    ESTRATEGIA_D,
+    JUGABLES,
+    JugadorBotB,
+    JugadorBotD,
+    JugadorHeuristico,
+    Reglas,
+    codigos_de,
+)
+from eventos import SalidaNula
+
+# jugada "tomar del mazo": 1 carta, o las acumuladas si hay acción pendiente
+TOMAR = -1
+# no es una jugada que se elija: el que quedó con una carta sin decir Adná
+# toma la penalidad (2) y pierde el turno (como Juego.revisar_adna)
+PENALIDAD_ADNA = -2
+
+
+class EstadoJuego(Reglas):
+    """
+    Foto compacta de una partida para búsquedas (lookahead, Monte Carlo).
+    Todo son códigos de carta y listas de enteros, así copiarlo es barato,
+    y las jugadas se pueden hacer y deshacer sin copiar.
+    Los efectos de las cartas de acción y el paso de turno son los de Reglas,
+    los mismos que usa Juego. Al jugar se asume que todos dicen Adná; al
+    que ya había quedado sin decirlo se le cobra con hacer(PENALIDAD_ADNA).
+    """
+
+    headless = True
+    eventos = SalidaNula()  # las reglas no cuentan nada
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.mazo = []  # códigos, el tope es el último
+        self.pozo = []
+        self.colores_pozo = [0] * len(COLORES)  # como los conteos del Mazo
+        self.manos = []  # por jugador, cantidad de cada código
+        self.presentes = []  # por jugador, máscara de códigos que tiene
+        self.cantidades = []  # por jugador, cantidad de cartas
+        self.cantidad_jugadores = 0
+        self.jugador_actual_idx = 0
+        self.direccion = 1
+        self.turno_activo = True
+        self.cartas_acumuladas = 0
+        self.accion_pendiente = None
+        self.ganador = None
+        # jugadores que quedaron con una carta sin decir Adná (lo usan los
+        # turnos de bots de abajo y hacer(PENALIDAD_ADNA); al jugar con hacer()
+        # se asume que todos lo dicen)
+        self.sin_adna = []
+        self.historial = []  # para deshacer
+
+    @classmethod
+    def desde_juego(cls, juego, rng=None):
+        """
+        Saca la foto de un Juego en curso
+        """
+        estado = cls(rng if rng is not None else juego.mazo.rng)
+        estado.mazo = [carta.codigo for carta in juego.mazo.cartas]
+        estado.pozo = [carta.codigo for carta in juego.mazo.pozo]
+        estado.colores_pozo = [
+            juego.mazo.cantidad_color_pozo(i) for i in range(len(COLORES))
+        ]
+        estado.manos = [list(j.mano.conteo) for j in juego.jugadores]
+        estado.presentes = [j.mano.presentes for j in juego.jugadores]
+        estado.cantidades = [len(j.mano) for j in juego.jugadores]
+        estado.cantidad_jugadores = len(juego.jugadores)
+        estado.sin_adna = [
+            len(j.mano) == 1 and not j.dijo_adna for j in juego.jugadores
+        ]
+        estado.jugador_actual_idx = juego.jugador_actual_idx
+        estado.direccion = juego.direccion
+        estado.cartas_acumuladas = juego.cartas_acumuladas
+        estado.accion_pendiente = juego.accion_pendiente
+        if juego.ganador is not None:
+            estado.ganador = juego.jugadores.index(juego.ganador)
+        return estado
+
+    def copiar(self):
+        """
+        Copia independiente (sin historial)
+        """
+        estado = EstadoJuego(self.rng)
+        estado.mazo = self.mazo[:]
+        estado.pozo = self.pozo[:]
+        estado.colores_pozo = self.colores_pozo[:]
+        estado.manos = [mano[:] for mano in self.manos]
+        estado.presentes = self.presentes[:]
+        estado.cantidades = self.cantidades[:]
+        estado.cantidad_jugadores = self.cantidad_jugadores
+        estado.sin_adna = self.sin_adna[:]
+        estado.jugador_actual_idx = self.jugador_actual_idx
+        estado.direccion = self.direccion
+        estado.turno_activo = self.turno_activo
+        estado.cartas_acumuladas = self.cartas_acumuladas
+        estado.accion_pendiente = self.accion_pendiente
+        estado.ganador = self.ganador
+        return estado
+
+    def tope(self):
+        return self.pozo[-1]
+
+    def cantidad_color_pozo(self, idx_color):
+        return self.colores_pozo[idx_color]
+
+    def jugables(self):
+        """
+        Máscara de códigos legales para el jugador actual (sin contar TOMAR)
+        """
+        if self.accion_pendiente:
+            return self.presentes[self.jugador_actual_idx] & ACUMULABLES[self.tope()]
+        return self.presentes[self.jugador_actual_idx] & JUGABLES[self.tope()]
+
+    def jugadas_legales(self):
+        """
+        Códigos que el jugador actual puede jugar, más TOMAR.
+        Con acción pendiente solo se puede acumular o cumplir la penalidad.
+        """
+        return list(codigos_de(self.jugables())) + [TOMAR]
+
+    def terminado(self):
+        return self.ganador is not None
+
+    # --- hacer / deshacer ---
+
+    def hacer(self, jugada):
+        """
+        Aplica la jugada del jugador actual y pasa el turno
+        """
+        registro = (
+            jugada,
+            self.jugador_actual_idx,
+            self.direccion,
+            self.cartas_acumuladas,
+            self.accion_pendiente,
+            self.ganador,
+            [],  # cartas tomadas y mezclas, en orden
+        )
+        idx = self.jugador_actual_idx
+
+        if jugada == TOMAR:
+            cantidad = self.cartas_acumuladas if self.accion_pendiente else 1
+            for _ in range(cantidad):
+                codigo = self._sacar(registro[6])
+                if codigo is None:
+                    break
+                self._agregar(idx, codigo)
+            self.cartas_acumuladas = 0
+            self.accion_pendiente = None
+        elif jugada == PENALIDAD_ADNA:
+            # lo pendiente queda para el siguiente
+            for _ in range(CARTAS_PENALIDAD_ADNA):
+                codigo = self._sacar(registro[6])
+                if codigo is None:
+                    break
+                self._agregar(idx, codigo)
+            self.sin_adna[idx] = False
+        else:
+            self._quitar(idx, jugada)
+            self.pozo.append(jugada)
+            self.colores_pozo[IDX_COLOR_CODIGO[jugada]] += 1
+            if not self.cantidades[idx]:
+                self.ganador = idx
+            self.procesar_accion(CARTAS_CODIGO[jugada])
+
+        self.avanzar_turno()
+        self.historial.append(registro)
+
+    def deshacer(self):
+        """
+        Vuelve atrás la última jugada hecha con hacer()
+        """
+        (
+            jugada,
+            self.jugador_actual_idx,
+            self.direccion,
+            self.cartas_acumuladas,
+            self.accion_pendiente,
+            self.ganador,
+            sacadas,
+        ) = self.historial.pop()
+        self.turno_activo = True
+        idx = self.jugador_actual_idx
+
+        if jugada == PENALIDAD_ADNA:
+            self.sin_adna[idx] = True
+        if jugada in (TOMAR, PENALIDAD_ADNA):
+            for sacada in reversed(sacadas):
+                if isinstance(sacada, int):
+                    self._quitar(idx, sacada)
+                    self.mazo.append(sacada)
+                else:
+                    # había una mezcla: vuelvo al mazo vacío y al pozo de antes
+                    self.mazo, self.pozo, self.colores_pozo = sacada
+        else:
+            self.pozo.pop()
+            self.colores_pozo[IDX_COLOR_CODIGO[jugada]] -= 1
+            self._agregar(idx, jugada)
+
+    # --- para repetir en simulaciones lo que hacen los bots de app.py ---
+    # (no se pueden deshacer, se usan sobre copias)
+
+    def tomar(self, cantidad):
+        """
+        El jugador actual toma cartas sin pasar el turno ni tocar lo pendiente
+        """
+        idx = self.jugador_actual_idx
+        for _ in range(cantidad):
+            codigo = self._sacar([])
+            if codigo is None:
+                break
+            self._agregar(idx, codigo)
+
+    def cumplir_penalidad(self):
+        """
+        El jugador actual toma las cartas acumuladas, sin pasar el turno
+        """
+        self.tomar(self.cartas_acumuladas)
+        self.cartas_acumuladas = 0
+        self.accion_pendiente = None
+
+    def _sacar(self, sacadas):
+        if not self.mazo:
+            if len(self.pozo) <= 1:
+                return None  # no hay nada para mezclar
+            # mismas reglas que Mazo.regenerar_mazo: el tope se queda
+            sacadas.append((self.mazo, self.pozo, self.colores_pozo))
+            self.mazo = self.pozo[:-1]
+            self.pozo = self.pozo[-1:]
+            self.colores_pozo = [0] * len(COLORES)
+            self.colores_pozo[IDX_COLOR_CODIGO[self.pozo[0]]] = 1
+            self.rng.shuffle(self.mazo)
+        codigo = self.mazo.pop()
+        sacadas.append(codigo)
+        return codigo
+
+    def _agregar(self, idx, codigo):
+        self.manos[idx][codigo] += 1
+        self.presentes[idx] |= 1 << codigo
+        self.cantidades[idx] += 1
+
+    def _quitar(self, idx, codigo):
+        mano = self.manos[idx]
+        mano[codigo] -= 1
+        if not mano[codigo]:
+            self.presentes[idx] &= ~(1 << codigo)
+        self.cantidades[idx] -= 1
+
+    def clave(self):
+        """
+        Tupla hasheable con todo el estado (para tablas de transposición)
+        """
+        return (
+            tuple(self.mazo),
+            tuple(self.pozo),
+            tuple(tuple(mano) for mano in self.manos),
+            self.jugador_actual_idx,
+            self.direccion,
+            self.cartas_acumuladas,
+            self.accion_pendiente,
+            self.ganador,
+        )
+
+
+# --- los bots de app.py como políticas sobre el estado (para rollouts) ---
+
+
+def _conteo_colores(mano):
+    conteo = [0] * len(COLORES)
+    for codigo, cantidad in enumerate(mano):
+        conteo[IDX_COLOR_CODIGO[codigo]] += cantidad
+    return conteo
+
+
+def politica(estrategia):
+    """
+    La jugada que haría un bot con esa Estrategia siguiendo las reglas
+    """
+    decidir = estrategia.decidir
+    usa_mano = estrategia.usa_mano
+
+    def jugada(estado):
+        mano = None
+        if usa_mano:
+            mano = _conteo_colores(estado.manos[estado.jugador_actual_idx])
+        codigo = decidir(estado.jugables(), estado.tope(), mano, estado.colores_pozo)
+        return TOMAR if codigo is None else codigo
+
+    return jugada
+
+
+POLITICAS = {
+    "B": politica(ESTRATEGIA_B),
+    "D": politica(ESTRATEGIA_D),
+}
+
+
+# --- turnos completos tal como los juegan los bots en Juego ---
+# Los bots no siempre siguen las reglas: con una acción en el tope y nada
+# para acumular, B cumple la penalidad (aunque no haya nada pendiente) y pasa,
+# y D la cumple y después igual juega. Para predecir a un rival hay que
+# simularlo como juega de verdad, no como debería.
+
+
+def _penalidad_adna(estado):
+    # como Juego.jugar_ronda: toma la penalidad y pierde el turno
+    idx = estado.jugador_actual_idx
+    if estado.cantidades[idx] == 1 and estado.sin_adna[idx]:
+        estado.tomar(CARTAS_PENALIDAD_ADNA)
+        estado.sin_adna[idx] = False
+        estado.avanzar_turno()
+        return True
+    return False
+
+
+def _jugar_o_tomar(estado, codigo):
+    idx = estado.jugador_actual_idx
+    if codigo is None:
+        estado.tomar(1)  # sin tocar lo pendiente, como Jugador.tomar_cartas_del_mazo
+        estado.sin_adna[idx] = estado.cantidades[idx] == 1
+        estado.avanzar_turno()
+    else:
+        estado.hacer(codigo)
+        estado.sin_adna[idx] = False  # los bots dicen Adná al jugar
+
+
+def turno_heuristico(estrategia):
+    """
+    Turno completo de un JugadorHeuristico con esa Estrategia, como lo juega
+    en Juego (mañas incluidas)
+    """
+    decidir = estrategia.decidir
+    usa_mano = estrategia.usa_mano
+    cumple_y_juega = estrategia.cumple_y_juega
+
+    def turno(estado):
+        if _penalidad_adna(estado):
+            return
+        idx = estado.jugador_actual_idx
+        tope = estado.tope()
+        jugables = estado.presentes[idx] & JUGABLES[tope]
+        penalidad = ES_ACCION_CODIGO[tope] and not jugables & ACUMULABLES[tope]
+        if penalidad and not cumple_y_juega:
+            estado.cumplir_penalidad()
+            estado.sin_adna[idx] = estado.cantidades[idx] == 1
+            estado.avanzar_turno()
+            return
+        # elige con la mano de antes de cumplir, como en Juego
+        mano = _conteo_colores(estado.manos[idx]) if usa_mano else None
+        codigo = decidir(jugables, tope, mano, estado.colores_pozo)
+        if penalidad:
+            estado.cumplir_penalidad()
+        _jugar_o_tomar(estado, codigo)
+
+    return turno
+
+
+TURNOS = {
+    JugadorBotB: turno_heuristico(ESTRATEGIA_B),
+    JugadorBotD: turno_heuristico(ESTRATEGIA_D),
+}
+
+
+def turno_de(clase):
+    """
+    El turno de TURNOS para esa clase de jugador; los bots heurísticos que
+    no estaban se agregan la primera vez (si eligen con su Estrategia, no
+    con otro elegir). None si no se sabe simularlo.
+    """
+    turno = TURNOS.get(clase)
+    if (
+        turno is None
+        and issubclass(clase, JugadorHeuristico)
+        and clase.elegir is JugadorHeuristico.elegir
+    ):
+        turno = TURNOS[clase] = turno_heuristico(clase.estrategia)
+    return turno
@@ -0,0 +1,107 @@
+from collections import namedtuple
+
+# tipos de evento de la partida
+INICIO = "inicio"
+VUELTA = "vuelta"  # carta de acción dada vuelta al iniciar el pozo
+POZO_INICIAL = "pozo_inicial"
+MEZCLA = "mezcla"
+SIN_CARTAS = "sin_cartas"
+TURNO = "turno"
+TOMA = "toma"
+JUGADA = "jugada"
+REVERSA = "reversa"
+SALTA = "salta"
+ACUMULACION = "acumulacion"
+PENALIDAD_ADNA = "penalidad_adna"
+GANADOR = "ganador"
+# lo que cuentan los bots de sus decisiones
+PENALIDAD = "penalidad"  # cumple la acumulación del pozo
+ESTRATEGIA = "estrategia"
+JUGADA_BOT = "jugada_bot"
+ADNA = "adna"
+NO_PUEDE = "no_puede"
+BUSQUEDA = "busqueda"
+
+# cómo se muestra cada evento en la terminal
+MENSAJES = {
+    INICIO: "Iniciando partida de ADNA!",
+    VUELTA: "Salió una carta de acción ({carta}). Agarrando la siguiente...",
+    POZO_INICIAL: "El pozo inicia con: {carta}",
+    MEZCLA: "Mezclando el pozo...",
+    SIN_CARTAS: "no hay más cartas en juego! no ganó nadie...",
+    TURNO: "\n--- Turno de {jugador} ---",
+    TOMA: "{jugador} toma {cantidad} carta(s).",
+    JUGADA: "{jugador} juega: {carta}",
+    REVERSA: "¡Cambia el sentido! Nueva dirección: {direccion}",
+    SALTA: "¡Salta! {jugador} pierde el turno.",
+    ACUMULACION: (
+        "¡Acumulación! Próximo jugador debe tomar {cantidad} cartas "
+        "o jugar otro '{accion}'."
+    ),
+    PENALIDAD_ADNA: "¡{jugador} no dijo 'Adná!'! Penalidad.",
+    GANADOR: "\n¡¡¡ {jugador} ha ganado la partida !!!",
+    PENALIDAD: "Bot {bot} no puede jugar, cumple penalidad",
+    ESTRATEGIA: "Bot {bot}: {motivo} {carta}",
+    JUGADA_BOT: "Bot {bot}: Jugando carta {carta}",
+    ADNA: "Bot {bot} dice Adná!",
+    NO_PUEDE: "Bot {bot}: no puedo hacer nada, tomo carta",
+    BUSQUEDA: "Bot {bot}: {simulaciones} simulaciones, {nodos_por_segundo:.0f} nodos/s",
+}
+
+# un evento guardado: tipo y sus datos (dict con jugador, carta, cantidad...)
+Evento = namedtuple("Evento", ["tipo", "datos"])
+
+
+class SalidaNula:
+    """
+    Descarta todo sin formatear nada. Es la de las simulaciones headless.
+    """
+
+    activa = False
+
+    def emitir(self, tipo, **datos):
+        pass
+
+
+class SalidaTerminal:
+    """
+    Imprime cada evento con su mensaje, como siempre se jugó por consola
+    """
+
+    activa = True
+
+    def emitir(self, tipo, **datos):
+        print(MENSAJES[tipo].format(**datos))
+
+
+class SalidaBuffer:
+    """
+    Guarda los eventos tal cual (sin formatear) para revisarlos después.
+    Las cartas quedan como objetos Carta, los jugadores como nombres.
+    """
+
+    activa = True
+
+    def __init__(self):
+        self.eventos = []
+
+    def emitir(self, tipo, **datos):
+        self.eventos.append(Evento(tipo, datos))
+
+    def de_tipo(self, tipo):
+        return [evento for evento in self.eventos if evento.tipo == tipo]
+
+    def vaciar(self):
+        """
+        Devuelve los eventos guardados y empieza de cero
+        """
+        eventos, self.eventos = self.eventos, []
+        return eventos
+
+    def texto(self):
+        """
+        Los mensajes que hubiera impreso la terminal
+        """
+        return "\n".join(
+            MENSAJES[evento.tipo].format(**evento.datos) for evento in self.eventos
+        )
@@ -0,0 +1,188 @@
+class Histograma:
+    """
+    Histograma log-lineal: cada potencia de 2 se parte en 8 cubetas, así el
+    error de un percentil es de 12% como mucho sin guardar los valores.
+    Ocupa poco y se combina sumando.
+    """
+
+    SUBCUBETAS = 8  # por potencia de 2 (tiene que ser potencia de 2)
+    CUBETAS = 8 * 48
+
+    def __init__(self):
+        self.cubetas = [0] * self.CUBETAS
+        self.cantidad = 0
+        self.total = 0
+        self.maximo = 0
+
+    @classmethod
+    def cubeta(cls, valor):
+        # los valores chicos van cada uno a su cubeta, los grandes se agrupan
+        # por sus 4 bits más altos
+        exponente = max(valor.bit_length() - 4, 0)
+        return min(exponente * cls.SUBCUBETAS + (valor >> exponente), cls.CUBETAS - 1)
+
+    @classmethod
+    def techo(cls, cubeta):
+        # el valor más grande que cae en la cubeta
+        if cubeta < 2 * cls.SUBCUBETAS:
+            return cubeta
+        exponente = cubeta // cls.SUBCUBETAS - 1
+        return ((cubeta % cls.SUBCUBETAS + cls.SUBCUBETAS + 1) << exponente) - 1
+
+    def agregar(self, valor):
+        self.cubetas[self.cubeta(valor)] += 1
+        self.cantidad += 1
+        self.total += valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def combinar(self, otro):
+        self.cubetas = [a + b for a, b in zip(self.cubetas, otro.cubetas)]
+        self.cantidad += otro.cantidad
+        self.total += otro.total
+        self.maximo = max(self.maximo, otro.maximo)
+        return self
+
+    def promedio(self):
+        return self.total / self.cantidad if self.cantidad else 0.0
+
+    def percentil(self, p):
+        """
+        Cota de arriba del percentil p (el borde de su cubeta)
+        """
+        if not self.cantidad:
+            return 0
+        objetivo = self.cantidad * p / 100
+        acumulado = 0
+        for k, cuenta in enumerate(self.cubetas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(self.techo(k), self.maximo)
+        return self.maximo
+
+    def como_dict(self):
+        return {
+            "cantidad": self.cantidad,
+            "promedio": self.promedio(),
+            "p50": self.percentil(50),
+            "p90": self.percentil(90),
+            "p99": self.percentil(99),
+            "maximo": self.maximo,
+            # solo las que tienen algo: techo de la cubeta -> cantidad
+            "cubetas": {
+                self.techo(k): cuenta for k, cuenta in enumerate(self.cubetas) if cuenta
+            },
+        }
+
+
+class Instrumentacion:
+    """
+    Mediciones de cada turno para encontrar qué bot o qué regla se come el
+    tiempo: cuánto tarda cada jugar() (en ns), tomas, penalidades, mezclas,
+    turnos por partida y la mano más grande. Se le pasa a Juego (o a
+    simular / torneo) y junta todas las partidas que se jueguen con ella.
+    Con por_clase las latencias se agrupan por tipo de jugador en vez de
+    por nombre (en los torneos los nombres son asientos).
+    """
+
+    def __init__(self, por_clase=False):
+        self.por_clase = por_clase
+        self.latencias = {}  # por jugador (o clase), Histograma en ns
+        self.partidas = 0
+        self.turnos = Histograma()  # turnos por partida
+        self.jugadas = 0
+        self.tomas = 0  # turnos en los que se tomaron cartas
+        self.cartas_tomadas = 0
+        self.penalidades_toma = 0  # acumulaciones de Toma cumplidas
+        self.penalidades_adna = 0
+        self.mezclas = 0
+        self.mano_maxima = 0
+
+    # --- lo que llama Juego ---
+
+    def al_jugar(self, jugador, segundos, carta_jugada, cartas_antes, pendiente, juego):
+        clave = type(jugador).__name__ if self.por_clase else jugador.nombre
+        latencias = self.latencias.get(clave)
+        if latencias is None:
+            latencias = self.latencias[clave] = Histograma()
+        latencias.agregar(int(segundos * 1e9))
+
+        cartas = len(jugador.mano)
+        tomadas = cartas - cartas_antes
+        if carta_jugada:
+            self.jugadas += 1
+            tomadas += 1
+        if tomadas:
+            self.tomas += 1
+            self.cartas_tomadas += tomadas
+        if pendiente is not None and juego.accion_pendiente is None:
+            self.penalidades_toma += 1
+        if cartas > self.mano_maxima:
+            self.mano_maxima = cartas
+
+    def al_penalidad_adna(self, jugador):
+        self.penalidades_adna += 1
+        self.mano_maxima = max(self.mano_maxima, len(jugador.mano))
+
+    def al_terminar_partida(self, juego):
+        self.partidas += 1
+        self.turnos.agregar(juego.turnos)
+        self.mezclas += juego.mazo.mezclas
+
+    # --- resultados ---
+
+    def combinar(self, otra):
+        for clave, latencias in otra.latencias.items():
+            self.latencias.setdefault(clave, Histograma()).combinar(latencias)
+        self.partidas += otra.partidas
+        self.turnos.combinar(otra.turnos)
+        self.jugadas += otra.jugadas
+        self.tomas += otra.tomas
+        self.cartas_tomadas += otra.cartas_tomadas
+        self.penalidades_toma += otra.penalidades_toma
+        self.penalidades_adna += otra.penalidades_adna
+        self.mezclas += otra.mezclas
+        self.mano_maxima = max(self.mano_maxima, otra.mano_maxima)
+        return self
+
+    def como_dict(self):
+        """
+        Todo en tipos de JSON, para guardar o comparar corridas
+        """
+        return {
+            "partidas": self.partidas,
+            "turnos": self.turnos.como_dict(),
+            "jugadas": self.jugadas,
+            "tomas": self.tomas,
+            "cartas_tomadas": self.cartas_tomadas,
+            "penalidades_toma": self.penalidades_toma,
+            "penalidades_adna": self.penalidades_adna,
+            "mezclas": self.mezclas,
+            "mano_maxima": self.mano_maxima,
+            "latencias_ns": {
+                clave: latencias.como_dict()
+                for clave, latencias in sorted(self.latencias.items())
+            },
+        }
+
+    def resumen(self):
+        partidas = max(self.partidas, 1)
+        lineas = [
+            f"Turnos por partida: {self.turnos.promedio():.1f} "
+            f"(p99 <= {self.turnos.percentil(99)}, máximo {self.turnos.maximo})",
+            f"Jugadas: {self.jugadas}, tomas: {self.tomas} "
+            f"({self.cartas_tomadas} cartas)",
+            f"Penalidades por partida: Toma {self.penalidades_toma / partidas:.2f}, "
+            f"Adná {self.penalidades_adna / partidas:.3f}",
+            f"Mezclas por partida: {self.mezclas / partidas:.3f}",
+            f"Mano más grande: {self.mano_maxima}",
+            "Latencia de jugar() (µs): promedio / p50 / p99 / máximo",
+        ]
+        for clave, latencias in sorted(self.latencias.items()):
+            lineas.append(
+                f"  {clave}: {latencias.promedio() / 1000:.1f} / "
+                f"{latencias.percentil(50) / 1000:.1f} / "
+                f"{latencias.percentil(99) / 1000:.1f} / "
+                f"{latencias.maximo / 1000:.1f} ({latencias.cantidad} turnos)"
+            )
+        return "\n".join(lineas)
@@ -0,0 +1,388 @@
+import argparse
+import math
+import random
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from app import (
+    ACUMULABLES,
+    CANTIDAD_CODIGOS,
+    CARTAS_MANO,
+    CARTAS_PENALIDAD_ADNA,
+    COLORES,
+    EFECTO_CODIGO,
+    ES_ACCION_CODIGO,
+    ES_TOMA_CODIGO,
+    IDX_COLOR_CODIGO,
+    JUGABLES,
+    MAX_TURNOS_SIMULACION,
+    TOMA_CODIGO,
+    Juego,
+    JugadorBotD,
+    ResultadoPartida,
+    cantidad_mazos,
+)
+from creencias import COPIAS_CODIGO
+from reglamento import EFECTO_REVERSA, EFECTO_SALTA
+
+# el motor juega siempre cuatro bots D, como simular() con clases=[D] * 4
+JUGADORES = 4
+CARTAS_INICIALES = CARTAS_MANO
+
+# las tablas de app.py pasadas a arrays: [tope, código]
+JUGABLES_NP = np.array(
+    [[t >> c & 1 for c in range(CANTIDAD_CODIGOS)] for t in JUGABLES], dtype=bool
+)
+ACUMULABLES_NP = np.array(
+    [[t >> c & 1 for c in range(CANTIDAD_CODIGOS)] for t in ACUMULABLES], dtype=bool
+)
+ES_ACCION_NP = np.array(ES_ACCION_CODIGO)
+ES_TOMA_NP = np.array(ES_TOMA_CODIGO)
+IDX_COLOR_NP = np.array(IDX_COLOR_CODIGO)
+ES_REVERSA_NP = np.array(EFECTO_CODIGO) == EFECTO_REVERSA
+ES_SALTA_NP = np.array(EFECTO_CODIGO) == EFECTO_SALTA
+SUMA_TOMA_NP = np.array(TOMA_CODIGO)
+
+# lo que vale jugar una acción que no acumula para JugadorBotD: primero
+# las que no son Toma (las numéricas valen 10 + cartas de su color)
+PUNTAJE_ACCION = np.where(ES_TOMA_NP, 1, 2).astype(np.int16)
+
+# un mazo sin mezclar, como códigos (los que usa Juego para cuatro)
+MAZO_BASE = np.tile(
+    np.repeat(np.arange(CANTIDAD_CODIGOS), COPIAS_CODIGO), cantidad_mazos(JUGADORES)
+)
+CARTAS_MAZO = len(MAZO_BASE)
+
+
+class MotorVectorizado:
+    """
+    N partidas de cuatro bots D jugadas a la par con arrays de NumPy.
+    Cada paso() avanza todas las partidas en juego una vuelta del bucle de
+    Juego.jugar_ronda (un turno, o la penalidad por no decir Adná), con las
+    mismas reglas y las mismas mañas del bot D: con una acción en el tope y
+    nada para acumular cumple la penalidad y después igual juega, y tomar
+    una carta no borra la acción pendiente.
+
+    El mazo y el pozo de cada partida son filas de códigos (el tope es la
+    última carta válida), y las manos son cantidades de cada código.
+    mazos es opcional: una lista de órdenes iniciales (como Mazo.cartas, en
+    códigos) para jugar las mismas partidas que el motor de referencia.
+    """
+
+    def __init__(self, n, max_turnos=None, semilla=None, mazos=None):
+        self.n = n
+        self.rng = np.random.default_rng(semilla)
+        self.max_turnos = MAX_TURNOS_SIMULACION if max_turnos is None else max_turnos
+
+        if mazos is None:
+            claves = self.rng.random((n, CARTAS_MAZO))
+            self.mazo = MAZO_BASE[np.argsort(claves, axis=1)]
+        else:
+            self.mazo = np.array(mazos, dtype=np.int64).reshape(n, CARTAS_MAZO)
+        self.n_mazo = np.full(n, CARTAS_MAZO)
+        self.pozo = np.zeros((n, CARTAS_MAZO), dtype=np.int64)
+        self.n_pozo = np.zeros(n, dtype=np.int64)
+
+        self.manos = np.zeros((n, JUGADORES, CANTIDAD_CODIGOS), dtype=np.int16)
+        self.cantidades = np.zeros((n, JUGADORES), dtype=np.int64)
+        self.dijo_adna = np.zeros((n, JUGADORES), dtype=bool)
+
+        self.actual = np.zeros(n, dtype=np.int64)
+        self.direccion = np.ones(n, dtype=np.int64)
+        self.acumuladas = np.zeros(n, dtype=np.int64)
+        self.turnos = np.zeros(n, dtype=np.int64)
+        self.mezclas = np.zeros(n, dtype=np.int64)
+        self.ganador = np.full(n, -1)
+        self.en_juego = np.ones(n, dtype=bool)
+
+        self.iniciar_pozo()
+        self.repartir_inicial()
+
+    def iniciar_pozo(self):
+        """
+        Como Mazo.iniciar_pozo: se dan vuelta cartas hasta la primera numérica
+        y todas quedan en el pozo
+        """
+        dadas_vuelta = self.mazo[:, ::-1]
+        vueltas = np.argmax(~ES_ACCION_NP[dadas_vuelta], axis=1) + 1
+        hasta = vueltas.max()
+        self.pozo[:, :hasta] = dadas_vuelta[:, :hasta]
+        self.n_pozo[:] = vueltas
+        self.n_mazo -= vueltas
+
+    def repartir_inicial(self):
+        todas = np.arange(self.n)
+        for i in range(CARTAS_INICIALES * JUGADORES):
+            jugador = np.full(self.n, i % JUGADORES)
+            self._tomar(todas, jugador, np.ones(self.n, dtype=np.int64))
+
+    # --- un paso para todas las partidas ---
+
+    def paso(self):
+        """
+        Avanza una vuelta todas las partidas en juego.
+        Devuelve cuántas siguen en juego.
+        """
+        # las que llegaron al tope de turnos se cortan sin ganador
+        self.en_juego &= self.turnos < self.max_turnos
+        g = np.flatnonzero(self.en_juego)
+        if not len(g):
+            return 0
+        p = self.actual[g]
+
+        # con una carta y sin haber dicho Adná: toma la penalidad y pierde
+        # el turno
+        penalizados = (self.cantidades[g, p] == 1) & ~self.dijo_adna[g, p]
+        if penalizados.any():
+            gp, pp = g[penalizados], p[penalizados]
+            self._tomar(gp, pp, np.full(len(gp), CARTAS_PENALIDAD_ADNA))
+            self.dijo_adna[gp, pp] = False
+            self._avanzar(gp)
+            g, p = g[~penalizados], p[~penalizados]
+
+        self.turnos[g] += 1
+        self._turno_bot_d(g, p)
+        return int(self.en_juego.sum())
+
+    def _turno_bot_d(self, g, p):
+        tope = self.pozo[g, self.n_pozo[g] - 1]
+        mano = self.manos[g, p]
+
+        # JugadorBotD.elegir con puntajes: acumular, después la numérica del
+        # color que más tiene, después acciones que no son Toma; argmax se
+        # queda con el primer código empatado, igual que max() y min()
+        jugables = (mano > 0) & JUGABLES_NP[tope]
+        acumulables = jugables & ACUMULABLES_NP[tope]
+        colores = mano.reshape(len(g), len(COLORES), -1).sum(axis=2)
+        puntajes = np.where(ES_ACCION_NP, PUNTAJE_ACCION, colores[:, IDX_COLOR_NP] + 10)
+        puntajes += 1000 * acumulables
+        puntajes[~jugables] = -1
+        codigo = puntajes.argmax(axis=1)
+        juega = puntajes[np.arange(len(g)), codigo] >= 0
+
+        # sin nada para acumular sobre una acción cumple la penalidad (con lo
+        # acumulado, que puede ser 0) y sigue con lo que había elegido
+        penalidad = ES_ACCION_NP[tope] & ~acumulables.any(axis=1)
+        if penalidad.any():
+            gp, pp = g[penalidad], p[penalidad]
+            self._tomar(gp, pp, self.acumuladas[gp])
+            self.acumuladas[gp] = 0
+            self.dijo_adna[gp, pp] = False
+
+        # no puede jugar: toma 1 (lo pendiente queda como estaba)
+        toman = ~juega
+        if toman.any():
+            gt, pt = g[toman], p[toman]
+            self._tomar(gt, pt, np.ones(len(gt), dtype=np.int64))
+            self.dijo_adna[gt, pt] = False
+
+        # juega la carta elegida
+        gj, pj, cj = g[juega], p[juega], codigo[juega]
+        self.manos[gj, pj, cj] -= 1
+        self.cantidades[gj, pj] -= 1
+        self.pozo[gj, self.n_pozo[gj]] = cj
+        self.n_pozo[gj] += 1
+        quedan = self.cantidades[gj, pj]
+        self.dijo_adna[gj[quedan == 1], pj[quedan == 1]] = True
+
+        ganaron = quedan == 0
+        self.ganador[gj[ganaron]] = pj[ganaron]
+        self.en_juego[gj[ganaron]] = False
+
+        # efectos de la carta (Reglas.procesar_accion)
+        sigue = ~ganaron
+        gj, cj = gj[sigue], cj[sigue]
+        self.direccion[gj] *= np.where(ES_REVERSA_NP[cj], -1, 1)
+        self.acumuladas[gj] += SUMA_TOMA_NP[cj]
+        salta = gj[ES_SALTA_NP[cj]]
+        self._avanzar(salta)
+
+        self._avanzar(np.concatenate([g[toman], gj]))
+
+    def _avanzar(self, g):
+        self.actual[g] = (self.actual[g] + self.direccion[g]) % JUGADORES
+
+    def _tomar(self, g, p, cantidades):
+        """
+        El jugador p de cada partida g toma sus cantidades del mazo,
+        mezclando el pozo cuando hace falta (como Mazo.sacar_carta)
+        """
+        faltan = cantidades.copy()
+        while True:
+            siguen = faltan > 0
+            if not siguen.any():
+                return
+            gs, ps = g[siguen], p[siguen]
+            vacios = self.n_mazo[gs] == 0
+            if vacios.any():
+                self._mezclar(gs[vacios])
+            # si ni mezclando hay cartas, deja de tomar
+            hay = self.n_mazo[gs] > 0
+            faltan[siguen] = np.where(hay, faltan[siguen] - 1, 0)
+            gs, ps = gs[hay], ps[hay]
+            self.n_mazo[gs] -= 1
+            codigos = self.mazo[gs, self.n_mazo[gs]]
+            self.manos[gs, ps, codigos] += 1
+            self.cantidades[gs, ps] += 1
+
+    def _mezclar(self, g):
+        """
+        Mazo.regenerar_mazo: todo el pozo menos el tope vuelve al mazo mezclado
+        (cuenta como mezcla aunque no haya nada para mezclar)
+        """
+        self.mezclas[g] += 1
+        vuelven = self.n_pozo[g] - 1
+        tope = self.pozo[g, vuelven]
+        claves = self.rng.random((len(g), CARTAS_MAZO))
+        claves[np.arange(CARTAS_MAZO) >= vuelven[:, None]] = 2.0  # quedan al final
+        orden = np.argsort(claves, axis=1)
+        self.mazo[g] = np.take_along_axis(self.pozo[g], orden, axis=1)
+        self.n_mazo[g] = vuelven
+        self.pozo[g, 0] = tope
+        self.n_pozo[g] = 1
+
+    # --- partidas completas ---
+
+    def jugar(self):
+        """
+        Juega todas las partidas hasta el final y devuelve los resultados
+        """
+        while self.paso():
+            pass
+        return self.resultados()
+
+    def resultados(self):
+        """
+        Un ResultadoPartida por partida, como los de simular()
+        """
+        resultados = []
+        for ganador, turnos, mezclas in zip(
+            self.ganador.tolist(), self.turnos.tolist(), self.mezclas.tolist()
+        ):
+            if ganador < 0:
+                resultados.append(ResultadoPartida(None, None, turnos, mezclas))
+            else:
+                resultados.append(
+                    ResultadoPartida("ABCD"[ganador], ganador, turnos, mezclas)
+                )
+        return resultados
+
+
+def simular_vectorizado(n, max_turnos=None, semilla=None):
+    """
+    Como simular(n, clases=[JugadorBotD] * 4) pero con el motor vectorizado
+    """
+    return MotorVectorizado(n, max_turnos=max_turnos, semilla=semilla).jugar()
+
+
+# --- comparación con el motor de referencia ---
+
+Comparacion = namedtuple(
+    "Comparacion",
+    [
+        "partidas",
+        "sin_mezcla",  # partidas con los mismos mazos que no mezclaron en ninguno
+        "distintas",  # de esas, cuántas no terminaron igual (tendría que ser 0)
+        "victorias_referencia",  # por asiento
+        "victorias_vectorizado",
+        "z_asientos",  # por asiento, tasas de victoria de partidas independientes
+        "z_turnos",  # turnos promedio
+        "velocidad_referencia",  # partidas por segundo
+        "velocidad_vectorizado",
+    ],
+)
+
+
+def _z_proporciones(a, b, n):
+    p = (a + b) / (2 * n)
+    if p in (0, 1):
+        return 0.0
+    return (a - b) / n / math.sqrt(2 * p * (1 - p) / n)
+
+
+def _z_medias(x, y):
+    mx, my = np.mean(x), np.mean(y)
+    error = math.sqrt(np.var(x, ddof=1) / len(x) + np.var(y, ddof=1) / len(y))
+    return float((mx - my) / error) if error else 0.0
+
+
+def comparar(n, semilla=0):
+    """
+    Juega n partidas de cuatro bots D con Juego y las mismas n (mismos mazos
+    iniciales) con el motor vectorizado. Las que no mezclan el pozo en
+    ninguno de los dos tienen que terminar igual, turno por turno.
+    Después juega otras n con mazos propios del motor y compara las
+    estadísticas (victorias por asiento y turnos) contra las de referencia.
+    """
+    rng = random.Random(semilla)
+    mazos = []
+    referencia = []
+    inicio = time.perf_counter()
+    for _ in range(n):
+        jugadores = [JugadorBotD(nombre) for nombre in "ABCD"]
+        juego = Juego(jugadores=jugadores, headless=True, rng=rng)
+        mazos.append([carta.codigo for carta in juego.mazo.cartas])
+        referencia.append(juego.iniciar_juego())
+    segundos_referencia = time.perf_counter() - inicio
+
+    mismos = MotorVectorizado(n, semilla=semilla, mazos=mazos).jugar()
+    sin_mezcla = 0
+    distintas = 0
+    for ref, vec in zip(referencia, mismos):
+        if ref.mezclas == 0 and vec.mezclas == 0:
+            sin_mezcla += 1
+            distintas += (ref.ganador_idx, ref.turnos) != (vec.ganador_idx, vec.turnos)
+
+    inicio = time.perf_counter()
+    propias = MotorVectorizado(n, semilla=semilla + 1).jugar()
+    segundos_vectorizado = time.perf_counter() - inicio
+
+    def victorias(resultados):
+        cuenta = [0] * JUGADORES
+        for resultado in resultados:
+            if resultado.ganador_idx is not None:
+                cuenta[resultado.ganador_idx] += 1
+        return cuenta
+
+    victorias_referencia = victorias(referencia)
+    victorias_vectorizado = victorias(propias)
+    return Comparacion(
+        partidas=n,
+        sin_mezcla=sin_mezcla,
+        distintas=distintas,
+        victorias_referencia=victorias_referencia,
+        victorias_vectorizado=victorias_vectorizado,
+        z_asientos=[
+            _z_proporciones(a, b, n)
+            for a, b in zip(victorias_referencia, victorias_vectorizado)
+        ],
+        z_turnos=_z_medias([r.turnos for r in referencia], [r.turnos for r in propias]),
+        velocidad_referencia=n / segundos_referencia,
+        velocidad_vectorizado=n / segundos_vectorizado,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara el motor vectorizado con Juego (cuatro bots D)"
+    )
+    parser.add_argument("partidas", type=int)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    c = comparar(args.partidas, semilla=args.semilla)
+    print(f"Partidas: {c.partidas}")
+    print(f"Mismos mazos sin mezcla: {c.sin_mezcla}, distintas: {c.distintas}")
+    for asiento in range(JUGADORES):
+        print(
+            f"  Asiento {asiento}: {c.victorias_referencia[asiento]} vs "
+            f"{c.victorias_vectorizado[asiento]} victorias "
+            f"(z = {c.z_asientos[asiento]:+.2f})"
+        )
+    print(f"Turnos promedio: z = {c.z_turnos:+.2f}")
+    print(
+        f"Partidas/s: {c.velocidad_referencia:.0f} (Juego) vs "
+        f"{c.velocidad_vectorizado:.0f} (vectorizado)"
+    )
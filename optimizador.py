@@ -0,0 +1,482 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from app import (
+    ACUMULABLES,
+    CANTIDAD_CODIGOS,
+    ES_ACCION_CODIGO,
+    ES_TOMA_CODIGO,
+    IDX_COLOR_CODIGO,
+    VALOR_CODIGO,
+    Estrategia,
+    Juego,
+    JugadorHeuristico,
+    Regla,
+    codigos_de,
+    cualquiera,
+    nombres_asientos,
+)
+from torneo import BOTS, intervalo_wilson
+
+# lo que se mira de cada carta jugable; el puntaje es la suma de peso * rasgo
+RASGOS = (
+    "acumula",  # 1 si se puede poner sobre la acción del tope (Toma 2 sobre Toma 2)
+    "accion",  # 1 si es una carta de acción
+    "toma",  # 1 si es Toma 2 / Toma 4
+    "color_mano",  # cartas de su color en la mano
+    "color_pozo",  # cartas de su color en el pozo
+    "repetidas",  # otras copias de la misma carta en la mano
+    "mismo_valor",  # cartas del mismo número o acción, de otros colores
+    "cambia_color",  # 1 si no es del color del tope
+    "ataque",  # 1 si es acción y al siguiente le quedan AMENAZA cartas o menos
+)
+AMENAZA = 2
+
+# B y D escritos como pesos (aproximados: B y D siguen reglas en orden, acá
+# se suman). B: acciones primero, después el color que menos salió y
+# acumular al final. D: acumular, números del color que más tiene y las
+# acciones al final, las tomas después de todo
+PESOS_B = (-30.0, 10.0, 0.0, 0.0, -0.5, 0.0, 0.0, 0.0, 0.0)
+PESOS_D = (50.0, -10.0, -5.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+# desvío con el que arranca la búsqueda alrededor de PESOS_D, por rasgo
+ESCALAS = (10.0, 5.0, 5.0, 1.0, 1.0, 2.0, 2.0, 2.0, 5.0)
+
+# una carrera saca a un candidato cuando, partida por partida contra el que
+# va primero, pierde por más de Z_ELIMINAR errores estándar
+Z_ELIMINAR = 2.5
+MIN_TROZO = 25  # partidas mínimas por tarea del pool
+ORIGINALES = "BD"  # contra quiénes se compara al final
+
+# códigos con el mismo valor (número o acción) que cada código, sin él
+OTROS_MISMO_VALOR = [
+    sum(
+        1 << k
+        for k in range(CANTIDAD_CODIGOS)
+        if k != codigo and VALOR_CODIGO[k] == VALOR_CODIGO[codigo]
+    )
+    for codigo in range(CANTIDAD_CODIGOS)
+]
+
+# las reglas no eligen (elige JugadorPesos.elegir): la estrategia da el
+# nombre para los eventos y si juega después de cumplir una penalidad
+ESTRATEGIA_PESOS = Estrategia("P", [Regla(cualquiera)], cumple_y_juega=True)
+ESTRATEGIA_PESOS_PASA = Estrategia("P", [Regla(cualquiera)])
+
+
+class JugadorPesos(JugadorHeuristico):
+    """
+    Bot heurístico que le pone puntaje a cada carta que puede jugar (la
+    suma de peso * rasgo, ver RASGOS) y juega la de más puntaje; si
+    empatan, la de código más bajo. El resto del turno (penalidades, tomar,
+    Adná, eventos) es el de JugadorHeuristico. Con cumple_y_juega (como D)
+    después de cumplir una penalidad juega igual; si no, pasa, como B.
+    """
+
+    def __init__(self, nombre, pesos=PESOS_D, cumple_y_juega=True):
+        super().__init__(nombre)
+        if len(pesos) != len(RASGOS):
+            raise ValueError(f"Hacen falta {len(RASGOS)} pesos ({', '.join(RASGOS)})")
+        self.pesos = tuple(pesos)
+        self.estrategia = ESTRATEGIA_PESOS if cumple_y_juega else ESTRATEGIA_PESOS_PASA
+
+    def elegir(self, jugadas_validas, codigo_tope, juego):
+        if not jugadas_validas:
+            return None
+        acumula, accion, toma, color_mano, color_pozo, repetidas, mismo_valor = (
+            self.pesos[:7]
+        )
+        cambia, ataque = self.pesos[7:]
+        conteo = self.mano.conteo
+        presentes = self.mano.presentes
+        colores_mano = self.mano.conteo_colores
+        colores_pozo = juego.mazo.colores_pozo()
+        color_tope = IDX_COLOR_CODIGO[codigo_tope]
+        acumulables = ACUMULABLES[codigo_tope]
+        siguiente = juego.jugadores[
+            (juego.jugador_actual_idx + juego.direccion) % juego.cantidad_jugadores
+        ]
+        amenaza = len(siguiente.mano) <= AMENAZA
+
+        mejor = mejor_puntaje = None
+        for codigo in codigos_de(jugadas_validas):
+            color = IDX_COLOR_CODIGO[codigo]
+            puntaje = (
+                color_mano * colores_mano[color]
+                + color_pozo * colores_pozo[color]
+                + repetidas * (conteo[codigo] - 1)
+            )
+            if ES_ACCION_CODIGO[codigo]:
+                puntaje += accion
+                if acumulables >> codigo & 1:
+                    puntaje += acumula
+                if ES_TOMA_CODIGO[codigo]:
+                    puntaje += toma
+                if amenaza:
+                    puntaje += ataque
+            if color != color_tope:
+                puntaje += cambia
+            otros = presentes & OTROS_MISMO_VALOR[codigo]
+            if otros and mismo_valor:
+                puntaje += mismo_valor * sum(conteo[k] for k in codigos_de(otros))
+            if mejor is None or puntaje > mejor_puntaje:
+                mejor, mejor_puntaje = codigo, puntaje
+        return mejor
+
+
+def _jugador(candidato, nombre, cumple_y_juega):
+    # un candidato son pesos, o la letra de un bot de torneo.BOTS
+    if isinstance(candidato, str):
+        return BOTS[candidato](nombre)
+    return JugadorPesos(nombre, candidato, cumple_y_juega)
+
+
+def jugar_lote(lote):
+    """
+    Lo que corre cada worker: el candidato juega las partidas desde, desde +
+    1, ... contra los rivales de la mesa y devuelve un byte por partida (1
+    si ganó). mesa es (rivales, cumple_y_juega de JugadorPesos).
+    La partida i sale de la semilla f"{semilla}:{i}" con el candidato en el
+    asiento i % jugadores, así todos los candidatos juegan las mismas
+    partidas (mismos repartos y mismos asientos) sin importar cómo se
+    repartan entre procesos.
+    """
+    candidato, (rivales, cumple_y_juega), semilla, desde, cantidad = lote
+    jugadores = len(rivales) + 1
+    nombres = nombres_asientos(jugadores)
+    mesas = {}
+    ganadas = bytearray(cantidad)
+    for k in range(cantidad):
+        i = desde + k
+        asiento = i % jugadores
+        rng = random.Random(f"{semilla}:{i}")
+        juego = mesas.get(asiento)
+        if juego is None:
+            bots = iter(rivales)
+            sentados = [
+                (
+                    _jugador(candidato, nombre, cumple_y_juega)
+                    if j == asiento
+                    else BOTS[next(bots)](nombre)
+                )
+                for j, nombre in enumerate(nombres)
+            ]
+            juego = mesas[asiento] = Juego(jugadores=sentados, headless=True, rng=rng)
+        else:
+            # mismo mazo que si se creara el Juego con este rng
+            juego.mazo.rng = rng
+            juego.reiniciar()
+        ganadas[k] = juego.iniciar_juego().ganador_idx == asiento
+    return bytes(ganadas)
+
+
+def diferencia(a, b):
+    """
+    Media y error estándar de a - b partida por partida (a y b son los
+    resultados de dos candidatos en las mismas partidas)
+    """
+    n = len(a)
+    diferencias = [x - y for x, y in zip(a, b)]
+    media = sum(diferencias) / n
+    if n < 2:
+        return media, math.inf
+    varianza = sum((d - media) ** 2 for d in diferencias) / (n - 1)
+    return media, math.sqrt(varianza / n)
+
+
+def carrera(candidatos, partidas, semilla, mapear, mesa, tanda, procesos):
+    """
+    Juega los candidatos de a tandas en las mismas partidas y después de
+    cada tanda saca a los que quedaron claramente atrás del que va primero
+    (ver Z_ELIMINAR): comparar partida por partida sobre los mismos mazos
+    tiene mucha menos varianza que comparar porcentajes sueltos. Devuelve
+    los resultados de cada candidato (bytes, uno por partida jugada: los
+    eliminados quedan con menos).
+    """
+    resultados = [bytearray() for _ in candidatos]
+    vivos = list(range(len(candidatos)))
+    for desde in range(0, partidas, tanda):
+        cantidad = min(tanda, partidas - desde)
+        # cada candidato en trozos, para que haya trabajo para todos los procesos
+        trozos = max(1, min(-(-procesos // len(vivos)), cantidad // MIN_TROZO))
+        paso = -(-cantidad // trozos)
+        lotes = [
+            (
+                candidatos[i],
+                mesa,
+                semilla,
+                inicio,
+                min(paso, desde + cantidad - inicio),
+            )
+            for i in vivos
+            for inicio in range(desde, desde + cantidad, paso)
+        ]
+        jugados = iter(mapear(jugar_lote, lotes))
+        for i in vivos:
+            for _ in range(desde, desde + cantidad, paso):
+                resultados[i] += next(jugados)
+
+        lider = max(vivos, key=lambda i: sum(resultados[i]))
+        quedan = []
+        for i in vivos:
+            media, error = diferencia(resultados[i], resultados[lider])
+            if media + Z_ELIMINAR * error >= 0:
+                quedan.append(i)
+        vivos = quedan
+        if len(vivos) == 1:
+            break
+    return [bytes(r) for r in resultados]
+
+
+def _tasa(resultado):
+    return sum(resultado) / len(resultado) if resultado else 0.0
+
+
+def _muestrear(media, desvio, rng):
+    return tuple(round(rng.gauss(m, d), 3) if d else m for m, d in zip(media, desvio))
+
+
+Generacion = namedtuple(
+    "Generacion", ["numero", "candidatos", "eliminados", "campeon", "tasa", "segundos"]
+)
+
+Optimizacion = namedtuple(
+    "Optimizacion",
+    [
+        "pesos",
+        "tasa",
+        "intervalo",
+        "partidas",
+        "contra",
+        "rivales",
+        "cumple_y_juega",
+        "generaciones",
+    ],
+)
+
+
+def optimizar(
+    generaciones=8,
+    poblacion=16,
+    elite=4,
+    partidas=2000,
+    tanda=250,
+    partidas_final=8000,
+    rivales="BDB",
+    cumple_y_juega=True,
+    semilla=0,
+    procesos=None,
+    inicio=PESOS_D,
+    al_terminar_generacion=None,
+):
+    """
+    Busca pesos para JugadorPesos que le ganen a los rivales (B y D por
+    defecto; cumple_y_juega como en JugadorPesos). Es un método de entropía
+    cruzada: cada generación sortea candidatos con una normal alrededor de
+    la media (más la media y el campeón anterior), los hace correr una
+    carrera (ver carrera) y la media y el desvío siguientes salen de los
+    elite mejores.
+
+    Todas las partidas de una generación son las mismas para todos los
+    candidatos (números aleatorios comunes); cada generación usa partidas
+    nuevas, así el campeón se vuelve a medir y no arrastra la suerte.
+    Al final corren los campeones de todas las generaciones con partidas
+    nuevas, y el ganador, B y D (sentados en el mismo lugar) se miden otra
+    vez en partidas_final partidas que no se usaron para elegir.
+    """
+    procesos = procesos or os.cpu_count()
+    mesa = (rivales, cumple_y_juega)
+    rng = random.Random(f"{semilla}:pesos")
+    media = tuple(inicio)
+    desvio = ESCALAS
+    campeones = []
+    historia = []
+
+    pool = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    mapear = (lambda f, lotes: pool.map(f, lotes)) if pool is not None else map
+    try:
+        for numero in range(generaciones):
+            comienzo = time.perf_counter()
+            candidatos = [media] + campeones[-1:]
+            if numero == 0:
+                candidatos += [PESOS_B, PESOS_D]
+            while len(candidatos) < poblacion:
+                candidatos.append(_muestrear(media, desvio, rng))
+            resultados = carrera(
+                candidatos,
+                partidas,
+                f"{semilla}:{numero}",
+                mapear,
+                mesa,
+                tanda,
+                procesos,
+            )
+            # primero los que jugaron todo, y entre ellos los que más ganaron
+            orden = sorted(
+                range(len(candidatos)),
+                key=lambda i: (len(resultados[i]), _tasa(resultados[i])),
+                reverse=True,
+            )
+            mejores = [candidatos[i] for i in orden[:elite]]
+            campeones.append(mejores[0])
+            media = tuple(round(sum(p) / len(mejores), 3) for p in zip(*mejores))
+            desvio = tuple(
+                max(math.sqrt(sum((x - m) ** 2 for x in p) / len(mejores)), e / 10)
+                for p, m, e in zip(zip(*mejores), media, ESCALAS)
+            )
+            generacion = Generacion(
+                numero,
+                len(candidatos),
+                sum(len(r) < partidas for r in resultados),
+                mejores[0],
+                _tasa(resultados[orden[0]]),
+                time.perf_counter() - comienzo,
+            )
+            historia.append(generacion)
+            if al_terminar_generacion is not None:
+                al_terminar_generacion(generacion)
+
+        # entre los campeones (sin repetir) con partidas nuevas
+        finalistas = list(dict.fromkeys(campeones))
+        resultados = carrera(
+            finalistas,
+            partidas_final,
+            f"{semilla}:final",
+            mapear,
+            mesa,
+            tanda,
+            procesos,
+        )
+        ganador = max(
+            range(len(finalistas)),
+            key=lambda i: (len(resultados[i]), _tasa(resultados[i])),
+        )
+        pesos = finalistas[ganador]
+
+        # y la medición que se informa, con otras partidas más
+        medir = [pesos, *ORIGINALES]
+        resultados = carrera(
+            medir,
+            partidas_final,
+            f"{semilla}:medicion",
+            mapear,
+            mesa,
+            partidas_final,  # una sola tanda: no se elimina a nadie
+            procesos,
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    ganadas = resultados[0]
+    contra = {}
+    for bot, resultado in zip(medir[1:], resultados[1:]):
+        media_dif, error = diferencia(ganadas, resultado)
+        contra[bot] = (_tasa(resultado), media_dif, error)
+    return Optimizacion(
+        pesos,
+        _tasa(ganadas),
+        intervalo_wilson(sum(ganadas), len(ganadas)),
+        len(ganadas),
+        contra,
+        rivales,
+        cumple_y_juega,
+        historia,
+    )
+
+
+def texto_pesos(pesos):
+    return ", ".join(f"{rasgo}={peso:g}" for rasgo, peso in zip(RASGOS, pesos))
+
+
+def resumen(optimizacion):
+    bajo, alto = optimizacion.intervalo
+    jugadores = len(optimizacion.rivales) + 1
+    lineas = [
+        f"Mejores pesos: {texto_pesos(optimizacion.pesos)}"
+        + ("" if optimizacion.cumple_y_juega else " (sin cumple y juega)"),
+        f"Contra {', '.join(optimizacion.rivales)} (rotando asientos, "
+        f"{1 / jugadores:.0%} sería parejo): gana {optimizacion.tasa:.2%} "
+        f"[{bajo:.2%}, {alto:.2%}] en {optimizacion.partidas} partidas",
+    ]
+    for bot, (tasa, media, error) in sorted(optimizacion.contra.items()):
+        lineas.append(
+            f"  {bot} en su lugar, mismas partidas: {tasa:.2%} "
+            f"(diferencia {media:+.2%} ± {1.96 * error:.2%})"
+        )
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Busca pesos para un bot heurístico jugando contra B y D"
+    )
+    parser.add_argument("--generaciones", type=int, default=8)
+    parser.add_argument("--poblacion", type=int, default=16)
+    parser.add_argument("--elite", type=int, default=4)
+    parser.add_argument(
+        "--partidas", type=int, default=2000, help="por candidato y generación"
+    )
+    parser.add_argument("--tanda", type=int, default=250, help="partidas entre cortes")
+    parser.add_argument(
+        "--partidas-final", type=int, default=8000, help="para elegir y para medir"
+    )
+    parser.add_argument("--rivales", default="BDB", help="bots de torneo.BOTS")
+    parser.add_argument(
+        "--cumple-y-juega",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="como D, juega en el mismo turno en que cumple una penalidad "
+        "(con --no-cumple-y-juega pasa, como B)",
+    )
+    parser.add_argument("--semilla", default="0")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--guardar", help="guarda el resultado en este JSON")
+    args = parser.parse_args()
+
+    def mostrar(generacion):
+        print(
+            f"Generación {generacion.numero}: {generacion.candidatos} candidatos, "
+            f"{generacion.eliminados} eliminados antes, campeón "
+            f"{generacion.tasa:.2%} ({generacion.segundos:.1f} s)\n"
+            f"  {texto_pesos(generacion.campeon)}",
+            flush=True,
+        )
+
+    optimizacion = optimizar(
+        generaciones=args.generaciones,
+        poblacion=args.poblacion,
+        elite=args.elite,
+        partidas=args.partidas,
+        tanda=args.tanda,
+        partidas_final=args.partidas_final,
+        rivales=args.rivales,
+        cumple_y_juega=args.cumple_y_juega,
+        semilla=args.semilla,
+        procesos=args.procesos,
+        al_terminar_generacion=mostrar,
+    )
+    print(resumen(optimizacion))
+    if args.guardar:
+        with open(args.guardar, "w") as archivo:
+            json.dump(
+                {
+                    "pesos": dict(zip(RASGOS, optimizacion.pesos)),
+                    "rivales": optimizacion.rivales,
+                    "cumple_y_juega": optimizacion.cumple_y_juega,
+                    "tasa": optimizacion.tasa,
+                    "intervalo": optimizacion.intervalo,
+                    "partidas": optimizacion.partidas,
+                    "contra": {
+                        bot: {"tasa": tasa, "diferencia": media, "error": error}
+                        for bot, (tasa, media, error) in optimizacion.contra.items()
+                    },
+                },
+                archivo,
+                indent=2,
+            )
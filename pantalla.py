@@ -0,0 +1,174 @@
+import os
+import shutil
+import sys
+
+# secuencias ANSI que se usan
+LIMPIAR = "\x1b[2J"
+BORRAR_RESTO = "\x1b[K"  # borra desde el cursor hasta el fin del renglón
+GUARDAR_CURSOR = "\x1b7"
+VOLVER_CURSOR = "\x1b8"
+SIN_REGION = "\x1b[r"  # toda la pantalla vuelve a desplazarse
+
+LINEAS_MANO = 4  # renglones del panel para la mano del que juega
+
+
+def ir_a(renglon, columna=1):
+    return f"\x1b[{renglon};{columna}H"
+
+
+def region(desde, hasta):
+    # solo esos renglones se desplazan con print() e input()
+    return f"\x1b[{desde};{hasta}r"
+
+
+class PantallaTexto:
+    """
+    Lo de siempre: en cada turno de un humano imprime la mesa y la mano
+    completas. Es la que se usa cuando la salida no es una terminal (un
+    archivo, un pipe), donde no tiene sentido mover el cursor.
+    """
+
+    def empezar(self, juego):
+        pass
+
+    def actualizar(self, juego):
+        pass
+
+    def mostrar_juego(self, juego):
+        print("=============================")
+        print(f"Tope del Pozo: {juego.mazo.ver_tope_pozo()}")
+        print(f"Cartas en el Mazo: {len(juego.mazo.cartas)}")
+        print("--- Manos (Humanos) ---")
+        jugadores_humanos = [j for j in juego.jugadores if j.es_humano]
+        for jugador in jugadores_humanos:
+            print(f"  {jugador.nombre}: {len(jugador.mano)} cartas")
+            jugador.mostrar_mano()
+        print("--- Estado (Robots) ---")
+        jugadores_robots = [j for j in juego.jugadores if not j.es_humano]
+        for jugador in jugadores_robots:
+            print(f"  {jugador.nombre}: {len(jugador.mano)} cartas")
+            # DESCOMENTAR PARA DEBUG Y MOSTRAR LA MANO DEL
+            # jugador.mostrar_mano()
+        print("=============================")
+
+    def mostrar_mano(self, jugador, juego):
+        jugador.mostrar_mano()
+        print(f"Tope del pozo: {juego.mazo.ver_tope_pozo()}")
+
+    def terminar(self):
+        pass
+
+
+class PantallaAnsi:
+    """
+    Panel fijo arriba de la terminal con el tope del pozo, las cartas del
+    mazo, cuántas tiene cada uno y la mano del humano que juega; abajo
+    queda una región que se desplaza para los mensajes, el menú e input().
+
+    Guarda lo que hay en cada renglón del panel y en cada actualización
+    reescribe solo los que cambiaron, con secuencias ANSI y una sola
+    escritura (nada de os.system("clear") ni de reimprimir todo).
+    """
+
+    def __init__(self, salida=None):
+        self.salida = salida if salida is not None else sys.stdout
+        self.renglones = []  # lo que hay en pantalla, por renglón del panel
+        self.mano_visible = None  # el último humano que jugó
+        self.ancho = 80
+
+    def empezar(self, juego):
+        ancho, alto = shutil.get_terminal_size()
+        self.ancho = ancho
+        self.renglones = [""] * (5 + len(juego.jugadores) + LINEAS_MANO)
+        alto_panel = len(self.renglones)
+        # el panel se dibuja entero en la primera actualización
+        self.salida.write(
+            LIMPIAR + region(alto_panel + 1, max(alto, alto_panel + 2)) + ir_a(alto)
+        )
+        self.actualizar(juego)
+
+    def actualizar(self, juego):
+        if not self.renglones:
+            self.empezar(juego)
+            return
+        actual = juego.jugadores[juego.jugador_actual_idx]
+        if actual.es_humano:
+            self.mano_visible = actual
+        cambios = []
+        for i, renglon in enumerate(self._panel(juego)):
+            renglon = renglon[: self.ancho]
+            if renglon != self.renglones[i]:
+                cambios.append(ir_a(i + 1) + renglon + BORRAR_RESTO)
+                self.renglones[i] = renglon
+        if cambios:
+            self.salida.write(GUARDAR_CURSOR + "".join(cambios) + VOLVER_CURSOR)
+            self.salida.flush()
+
+    def mostrar_juego(self, juego):
+        self.actualizar(juego)
+
+    def mostrar_mano(self, jugador, juego):
+        self.mano_visible = jugador
+        self.actualizar(juego)
+
+    def terminar(self):
+        # la terminal queda como estaba, con el cursor abajo de todo
+        self.salida.write(SIN_REGION + ir_a(shutil.get_terminal_size()[1]) + "\n")
+        self.salida.flush()
+        self.renglones = []
+
+    def _panel(self, juego):
+        actual = juego.jugadores[juego.jugador_actual_idx]
+        renglones = [
+            "=" * min(self.ancho, 40),
+            f"Tope del Pozo: {juego.mazo.ver_tope_pozo()}",
+            f"Cartas en el Mazo: {len(juego.mazo.cartas)}"
+            + (
+                f"   Acumuladas: {juego.cartas_acumuladas}"
+                if juego.accion_pendiente
+                else ""
+            ),
+        ]
+        for jugador in juego.jugadores:
+            marca = ">" if jugador is actual else " "
+            tipo = "" if jugador.es_humano else " (robot)"
+            renglones.append(
+                f"{marca} {jugador.nombre}{tipo}: {len(jugador.mano)} cartas"
+            )
+        if self.mano_visible is None:
+            renglones.append("")
+        else:
+            renglones.append(f"--- Mano de {self.mano_visible.nombre} ---")
+        renglones += self._mano()
+        renglones.append("=" * min(self.ancho, 40))
+        return renglones
+
+    def _mano(self):
+        # las cartas numeradas como las pide el menú, en LINEAS_MANO renglones
+        renglones = [""] * LINEAS_MANO
+        if self.mano_visible is None:
+            return renglones
+        cartas = [f"{i + 1}: {carta}" for i, carta in enumerate(self.mano_visible.mano)]
+        renglon = 0
+        for texto in cartas:
+            if (
+                renglones[renglon]
+                and len(renglones[renglon]) + len(texto) + 3 > self.ancho
+            ):
+                if renglon == LINEAS_MANO - 1:
+                    renglones[renglon] += " ..."
+                    break
+                renglon += 1
+            renglones[renglon] += ("   " if renglones[renglon] else "  ") + texto
+        return renglones
+
+
+def elegir_pantalla(salida=None):
+    """
+    PantallaAnsi si la salida es una terminal que entiende ANSI, si no
+    PantallaTexto
+    """
+    salida = salida if salida is not None else sys.stdout
+    if salida.isatty() and os.environ.get("TERM") != "dumb":
+        return PantallaAnsi(salida)
+    return PantallaTexto()
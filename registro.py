@@ -0,0 +1,400 @@
+import random
+import zlib
+from collections import namedtuple
+
+from app import CARTAS_POR_MAZO, Juego, Jugador
+
+# Formato de un archivo de partidas:
+#   "ADNA" + versión (1 byte), y después una partida atrás de la otra:
+#   largo (varint) + nombres de los jugadores + registros hasta FIN.
+# Cada registro arranca con un byte. Si el bit 7 está en 0 es un turno:
+#   bits 0-2 el jugador, más las marcas de abajo; sigue el código de la carta
+#   jugada (si JUGO) y la cantidad de cartas tomadas (varint, si TOMO).
+#   En mesas de más de 8 jugadores los bits 0-2 van en 0 y el jugador va en
+#   un byte aparte, justo después del de las marcas.
+# Si no, es MEZCLA (varint n + n códigos: el orden en que quedó el mazo,
+# la primera es la mezcla inicial de Mazo) o FIN (ganador, turnos, mezclas
+# y una huella del estado final para verificar la repetición).
+MAGIA = b"ADNA"
+VERSION = 1
+
+JUGO = 0x08
+TOMO = 0x10
+CUMPLIO = 0x20  # cumplió la penalidad de la acción pendiente
+DIJO_ADNA = 0x40
+JUGADORES_EN_MARCAS = 8  # hasta acá el jugador entra en los bits 0-2
+MAX_JUGADORES = 255
+
+MEZCLA = 0x80
+FIN = 0x81
+SIN_GANADOR = 0xFF
+
+# un turno leído: codigo es None si no jugó, y mezclas cuántas veces se
+# regeneró el mazo desde el principio hasta el final del turno
+Turno = namedtuple(
+    "Turno", ["jugador", "codigo", "tomadas", "cumplio", "dijo_adna", "mezclas"]
+)
+Partida = namedtuple(
+    "Partida",
+    [
+        "nombres",
+        "ordenes",
+        "turnos",
+        "ganador_idx",
+        "cantidad_turnos",
+        "mezclas",
+        "huella",
+    ],
+)
+
+
+def _escribir_varint(datos, numero):
+    while numero >= 0x80:
+        datos.append(numero & 0x7F | 0x80)
+        numero >>= 7
+    datos.append(numero)
+
+
+def _leer_varint(datos, pos):
+    numero = 0
+    corrimiento = 0
+    while True:
+        byte = datos[pos]
+        pos += 1
+        numero |= (byte & 0x7F) << corrimiento
+        if byte < 0x80:
+            return numero, pos
+        corrimiento += 7
+
+
+def huella(juego):
+    """
+    crc32 de todo lo que importa del estado: manos, mazo, pozo,
+    turno, dirección y acumulación
+    """
+    datos = bytearray()
+    for jugador in juego.jugadores:
+        datos.extend(carta.codigo for carta in jugador.mano)
+        datos.append(SIN_GANADOR)  # separador
+    datos.extend(carta.codigo for carta in juego.mazo.cartas)
+    datos.append(SIN_GANADOR)
+    datos.extend(carta.codigo for carta in juego.mazo.pozo)
+    datos.append(SIN_GANADOR)
+    datos.append(juego.jugador_actual_idx)
+    datos.append(juego.direccion % 3)  # 1 o 2 (-1)
+    _escribir_varint(datos, juego.cartas_acumuladas)
+    return zlib.crc32(datos)
+
+
+class GrabadorPartida:
+    """
+    Graba una partida mientras se juega. Se le pasa al Juego como rng
+    (mezcla con el rng de verdad y anota cómo quedó el mazo) y se anota
+    como observador para enterarse de cada turno.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random
+        self.juego = None
+        self.datos = bytearray()
+
+    def shuffle(self, cartas):
+        self.rng.shuffle(cartas)
+        self.datos.append(MEZCLA)
+        _escribir_varint(self.datos, len(cartas))
+        self.datos.extend(carta.codigo for carta in cartas)
+
+    def observar(self, juego):
+        if len(juego.jugadores) > MAX_JUGADORES:
+            raise ValueError(f"No se pueden grabar más de {MAX_JUGADORES} jugadores")
+        self.juego = juego
+        juego.observadores.append(self)
+
+    # --- eventos del Juego ---
+
+    def al_jugar(self, idx, codigo):
+        pass
+
+    def al_tomar(self, idx, cantidad, codigo_tope, voluntaria):
+        pass
+
+    def al_mezclar(self):
+        pass  # el orden ya lo anotó shuffle
+
+    def al_terminar_turno(self, idx, carta_jugada, tomadas, cumplio):
+        separado = len(self.juego.jugadores) > JUGADORES_EN_MARCAS
+        marcas = 0 if separado else idx
+        if carta_jugada:
+            marcas |= JUGO
+        if tomadas:
+            marcas |= TOMO
+        if cumplio:
+            marcas |= CUMPLIO
+        if self.juego.jugadores[idx].dijo_adna:
+            marcas |= DIJO_ADNA
+        self.datos.append(marcas)
+        if separado:
+            self.datos.append(idx)
+        if carta_jugada:
+            self.datos.append(carta_jugada.codigo)
+        if tomadas:
+            _escribir_varint(self.datos, tomadas)
+
+    def terminar(self):
+        """
+        Devuelve la partida codificada, lista para escribir
+        """
+        juego = self.juego
+        partida = bytearray()
+        partida.append(len(juego.jugadores))
+        for jugador in juego.jugadores:
+            nombre = jugador.nombre.encode()
+            partida.append(len(nombre))
+            partida.extend(nombre)
+        partida.extend(self.datos)
+
+        partida.append(FIN)
+        if juego.ganador is None:
+            partida.append(SIN_GANADOR)
+        else:
+            partida.append(juego.jugadores.index(juego.ganador))
+        _escribir_varint(partida, juego.turnos)
+        _escribir_varint(partida, juego.mazo.mezclas)
+        partida.extend(huella(juego).to_bytes(4, "little"))
+
+        datos = bytearray()
+        _escribir_varint(datos, len(partida))
+        datos.extend(partida)
+        return bytes(datos)
+
+
+def jugar_grabando(jugadores, rng=None, max_turnos=None, instrumentacion=None):
+    """
+    Juega una partida headless y devuelve (resultado, partida codificada)
+    """
+    grabador = GrabadorPartida(rng)
+    juego = Juego(
+        jugadores=jugadores,
+        headless=True,
+        max_turnos=max_turnos,
+        rng=grabador,
+        instrumentacion=instrumentacion,
+    )
+    grabador.observar(juego)
+    resultado = juego.iniciar_juego()
+    return resultado, grabador.terminar()
+
+
+class EscritorRegistros:
+    """
+    Escribe partidas a un archivo a medida que se juegan, con buffer,
+    así se pueden grabar millones sin tenerlas en memoria
+    """
+
+    def __init__(self, ruta, buffer=1 << 20):
+        self.archivo = open(ruta, "wb", buffering=buffer)
+        self.archivo.write(MAGIA + bytes([VERSION]))
+        self.partidas = 0
+
+    def escribir(self, datos):
+        self.archivo.write(datos)
+        self.partidas += 1
+
+    def jugar(self, jugadores, rng=None, max_turnos=None):
+        resultado, datos = jugar_grabando(jugadores, rng=rng, max_turnos=max_turnos)
+        self.escribir(datos)
+        return resultado
+
+    def cerrar(self):
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+class LectorRegistros:
+    """
+    Recorre las partidas de un archivo de a una (no lo carga entero)
+    """
+
+    def __init__(self, ruta, buffer=1 << 20):
+        self.archivo = open(ruta, "rb", buffering=buffer)
+        cabecera = self.archivo.read(len(MAGIA) + 1)
+        if cabecera[:-1] != MAGIA:
+            raise ValueError(f"{ruta} no es un archivo de partidas de ADNA")
+        if cabecera[-1] != VERSION:
+            raise ValueError(f"Versión de registro desconocida: {cabecera[-1]}")
+
+    def __iter__(self):
+        while True:
+            largo = self._leer_largo()
+            if largo is None:
+                return
+            yield decodificar(self.archivo.read(largo))
+
+    def _leer_largo(self):
+        numero = 0
+        corrimiento = 0
+        while True:
+            byte = self.archivo.read(1)
+            if not byte:
+                if corrimiento:
+                    raise ValueError("Archivo de partidas cortado")
+                return None
+            numero |= (byte[0] & 0x7F) << corrimiento
+            if byte[0] < 0x80:
+                return numero
+            corrimiento += 7
+
+    def cerrar(self):
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+
+def decodificar(datos):
+    """
+    Partida a partir de sus bytes (sin el largo)
+    """
+    pos = 1
+    nombres = []
+    separado = datos[0] > JUGADORES_EN_MARCAS
+    for _ in range(datos[0]):
+        largo = datos[pos]
+        nombres.append(datos[pos + 1 : pos + 1 + largo].decode())
+        pos += 1 + largo
+
+    ordenes = []
+    turnos = []
+    while True:
+        marcas = datos[pos]
+        pos += 1
+        if marcas == FIN:
+            break
+        if marcas == MEZCLA:
+            cantidad, pos = _leer_varint(datos, pos)
+            ordenes.append(list(datos[pos : pos + cantidad]))
+            pos += cantidad
+            continue
+        jugador = marcas & (JUGADORES_EN_MARCAS - 1)
+        if separado:
+            jugador = datos[pos]
+            pos += 1
+        codigo = None
+        tomadas = 0
+        if marcas & JUGO:
+            codigo = datos[pos]
+            pos += 1
+        if marcas & TOMO:
+            tomadas, pos = _leer_varint(datos, pos)
+        turnos.append(
+            Turno(
+                jugador,
+                codigo,
+                tomadas,
+                bool(marcas & CUMPLIO),
+                bool(marcas & DIJO_ADNA),
+                len(ordenes) - 1,  # la primera mezcla es la del mazo nuevo
+            )
+        )
+
+    ganador_idx = datos[pos]
+    cantidad_turnos, pos = _leer_varint(datos, pos + 1)
+    mezclas, pos = _leer_varint(datos, pos)
+    return Partida(
+        nombres,
+        ordenes,
+        turnos,
+        None if ganador_idx == SIN_GANADOR else ganador_idx,
+        cantidad_turnos,
+        mezclas,
+        int.from_bytes(datos[pos : pos + 4], "little"),
+    )
+
+
+# --- repetición ---
+
+
+class RngRepetido:
+    """
+    Hace de rng del Mazo: cada mezcla deja las cartas en el orden grabado
+    """
+
+    def __init__(self, ordenes):
+        self.ordenes = iter(ordenes)
+
+    def shuffle(self, cartas):
+        por_codigo = {}
+        for carta in cartas:
+            por_codigo.setdefault(carta.codigo, []).append(carta)
+        try:
+            cartas[:] = [por_codigo[codigo].pop() for codigo in next(self.ordenes)]
+        except (KeyError, IndexError, StopIteration):
+            raise ValueError("La mezcla grabada no coincide con las cartas") from None
+
+
+class JugadorRepetido(Jugador):
+    """
+    Rehace los turnos grabados: toma lo que tomó (cumpliendo la penalidad
+    si la cumplió) y después juega la carta que jugó
+    """
+
+    def __init__(self, nombre, turnos):
+        super().__init__(nombre)
+        self.es_humano = False
+        self.turnos = turnos  # iterador compartido por todos los jugadores
+
+    def jugar(self, juego):
+        turno = next(self.turnos, None)
+        if turno is None or juego.jugadores[turno.jugador] is not self:
+            raise ValueError("El registro no sigue el orden de los turnos")
+
+        if turno.cumplio:
+            juego.cartas_acumuladas = 0
+            juego.accion_pendiente = None
+        if turno.tomadas:
+            self.tomar_cartas_del_mazo(juego.mazo, turno.tomadas)
+        # intentos de tomar sin cartas en la mesa (también cuentan como mezcla)
+        while juego.mazo.mezclas < turno.mezclas:
+            if juego.mazo.sacar_carta() is not None:
+                raise ValueError("El registro no coincide con el mazo")
+
+        carta = None
+        if turno.codigo is not None:
+            carta = self.jugar_codigo(turno.codigo, juego.mazo)
+        self.dijo_adna = turno.dijo_adna
+        return carta
+
+
+def repetir(partida):
+    """
+    Vuelve a jugar una partida grabada con Juego y devuelve el Juego terminado.
+    Si el estado final no es el grabado, ValueError.
+    """
+    turnos = iter(partida.turnos)
+    jugadores = [JugadorRepetido(nombre, turnos) for nombre in partida.nombres]
+    # la primera mezcla es el mazo entero: de ahí sale cuántos mazos se usaron
+    mazos = len(partida.ordenes[0]) // CARTAS_POR_MAZO
+    juego = Juego(
+        jugadores=jugadores,
+        headless=True,
+        max_turnos=partida.cantidad_turnos,
+        rng=RngRepetido(partida.ordenes),
+        mazos=mazos,
+    )
+    resultado = juego.iniciar_juego()
+    if (
+        resultado.ganador_idx != partida.ganador_idx
+        or resultado.turnos != partida.cantidad_turnos
+        or resultado.mezclas != partida.mezclas
+        or huella(juego) != partida.huella
+    ):
+        raise ValueError("La repetición no terminó igual que la partida grabada")
+    return juego
@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import zlib
+
+# qué hace cada carta (ids chicos: procesar_accion despacha con una tabla)
+SIN_EFECTO = 0  # las numéricas
+EFECTO_REVERSA = 1
+EFECTO_SALTA = 2
+EFECTO_TOMA = 3
+EFECTOS = {"reversa": EFECTO_REVERSA, "salta": EFECTO_SALTA, "toma": EFECTO_TOMA}
+
+# colores * (números + acciones): el registro de partidas y las claves del
+# solucionador guardan cada código en un byte
+MAX_CODIGOS = 256
+
+# las reglas de la consigna: 4 colores, del 1 al 9 dos veces, 2 Toma 2,
+# 2 Reversa, 2 Salta y 1 Toma 4 por color (100 cartas), 5 cartas por mano y
+# 2 de penalidad por no decir Adná. Un archivo de reglamento cambia lo que
+# quiera de acá; lo que no dice queda igual
+ESTANDAR = {
+    "nombre": "estándar",
+    "colores": ["marrón", "naranja", "rosa", "violeta"],
+    "numeros": list(range(1, 10)),
+    "copias_numeros": 2,  # un número para todos, o uno por número
+    "acciones": [
+        {"nombre": "Toma 2", "efecto": "toma", "cantidad": 2, "copias": 2},
+        {"nombre": "Reversa", "efecto": "reversa", "copias": 2},
+        {"nombre": "Salta", "efecto": "salta", "copias": 2},
+        {"nombre": "Toma 4", "efecto": "toma", "cantidad": 4, "copias": 1},
+    ],
+    "cartas_mano": 5,
+    "penalidad_adna": 2,
+    "jugadores_por_mazo": 4,  # en mesas más grandes se juntan varios mazos
+}
+
+# app.py arma sus tablas con el reglamento de este archivo (si no, el estándar)
+VARIABLE = "ADNA_REGLAMENTO"
+
+
+def _mascara(condicion, cantidad):
+    # arma un int con el bit k prendido si el código k cumple la condición
+    mascara = 0
+    for codigo in range(cantidad):
+        if condicion(codigo):
+            mascara |= 1 << codigo
+    return mascara
+
+
+class Reglamento:
+    """
+    Colores, valores, cartas de acción, copias de cada carta, cartas por
+    mano y penalidades. Al crearlo se valida y se compila en las tablas que
+    usa el motor (códigos, máscaras de jugadas válidas, efecto y cantidad a
+    tomar de cada código, el mazo base), así jugar con una variante cuesta
+    lo mismo que con las reglas de siempre.
+
+    Los códigos son color * len(valores) + valor, con los números primero y
+    las acciones después en el orden en que están.
+    """
+
+    def __init__(self, **opciones):
+        desconocidas = set(opciones) - set(ESTANDAR)
+        if desconocidas:
+            raise ValueError(
+                f"Opciones desconocidas: {', '.join(sorted(desconocidas))}"
+            )
+        datos = {**ESTANDAR, **opciones}
+        self.nombre = str(datos["nombre"])
+        self.colores = list(datos["colores"])
+        self.numeros = list(datos["numeros"])
+        copias = datos["copias_numeros"]
+        if isinstance(copias, int):
+            copias = [copias] * len(self.numeros)
+        self.copias_numeros = list(copias)
+        self.acciones = [dict(accion) for accion in datos["acciones"]]
+        self.cartas_mano = datos["cartas_mano"]
+        self.penalidad_adna = datos["penalidad_adna"]
+        self.jugadores_por_mazo = datos["jugadores_por_mazo"]
+        self._validar()
+        self._compilar()
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        with open(ruta) as archivo:
+            opciones = json.load(archivo)
+        opciones.setdefault("nombre", os.path.splitext(os.path.basename(ruta))[0])
+        return cls(**opciones)
+
+    def _validar(self):
+        if not self.colores or len(set(self.colores)) != len(self.colores):
+            raise ValueError("Hacen falta colores, y sin repetir")
+        if not self.numeros or len(set(self.numeros)) != len(self.numeros):
+            raise ValueError("Hacen falta números, y sin repetir")
+        if not all(isinstance(numero, int) for numero in self.numeros):
+            raise ValueError("Los números tienen que ser enteros")
+        if len(self.copias_numeros) != len(self.numeros):
+            raise ValueError("copias_numeros tiene que tener una cantidad por número")
+        if min(self.copias_numeros) < 0 or not sum(self.copias_numeros):
+            # el pozo arranca con una numérica
+            raise ValueError("Hace falta al menos una carta numérica")
+        nombres = [accion.get("nombre") for accion in self.acciones]
+        if not all(isinstance(nombre, str) for nombre in nombres):
+            raise ValueError("Cada acción necesita un nombre")
+        if len(set(nombres)) != len(nombres):
+            raise ValueError("Hay acciones con el mismo nombre")
+        for accion in self.acciones:
+            nombre = accion["nombre"]
+            sobran = set(accion) - {"nombre", "efecto", "cantidad", "copias"}
+            if sobran:
+                raise ValueError(
+                    f"{nombre}: no se entiende {', '.join(sorted(sobran))}"
+                )
+            if accion.get("efecto") not in EFECTOS:
+                raise ValueError(
+                    f"{nombre}: el efecto tiene que ser {', '.join(EFECTOS)}"
+                )
+            if accion.get("copias", 0) < 0:
+                raise ValueError(f"{nombre}: copias no puede ser negativo")
+            if accion["efecto"] == "toma":
+                if accion.get("cantidad", 0) <= 0:
+                    raise ValueError(f"{nombre}: una toma necesita cantidad")
+            elif "cantidad" in accion:
+                raise ValueError(f"{nombre}: cantidad es solo para las tomas")
+        codigos = len(self.colores) * (len(self.numeros) + len(self.acciones))
+        if codigos > MAX_CODIGOS:
+            raise ValueError(
+                f"Son {codigos} cartas distintas y el máximo es {MAX_CODIGOS} "
+                "(colores por números y acciones)"
+            )
+        if self.cartas_mano < 1 or self.penalidad_adna < 0:
+            raise ValueError("cartas_mano tiene que ser positivo y penalidad_adna >= 0")
+        if self.jugadores_por_mazo < 2:
+            raise ValueError("Un mazo tiene que alcanzar para 2 jugadores")
+        cartas = len(self.colores) * (
+            sum(self.copias_numeros)
+            + sum(accion.get("copias", 0) for accion in self.acciones)
+        )
+        if self.jugadores_por_mazo * self.cartas_mano >= cartas:
+            raise ValueError(
+                f"Un mazo de {cartas} cartas no alcanza para repartir "
+                f"{self.cartas_mano} a {self.jugadores_por_mazo} jugadores"
+            )
+
+    def _compilar(self):
+        nombres = [accion["nombre"] for accion in self.acciones]
+        self.valores = self.numeros + nombres
+        self.codigos = {
+            (color, valor): i * len(self.valores) + j
+            for i, color in enumerate(self.colores)
+            for j, valor in enumerate(self.valores)
+        }
+        cantidad = self.cantidad_codigos = len(self.codigos)
+        self.color_codigo = [color for color, valor in self.codigos]  # índice = código
+        self.idx_color_codigo = [
+            codigo // len(self.valores) for codigo in range(cantidad)
+        ]
+        self.valor_codigo = [valor for color, valor in self.codigos]
+
+        # efecto y cartas a tomar de cada código (0 si no es una toma)
+        por_valor = {valor: (SIN_EFECTO, 0) for valor in self.numeros}
+        for accion in self.acciones:
+            por_valor[accion["nombre"]] = (
+                EFECTOS[accion["efecto"]],
+                accion.get("cantidad", 0),
+            )
+        self.efecto_codigo = [por_valor[valor][0] for valor in self.valor_codigo]
+        self.toma_codigo = [por_valor[valor][1] for valor in self.valor_codigo]
+        self.es_accion_codigo = [efecto != SIN_EFECTO for efecto in self.efecto_codigo]
+        self.es_toma_codigo = [efecto == EFECTO_TOMA for efecto in self.efecto_codigo]
+
+        # jugables[tope] tiene prendidos los códigos que se pueden jugar sobre
+        # ese tope: mismo color, o mismo valor (un número nunca es igual a
+        # una acción)
+        self.jugables = [
+            _mascara(
+                lambda c, t=tope: self.color_codigo[c] == self.color_codigo[t]
+                or self.valor_codigo[c] == self.valor_codigo[t],
+                cantidad,
+            )
+            for tope in range(cantidad)
+        ]
+        # acumulables[tope]: acciones del mismo valor que el tope (para acumular)
+        self.acumulables = [
+            _mascara(
+                lambda c, t=tope: self.es_accion_codigo[t]
+                and self.valor_codigo[c] == self.valor_codigo[t],
+                cantidad,
+            )
+            for tope in range(cantidad)
+        ]
+        self.mascara_acciones = _mascara(lambda c: self.es_accion_codigo[c], cantidad)
+        # mismo_color[codigo]: todos los códigos de su color
+        self.mismo_color = [
+            _mascara(
+                lambda c, k=codigo: self.color_codigo[c] == self.color_codigo[k],
+                cantidad,
+            )
+            for codigo in range(cantidad)
+        ]
+
+        # las cartas de un mazo en orden, como códigos: por color, cada valor
+        # con sus copias
+        copias_valor = dict(zip(self.numeros, self.copias_numeros))
+        for accion in self.acciones:
+            copias_valor[accion["nombre"]] = accion.get("copias", 0)
+        self.mazo_base = [
+            self.codigos[(color, valor)]
+            for color in self.colores
+            for valor in self.valores
+            for _ in range(copias_valor[valor])
+        ]
+
+    def como_dict(self):
+        return {
+            "nombre": self.nombre,
+            "colores": self.colores,
+            "numeros": self.numeros,
+            "copias_numeros": self.copias_numeros,
+            "acciones": self.acciones,
+            "cartas_mano": self.cartas_mano,
+            "penalidad_adna": self.penalidad_adna,
+            "jugadores_por_mazo": self.jugadores_por_mazo,
+        }
+
+    def huella(self):
+        """
+        crc32 de las reglas (sin el nombre): dos reglamentos con la misma
+        huella juegan igual
+        """
+        reglas = {k: v for k, v in self.como_dict().items() if k != "nombre"}
+        texto = json.dumps(reglas, sort_keys=True, ensure_ascii=False)
+        return zlib.crc32(texto.encode())
+
+    def clave(self):
+        # para distinguir torneos jugados con reglamentos distintos
+        return f"{self.nombre}:{self.huella():08x}"
+
+    def resumen(self):
+        numericas = len(self.colores) * sum(self.copias_numeros)
+        lineas = [
+            f"Reglamento {self.clave()}",
+            f"Colores: {', '.join(self.colores)}",
+            f"Números: {', '.join(map(str, self.numeros))} ({numericas} cartas)",
+        ]
+        for accion in self.acciones:
+            cantidad = f" {accion['cantidad']}" if "cantidad" in accion else ""
+            lineas.append(
+                f"  {accion['nombre']}: {accion['efecto']}{cantidad}, "
+                f"{accion.get('copias', 0)} por color"
+            )
+        lineas += [
+            f"Cartas por mazo: {len(self.mazo_base)} ({self.cantidad_codigos} códigos), "
+            f"un mazo cada {self.jugadores_por_mazo} jugadores",
+            f"Cartas por mano: {self.cartas_mano}",
+            f"Penalidad por no decir Adná: {self.penalidad_adna}",
+        ]
+        return "\n".join(lineas)
+
+
+def reglamento_activo():
+    """
+    El reglamento del archivo de la variable de entorno ADNA_REGLAMENTO, o
+    el estándar. Se lee una vez, al importar app.py: los procesos de un
+    torneo heredan la variable y juegan todos con el mismo.
+    """
+    ruta = os.environ.get(VARIABLE)
+    if ruta:
+        return Reglamento.desde_archivo(ruta)
+    return Reglamento()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Valida un reglamento y muestra cómo queda compilado"
+    )
+    parser.add_argument("archivo", nargs="?", help="JSON (por defecto el estándar)")
+    parser.add_argument(
+        "--estandar",
+        action="store_true",
+        help="imprime el reglamento estándar en JSON, para usar de base",
+    )
+    args = parser.parse_args()
+
+    if args.estandar:
+        print(json.dumps(ESTANDAR, indent=2, ensure_ascii=False))
+    else:
+        reglamento = (
+            Reglamento.desde_archivo(args.archivo) if args.archivo else Reglamento()
+        )
+        print(reglamento.resumen())
@@ -0,0 +1,243 @@
+import argparse
+import sqlite3
+import time
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS torneos (
+    id INTEGER PRIMARY KEY,
+    alineacion TEXT NOT NULL,
+    semilla TEXT NOT NULL,
+    partidas INTEGER NOT NULL,
+    tam_tanda INTEGER NOT NULL,
+    reglamento TEXT NOT NULL,  -- nombre:huella, ver reglamento.py
+    creado REAL NOT NULL,
+    UNIQUE (alineacion, semilla, partidas, tam_tanda, reglamento)
+);
+-- tandas terminadas (el punto de control): se escriben en la misma
+-- transacción que sus partidas. asientos son los bots por asiento ("BDBD")
+-- y la semilla es todo el estado del random.Random de la tanda
+CREATE TABLE IF NOT EXISTS tandas (
+    torneo INTEGER NOT NULL,
+    tanda INTEGER NOT NULL,
+    asientos TEXT NOT NULL,
+    semilla TEXT NOT NULL,
+    PRIMARY KEY (torneo, tanda)
+) WITHOUT ROWID;
+-- una fila por partida, guardadas en orden de tanda (así agrupar por tanda
+-- no necesita ordenar); ganador es el asiento que ganó, NULL si nadie
+CREATE TABLE IF NOT EXISTS partidas (
+    torneo INTEGER NOT NULL,
+    tanda INTEGER NOT NULL,
+    partida INTEGER NOT NULL,
+    ganador INTEGER,
+    turnos INTEGER NOT NULL,
+    mezclas INTEGER NOT NULL,
+    PRIMARY KEY (torneo, tanda, partida)
+) WITHOUT ROWID;
+"""
+
+TAM_LOTE = 20_000  # partidas por transacción
+CADA_SEGUNDOS = 10.0  # o antes, si pasó este tiempo desde la última
+
+
+class AlmacenResultados:
+    """
+    Resultados de torneos en una base SQLite local, para corridas largas.
+    Recibe el resumen de cada partida por tanda y los escribe en lotes (una
+    transacción cada TAM_LOTE partidas o CADA_SEGUNDOS segundos), junto con
+    qué tandas quedaron terminadas. Si la corrida se corta, al retomarla se
+    saltean las tandas guardadas: como cada tanda tiene su semilla, las que
+    faltan se juegan igual que si no se hubiera cortado.
+    """
+
+    def __init__(self, ruta, tam_lote=TAM_LOTE, cada_segundos=CADA_SEGUNDOS):
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA)
+        self.tam_lote = tam_lote
+        self.cada_segundos = cada_segundos
+        self.filas = []  # partidas todavía sin escribir
+        self.terminadas = []  # tandas todavía sin escribir
+        self.ultima_escritura = time.monotonic()
+
+    def torneo(self, alineacion, semilla, partidas, tam_tanda, reglamento):
+        """
+        Id del torneo con esos parámetros (reglamento es la clave() del
+        Reglamento con el que se juega); si no estaba, lo crea
+        """
+        clave = ("".join(alineacion), str(semilla), partidas, tam_tanda, reglamento)
+        with self.conexion:
+            self.conexion.execute(
+                "INSERT OR IGNORE INTO torneos "
+                "(alineacion, semilla, partidas, tam_tanda, reglamento, creado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*clave, time.time()),
+            )
+        (id_torneo,) = self.conexion.execute(
+            "SELECT id FROM torneos WHERE alineacion = ? AND semilla = ? "
+            "AND partidas = ? AND tam_tanda = ? AND reglamento = ?",
+            clave,
+        ).fetchone()
+        return id_torneo
+
+    def tandas_terminadas(self, id_torneo):
+        return {
+            tanda
+            for (tanda,) in self.conexion.execute(
+                "SELECT tanda FROM tandas WHERE torneo = ?", (id_torneo,)
+            )
+        }
+
+    def agregar_tanda(self, id_torneo, idx, tanda, resumenes):
+        """
+        Guarda una tanda terminada. resumenes son (ganador_idx, turnos,
+        mezclas) de cada partida, en orden
+        """
+        bots, semilla, _ = tanda
+        self.filas.extend(
+            (id_torneo, idx, i, ganador, turnos, mezclas)
+            for i, (ganador, turnos, mezclas) in enumerate(resumenes)
+        )
+        self.terminadas.append((id_torneo, idx, "".join(bots), semilla))
+        if (
+            len(self.filas) >= self.tam_lote
+            or time.monotonic() - self.ultima_escritura >= self.cada_segundos
+        ):
+            self.escribir()
+
+    def escribir(self):
+        """
+        Escribe lo pendiente en una sola transacción
+        """
+        with self.conexion:
+            self.conexion.executemany(
+                "INSERT INTO partidas VALUES (?, ?, ?, ?, ?, ?)", self.filas
+            )
+            self.conexion.executemany(
+                "INSERT INTO tandas VALUES (?, ?, ?, ?)", self.terminadas
+            )
+        self.filas = []
+        self.terminadas = []
+        self.ultima_escritura = time.monotonic()
+
+    def cerrar(self):
+        self.escribir()
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    # --- consultas ---
+
+    def torneos(self):
+        return self.conexion.execute(
+            "SELECT id, alineacion, semilla, partidas, tam_tanda, reglamento "
+            "FROM torneos"
+        ).fetchall()
+
+    def por_mesa(self, id_torneo):
+        """
+        Lo jugado en el torneo sumado por forma de sentar a los bots:
+        (asientos, partidas, victorias de cada asiento, turnos, mezclas).
+        Es una sola pasada por las partidas, agrupando por tanda
+        """
+        (alineacion,) = self.conexion.execute(
+            "SELECT alineacion FROM torneos WHERE id = ?", (id_torneo,)
+        ).fetchone()
+        # SUM da NULL si en la tanda nadie ganó (max_turnos): mejor 0
+        ganadas = "".join(
+            f", COALESCE(SUM(ganador = {asiento}), 0)"
+            for asiento in range(len(alineacion))
+        )
+        asientos_de = dict(
+            self.conexion.execute(
+                "SELECT tanda, asientos FROM tandas WHERE torneo = ?", (id_torneo,)
+            )
+        )
+        mesas = {}
+        for tanda, partidas, turnos, mezclas, *victorias in self.conexion.execute(
+            f"SELECT tanda, COUNT(*), SUM(turnos), SUM(mezclas){ganadas} "
+            "FROM partidas WHERE torneo = ? GROUP BY tanda",
+            (id_torneo,),
+        ):
+            asientos = asientos_de[tanda]
+            mesa = mesas.get(asientos)
+            if mesa is None:
+                mesa = mesas[asientos] = [0, [0] * len(alineacion), 0, 0]
+            mesa[0] += partidas
+            mesa[1] = [a + int(b) for a, b in zip(mesa[1], victorias)]
+            mesa[2] += turnos
+            mesa[3] += mezclas
+        return [
+            (asientos, partidas, ganadas, turnos, mezclas)
+            for asientos, (partidas, ganadas, turnos, mezclas) in mesas.items()
+        ]
+
+
+def resumen(almacen, id_torneo):
+    """
+    Partidas, turnos y mezclas promedio, victorias por bot (por asiento
+    ocupado) y por asiento
+    """
+    partidas = turnos = mezclas = 0
+    victorias = {}
+    ocupados = {}
+    por_asiento = {}
+    for asientos, en_mesa, ganadas, turnos_mesa, mezclas_mesa in almacen.por_mesa(
+        id_torneo
+    ):
+        partidas += en_mesa
+        turnos += turnos_mesa
+        mezclas += mezclas_mesa
+        for asiento, bot in enumerate(asientos):
+            ocupados[bot] = ocupados.get(bot, 0) + en_mesa
+            victorias[bot] = victorias.get(bot, 0) + ganadas[asiento]
+            por_asiento[asiento] = por_asiento.get(asiento, 0) + ganadas[asiento]
+
+    lineas = [
+        f"Partidas: {partidas}",
+        f"Turnos promedio: {turnos / max(partidas, 1):.1f}",
+        f"Mezclas por partida: {mezclas / max(partidas, 1):.2f}",
+    ]
+    for bot in sorted(ocupados):
+        lineas.append(
+            f"  Bot {bot}: {victorias[bot]} victorias "
+            f"({victorias[bot] / ocupados[bot]:.2%} por asiento)"
+        )
+    for asiento in sorted(por_asiento):
+        lineas.append(f"  Asiento {asiento}: {por_asiento[asiento]} victorias")
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Resume los torneos guardados con torneo.py --resultados"
+    )
+    parser.add_argument("base")
+    parser.add_argument("--torneo", type=int, help="id (por defecto todos)")
+    args = parser.parse_args()
+
+    with AlmacenResultados(args.base) as almacen:
+        for (
+            id_torneo,
+            alineacion,
+            semilla,
+            partidas,
+            _,
+            reglamento,
+        ) in almacen.torneos():
+            if args.torneo is not None and id_torneo != args.torneo:
+                continue
+            inicio = time.perf_counter()
+            texto = resumen(almacen, id_torneo)
+            segundos = time.perf_counter() - inicio
+            print(
+                f"Torneo {id_torneo}: {alineacion}, semilla {semilla}, "
+                f"reglamento {reglamento}, {partidas} partidas pedidas "
+                f"({segundos:.2f} s)"
+            )
+            print(texto)
@@ -0,0 +1,463 @@
+import argparse
+import asyncio
+import itertools
+import random
+import threading
+
+from app import (
+    CARTAS_CODIGO,
+    JUGABLES,
+    TIPOS_ACCION,
+    Juego,
+    Jugador,
+    JugadorHeuristico,
+    nombres_asientos,
+)
+from eventos import MENSAJES
+from torneo import BOTS
+
+# Protocolo de a una línea de texto por mensaje.
+# El cliente manda:
+#   HOLA <nombre>      para sentarse en la próxima mesa con lugar
+#   JUGAR <código>     juega la carta de ese código
+#   ADNA <código>      la juega y dice Adná (solo cuenta con 2 cartas en mano)
+#   TOMAR              toma una carta del mazo
+# El servidor manda:
+#   MESA <id> <asiento>, EMPIEZA <nombres>, EVENTO <texto>,
+#   MANO <códigos> y TURNO <código tope> <acumuladas> <segundos> cuando le
+#   toca, TIEMPO si no contestó a tiempo (tomó una carta), FIN <ganador o ->
+#   y ERROR <motivo>.
+# Los códigos de carta son los de app.CODIGOS (color * 13 + valor).
+HUMANO = "H"  # asiento de la alineación que ocupa un cliente
+TIMEOUT = 30.0  # segundos para cada jugada de un cliente
+BACKLOG = 1024  # conexiones esperando que se las acepte
+
+
+class Conexion:
+    """
+    Un cliente conectado. Una tarea lee las líneas a medida que llegan
+    (así se nota enseguida si se desconecta) y las deja en una cola.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.abierta = True
+        self.lineas = asyncio.Queue()
+        self.cerrada = asyncio.Event()
+        self.tarea = asyncio.create_task(self._leer())
+
+    async def _leer(self):
+        try:
+            while linea := await self.reader.readline():
+                await self.lineas.put(linea.decode(errors="replace").strip())
+        except ConnectionError:
+            pass
+        finally:
+            self.abierta = False
+            self.lineas.put_nowait(None)
+            self.cerrada.set()
+
+    def enviar(self, linea):
+        if self.abierta:
+            self.writer.write(linea.encode() + b"\n")
+
+    def descartar(self):
+        """
+        Tira lo que llegó fuera de turno (ej. una jugada después del timeout)
+        """
+        while not self.lineas.empty():
+            if self.lineas.get_nowait() is None:
+                self.lineas.put_nowait(None)  # la desconexión no se pierde
+                return
+
+    async def leer(self, timeout=None):
+        """
+        Próxima línea, None si se desconectó. TimeoutError si no llega a tiempo.
+        """
+        return await asyncio.wait_for(self.lineas.get(), timeout)
+
+    async def vaciar_envios(self):
+        # espera si el cliente no lee, así un cliente lento no llena la memoria
+        if self.abierta:
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                self.abierta = False
+
+    def cerrar(self):
+        self.abierta = False
+        self.writer.close()
+
+
+class SalidaMesa:
+    """
+    Salida de eventos de una mesa: le manda cada mensaje a los clientes
+    sentados en ella. Los eventos de un bot que piensa en otro hilo se
+    mandan desde el event loop, en el mismo orden.
+    """
+
+    activa = True
+
+    def __init__(self, conexiones):
+        self.conexiones = conexiones
+        self.loop = asyncio.get_running_loop()
+        self.hilo = threading.get_ident()
+
+    def emitir(self, tipo, **datos):
+        linea = "EVENTO " + MENSAJES[tipo].format(**datos).strip().replace("\n", " ")
+        if threading.get_ident() != self.hilo:
+            self.loop.call_soon_threadsafe(self._enviar, linea)
+        else:
+            self._enviar(linea)
+
+    def _enviar(self, linea):
+        for conexion in self.conexiones:
+            conexion.enviar(linea)
+
+
+class JugadorRemoto(Jugador):
+    """
+    Humano que juega desde un cliente. La mesa le pide la jugada por la red
+    y la deja en jugada antes de llamar a jugar(), que aplica las mismas
+    reglas que JugadorHumano.
+    """
+
+    def __init__(self, nombre, conexion):
+        super().__init__(nombre)
+        self.es_humano = True
+        self.conexion = conexion
+        self.jugada = None  # (código o None para tomar, dijo Adná)
+
+    def debe_cumplir(self, juego):
+        """
+        Hay acumulación pendiente y no tiene con qué seguirla: cumple sin elegir
+        """
+        tope = juego.mazo.ver_tope_pozo()
+        return (
+            tope.valor in TIPOS_ACCION
+            and juego.accion_pendiente
+            and tope.valor not in [carta.valor for carta in self.mano]
+        )
+
+    def jugar(self, juego):
+        if self.debe_cumplir(juego):
+            self.tomar_cartas_del_mazo(juego.mazo, juego.cartas_acumuladas)
+            juego.cartas_acumuladas = 0
+            juego.accion_pendiente = None
+            return None
+
+        codigo, adna = self.jugada or (None, False)
+        self.jugada = None
+        if codigo is None:
+            self.tomar_cartas_del_mazo(juego.mazo, 1)
+            return None
+
+        tope = juego.mazo.ver_tope_pozo()
+        if self.mano.conteo[codigo] and juego.es_jugada_valida(
+            CARTAS_CODIGO[codigo], tope
+        ):
+            carta = self.jugar_codigo(codigo, juego.mazo)
+            if adna and len(self.mano) == 1:
+                self.dijo_adna = True
+            return carta
+
+        # jugada inválida: como en la consola, toma la acumulación o una carta
+        cartas_a_agarrar = juego.cartas_acumuladas if juego.accion_pendiente else 1
+        self.tomar_cartas_del_mazo(juego.mazo, cartas_a_agarrar)
+        return None
+
+
+def leer_jugada(linea):
+    """
+    (código o None, dijo Adná) a partir de una línea del cliente.
+    Cualquier cosa que no se entienda es tomar una carta.
+    """
+    partes = (linea or "").split()
+    if len(partes) == 2 and partes[0] in ("JUGAR", "ADNA") and partes[1].isdigit():
+        codigo = int(partes[1])
+        if codigo < len(CARTAS_CODIGO):
+            return codigo, partes[0] == "ADNA"
+    return None, False
+
+
+class Mesa:
+    """
+    Una partida del servidor: asientos de bots y asientos de clientes (se
+    les pide la jugada con timeout). B, D y los demás bots heurísticos
+    juegan en línea, sin esperar; los que piensan con un presupuesto de
+    tiempo (el de Monte Carlo) juegan en otro hilo, así no frenan al resto
+    de las mesas.
+    """
+
+    def __init__(self, id, alineacion, timeout=TIMEOUT, max_turnos=None, rng=None):
+        self.id = id
+        self.alineacion = alineacion
+        self.timeout = timeout
+        self.max_turnos = max_turnos
+        self.rng = rng
+        self.asientos = [None] * len(alineacion)  # (nombre, conexion) de clientes
+        self.juego = None
+        self.timeouts = 0
+
+    def libres(self):
+        return [
+            i
+            for i, bot in enumerate(self.alineacion)
+            if bot == HUMANO and self.asientos[i] is None
+        ]
+
+    def sentar(self, nombre, conexion):
+        asiento = self.libres()[0]
+        self.asientos[asiento] = (nombre, conexion)
+        conexion.enviar(f"MESA {self.id} {asiento}")
+        return asiento
+
+    def levantar(self, conexion):
+        # se fue antes de empezar: el lugar queda para otro
+        for i, sentado in enumerate(self.asientos):
+            if sentado is not None and sentado[1] is conexion:
+                self.asientos[i] = None
+
+    def conexiones(self):
+        return [sentado[1] for sentado in self.asientos if sentado is not None]
+
+    def armar_jugadores(self):
+        jugadores = []
+        nombres = nombres_asientos(len(self.alineacion))
+        for i, bot in enumerate(self.alineacion):
+            if bot == HUMANO:
+                nombre, conexion = self.asientos[i]
+                jugadores.append(JugadorRemoto(nombre, conexion))
+            else:
+                jugadores.append(BOTS[bot](nombres[i]))
+        return jugadores
+
+    async def pedir_jugada(self, jugador):
+        juego = self.juego
+        if jugador.debe_cumplir(juego):
+            return  # no hay nada que elegir
+        conexion = jugador.conexion
+        if not conexion.abierta:
+            jugador.jugada = None  # se fue: toma
+            return
+        conexion.descartar()
+        conexion.enviar("MANO " + " ".join(str(carta.codigo) for carta in jugador.mano))
+        conexion.enviar(
+            f"TURNO {juego.mazo.ver_tope_pozo().codigo} "
+            f"{juego.cartas_acumuladas} {self.timeout:g}"
+        )
+        await conexion.vaciar_envios()
+        try:
+            linea = await conexion.leer(self.timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            conexion.enviar("TIEMPO")
+            linea = None
+        jugador.jugada = leer_jugada(linea)
+
+    async def jugar(self):
+        """
+        El mismo bucle que Juego.jugar_ronda, pero esperando a los clientes
+        sin frenar al resto de las mesas. Devuelve el ResultadoPartida.
+        """
+        conexiones = self.conexiones()
+        juego = self.juego = Juego(
+            jugadores=self.armar_jugadores(),
+            headless=True,
+            max_turnos=self.max_turnos,
+            rng=self.rng,
+            eventos=SalidaMesa(conexiones),
+        )
+        nombres = " ".join(jugador.nombre for jugador in juego.jugadores)
+        for conexion in conexiones:
+            conexion.enviar(f"EMPIEZA {nombres}")
+        juego.preparar_partida()
+
+        while True:
+            if juego.max_turnos is not None and juego.turnos >= juego.max_turnos:
+                break
+            if not any(conexion.abierta for conexion in conexiones):
+                break  # se fueron todos, no tiene sentido seguir
+
+            jugador = juego.jugadores[juego.jugador_actual_idx]
+            juego.revisar_adna(jugador)
+            if juego.turno_activo:
+                if isinstance(jugador, JugadorRemoto):
+                    await self.pedir_jugada(jugador)
+                if isinstance(jugador, (JugadorRemoto, JugadorHeuristico)):
+                    gano = juego.jugar_turno(jugador)
+                else:
+                    # mientras piensa nadie más toca este juego
+                    gano = await asyncio.to_thread(juego.jugar_turno, jugador)
+                if gano:
+                    juego.ganador = jugador
+                    break
+            juego.avanzar_turno()
+            await asyncio.sleep(0)  # que avancen las otras mesas
+
+        ganador = juego.ganador.nombre if juego.ganador else "-"
+        for conexion in conexiones:
+            conexion.enviar(f"FIN {ganador}")
+            await conexion.vaciar_envios()
+            conexion.cerrar()
+        return juego.resultado()
+
+
+class Servidor:
+    """
+    Muchas mesas a la vez en un solo event loop. Cada cliente que llega se
+    sienta en la mesa que está esperando gente; cuando se llena, arranca.
+    """
+
+    def __init__(
+        self, alineacion="HDBD", timeout=TIMEOUT, max_turnos=None, semilla=None
+    ):
+        if HUMANO not in alineacion:
+            raise ValueError(f"La alineación necesita al menos un asiento {HUMANO}")
+        if any(bot != HUMANO and bot not in BOTS for bot in alineacion):
+            raise ValueError(f"Bots disponibles: {', '.join(BOTS)}")
+        self.alineacion = alineacion
+        self.timeout = timeout
+        self.max_turnos = max_turnos
+        self.semilla = semilla
+        self.ids = itertools.count()
+        self.esperando = None  # la mesa que todavía tiene lugar
+        self.en_juego = set()  # tareas de las mesas que se están jugando
+        self.resultados = []
+        self.timeouts = 0
+
+    def nueva_mesa(self):
+        id = next(self.ids)
+        rng = None
+        if self.semilla is not None:
+            rng = random.Random(f"{self.semilla}:{id}")
+        return Mesa(id, self.alineacion, self.timeout, self.max_turnos, rng)
+
+    async def atender(self, reader, writer):
+        """
+        Lo llama asyncio por cada cliente que se conecta
+        """
+        conexion = Conexion(reader, writer)
+        try:
+            linea = await conexion.leer(self.timeout)
+        except TimeoutError:
+            linea = None
+        partes = (linea or "").split()
+        if len(partes) != 2 or partes[0] != "HOLA":
+            conexion.enviar("ERROR primero hay que mandar HOLA <nombre>")
+            await conexion.vaciar_envios()
+            conexion.cerrar()
+            return
+
+        if self.esperando is None:
+            self.esperando = self.nueva_mesa()
+        mesa = self.esperando
+        mesa.sentar(partes[1][:16], conexion)
+        if not mesa.libres():
+            self.esperando = None
+            tarea = asyncio.create_task(self.jugar_mesa(mesa))
+            self.en_juego.add(tarea)
+            tarea.add_done_callback(self.en_juego.discard)
+
+        await conexion.cerrada.wait()
+        if mesa is self.esperando:
+            mesa.levantar(conexion)
+
+    async def jugar_mesa(self, mesa):
+        self.resultados.append(await mesa.jugar())
+        self.timeouts += mesa.timeouts
+
+    async def abrir(self, host="127.0.0.1", puerto=7777, unix=None):
+        """
+        Empieza a aceptar clientes y devuelve el server de asyncio
+        """
+        # backlog grande: cuando se conectan cientos de clientes juntos
+        if unix is not None:
+            return await asyncio.start_unix_server(
+                self.atender, path=unix, backlog=BACKLOG
+            )
+        return await asyncio.start_server(self.atender, host, puerto, backlog=BACKLOG)
+
+    async def servir(self, host="127.0.0.1", puerto=7777, unix=None):
+        async with await self.abrir(host, puerto, unix) as servidor:
+            await servidor.serve_forever()
+
+
+# --- cliente de prueba ---
+
+
+def elegir_jugada(mano, tope):
+    # la primera carta que se pueda jugar (diciendo Adná si corresponde)
+    for codigo in mano:
+        if JUGABLES[tope] >> codigo & 1:
+            return f"ADNA {codigo}" if len(mano) == 2 else f"JUGAR {codigo}"
+    return "TOMAR"
+
+
+async def cliente_prueba(nombre, host="127.0.0.1", puerto=7777, unix=None, callar=0.0):
+    """
+    Cliente que juega solo. Con callar (probabilidad) a veces no contesta,
+    para probar los timeouts. Devuelve el ganador que anunció el servidor.
+    """
+    if unix is not None:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, puerto)
+    writer.write(f"HOLA {nombre}\n".encode())
+    mano = []
+    ganador = None
+    while linea := await reader.readline():
+        comando, _, resto = linea.decode().strip().partition(" ")
+        if comando == "MANO":
+            mano = [int(codigo) for codigo in resto.split()]
+        elif comando == "TURNO":
+            if random.random() >= callar:
+                tope = int(resto.split()[0])
+                writer.write(f"{elegir_jugada(mano, tope)}\n".encode())
+        elif comando == "FIN":
+            ganador = resto
+        elif comando == "ERROR":
+            raise RuntimeError(resto)
+    writer.close()
+    return ganador
+
+
+async def prueba(clientes, host="127.0.0.1", puerto=7777, unix=None, callar=0.0):
+    ganadores = await asyncio.gather(
+        *(cliente_prueba(f"c{i}", host, puerto, unix, callar) for i in range(clientes))
+    )
+    return ganadores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de mesas de ADNA")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=7777)
+    parser.add_argument("--unix", help="socket Unix en vez de TCP")
+    parser.add_argument(
+        "--alineacion", default="HDBD", help=f"{HUMANO} para clientes, o bots"
+    )
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    parser.add_argument("--semilla", default=None)
+    parser.add_argument(
+        "--clientes",
+        type=int,
+        help="en vez de servir, conecta esta cantidad de clientes de prueba",
+    )
+    parser.add_argument(
+        "--callar", type=float, default=0.0, help="probabilidad de no contestar"
+    )
+    args = parser.parse_args()
+
+    if args.clientes:
+        ganadores = asyncio.run(
+            prueba(args.clientes, args.host, args.puerto, args.unix, args.callar)
+        )
+        print(f"{len(ganadores)} clientes terminaron")
+    else:
+        servidor = Servidor(args.alineacion, args.timeout, semilla=args.semilla)
+        try:
+            asyncio.run(servidor.servir(args.host, args.puerto, args.unix))
+        except KeyboardInterrupt:
+            print(f"{len(servidor.resultados)} partidas jugadas")
@@ -0,0 +1,353 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from app import (
+    CARTAS_PENALIDAD_ADNA,
+    ES_ACCION_CODIGO,
+    ES_TOMA_CODIGO,
+    Juego,
+    codigos_de,
+    nombres_asientos,
+)
+from estado import PENALIDAD_ADNA, TOMAR, EstadoJuego, turno_de
+from torneo import BOTS
+
+# valores, siempre desde el punto de vista de un jugador
+GANA = 1
+PIERDE = -1
+INDECIDIDO = 0  # depende de una mezcla o no alcanzó la profundidad
+
+# qué dice el valor guardado en la tabla
+EXACTO = 0
+MINIMO = 1  # el valor es por lo menos ese (hubo corte)
+MAXIMO = 2  # el valor es como mucho ese
+
+MASCARA_TOMAS = sum(1 << codigo for codigo, toma in enumerate(ES_TOMA_CODIGO) if toma)
+MASCARA_OTRAS_ACCIONES = (
+    sum(1 << codigo for codigo, accion in enumerate(ES_ACCION_CODIGO) if accion)
+    & ~MASCARA_TOMAS
+)
+
+Solucion = namedtuple("Solucion", ["valor", "jugada", "valores", "profundidad"])
+
+
+def cota_profundidad(estado):
+    """
+    Turnos que puede durar, como mucho, lo que queda de la partida sin
+    mezclar: cada turno juega una carta o saca del mazo, así que manos + 2 *
+    mazo baja en cada uno
+    """
+    return sum(estado.cantidades) + 2 * len(estado.mazo) + 1
+
+
+class Solucionador:
+    """
+    Resuelve finales de partida conociendo el orden del mazo (por ejemplo
+    al analizar partidas grabadas). Búsqueda minimax con poda alfa-beta,
+    profundización iterativa y tabla de transposición, con las reglas de
+    EstadoJuego: acumular Toma 2 / Toma 4 o cumplir la penalidad, Salta,
+    Reversa y la penalidad de Adná para el que ya se la olvidó (después se
+    asume que todos lo dicen, que nunca es peor).
+
+    Con más de dos jugadores es paranoico: todos los rivales juegan en
+    contra del que resuelve. GANA es que puede ganar haga lo que haga el
+    resto, PIERDE que no puede evitar que gane otro e INDECIDIDO que no se
+    sabe: hace falta mezclar el pozo (y el orden de la mezcla no se conoce)
+    o la profundidad no alcanzó.
+
+    La tabla se comparte entre llamadas a resolver(); cuando pasa de
+    max_entradas se vacía.
+    """
+
+    def __init__(self, max_entradas=1 << 20):
+        self.max_entradas = max_entradas
+        self.tabla = {}
+        self.jugador = None
+        self.nodos = 0
+        self.aciertos = 0  # posiciones que salieron de la tabla
+
+    def resolver(self, estado, profundidad=None):
+        """
+        Valor de la posición para el jugador al que le toca y el valor de
+        cada una de sus jugadas. Profundiza de a un turno hasta que todas
+        las jugadas quedan decididas o se llega a profundidad (por defecto
+        cota_profundidad, o sea hasta el final).
+        """
+        estado = estado.copiar()
+        self.jugador = estado.jugador_actual_idx
+        if profundidad is None:
+            profundidad = cota_profundidad(estado)
+        if profundidad < 1:
+            raise ValueError(f"La profundidad tiene que ser 1 o más, no {profundidad}")
+
+        jugadas = self._jugadas(estado, None)
+        valores = {}
+        for p in range(1, profundidad + 1):
+            for jugada in jugadas:
+                valores[jugada] = self._valor_jugada(
+                    estado, jugada, p - 1, PIERDE, GANA
+                )
+            # la mejor primero en la próxima vuelta
+            jugadas.sort(key=lambda j: -valores[j])
+            if INDECIDIDO not in valores.values():
+                break
+        return Solucion(valores[jugadas[0]], jugadas[0], valores, p)
+
+    def valor_turno(self, estado, turno, profundidad):
+        """
+        Valor, para el jugador al que le toca, de jugar el turno con turno
+        (uno de estado.TURNOS, mañas incluidas) y seguir buscando hasta
+        profundidad turnos en total, como los de Solucion.valores. La
+        mezcla, si la hay, sale del rng del estado.
+        """
+        estado = estado.copiar()
+        self.jugador = estado.jugador_actual_idx
+        mazo = estado.mazo
+        turno(estado)
+        if estado.mazo is not mazo:
+            return INDECIDIDO  # tomó más de lo que había y se mezcló el pozo
+        return self._buscar(estado, profundidad - 1, PIERDE, GANA)
+
+    # --- búsqueda ---
+
+    def _valor_jugada(self, estado, jugada, profundidad, alfa, beta):
+        if self._hay_que_mezclar(estado, jugada):
+            return INDECIDIDO
+        estado.hacer(jugada)
+        valor = self._buscar(estado, profundidad, alfa, beta)
+        estado.deshacer()
+        return valor
+
+    def _buscar(self, estado, profundidad, alfa, beta):
+        self.nodos += 1
+        if estado.ganador is not None:
+            return GANA if estado.ganador == self.jugador else PIERDE
+        if not profundidad:
+            return INDECIDIDO
+
+        clave = self._clave(estado)
+        entrada = self.tabla.get(clave)
+        anterior = None
+        if entrada is not None:
+            valor, cota, guardada, anterior = entrada
+            # ganar o perder seguro vale a cualquier profundidad
+            if (valor == GANA and cota != MAXIMO) or (
+                valor == PIERDE and cota != MINIMO
+            ):
+                self.aciertos += 1
+                return valor
+            if guardada >= profundidad and (
+                cota == EXACTO
+                or (cota == MINIMO and valor >= beta)
+                or (cota == MAXIMO and valor <= alfa)
+            ):
+                self.aciertos += 1
+                return valor
+
+        maximiza = estado.jugador_actual_idx == self.jugador
+        alfa_inicial, beta_inicial = alfa, beta
+        mejor = None
+        for jugada in self._jugadas(estado, anterior):
+            valor = self._valor_jugada(estado, jugada, profundidad - 1, alfa, beta)
+            if maximiza:
+                if mejor is None or valor > mejor_valor:
+                    mejor, mejor_valor = jugada, valor
+                alfa = max(alfa, valor)
+            else:
+                if mejor is None or valor < mejor_valor:
+                    mejor, mejor_valor = jugada, valor
+                beta = min(beta, valor)
+            if alfa >= beta:
+                break
+
+        if mejor_valor <= alfa_inicial:
+            cota = MAXIMO
+        elif mejor_valor >= beta_inicial:
+            cota = MINIMO
+        else:
+            cota = EXACTO
+        if len(self.tabla) >= self.max_entradas:
+            self.tabla.clear()
+        self.tabla[clave] = (mejor_valor, cota, profundidad, mejor)
+        return mejor_valor
+
+    def _jugadas(self, estado, anterior):
+        """
+        Jugadas en el orden en que conviene probarlas: la mejor de la tabla,
+        Toma 4 / Toma 2, Salta y Reversa, numéricas y al final tomar
+        """
+        idx = estado.jugador_actual_idx
+        if estado.sin_adna[idx] and estado.cantidades[idx] == 1:
+            return [PENALIDAD_ADNA]
+        jugables = estado.jugables()
+        jugadas = list(codigos_de(jugables & MASCARA_TOMAS))
+        jugadas += codigos_de(jugables & MASCARA_OTRAS_ACCIONES)
+        jugadas += codigos_de(jugables & ~MASCARA_TOMAS & ~MASCARA_OTRAS_ACCIONES)
+        jugadas.append(TOMAR)
+        if anterior is not None and anterior != jugadas[0]:
+            jugadas.remove(anterior)
+            jugadas.insert(0, anterior)
+        return jugadas
+
+    @staticmethod
+    def _hay_que_mezclar(estado, jugada):
+        # si para tomar no alcanza el mazo se mezcla el pozo: de ahí en más
+        # no se sabe el orden
+        if jugada == TOMAR:
+            cantidad = estado.cartas_acumuladas if estado.accion_pendiente else 1
+        elif jugada == PENALIDAD_ADNA:
+            cantidad = CARTAS_PENALIDAD_ADNA
+        else:
+            return False
+        return cantidad > len(estado.mazo) and len(estado.pozo) > 1
+
+    def _clave(self, estado):
+        # todo lo que cambia lo que puede pasar de acá en más: del pozo solo
+        # importan el tope y si hay algo para mezclar, y entre dos el
+        # sentido da lo mismo
+        return (
+            self.jugador,
+            bytes(estado.mazo),
+            estado.pozo[-1],
+            len(estado.pozo) > 1,
+            tuple(map(bytes, estado.manos)),
+            estado.jugador_actual_idx,
+            estado.direccion if estado.cantidad_jugadores > 2 else 1,
+            estado.cartas_acumuladas,
+            estado.accion_pendiente,
+            tuple(estado.sin_adna),
+        )
+
+
+# --- qué tan lejos juegan B y D de lo óptimo ---
+
+
+class Analisis:
+    """
+    Cuenta, de los turnos analizados de cada bot, cuántas veces su jugada
+    valía lo mismo que la mejor y cuántas dejó pasar un resultado seguro
+    """
+
+    def __init__(self):
+        self.posiciones = {}  # por bot
+        self.optimas = {}
+        self.ganadas_perdidas = {}  # tenía una ganada segura y no la jugó
+        self.perdidas_evitables = {}  # jugó a una perdida segura que no lo era
+
+    def agregar(self, bot, solucion, valor):
+        """
+        valor es el de la jugada que hizo el bot
+        """
+        for contador in (
+            self.posiciones,
+            self.optimas,
+            self.ganadas_perdidas,
+            self.perdidas_evitables,
+        ):
+            contador.setdefault(bot, 0)
+        self.posiciones[bot] += 1
+        if valor == solucion.valor:
+            self.optimas[bot] += 1
+        elif solucion.valor == GANA:
+            self.ganadas_perdidas[bot] += 1
+        elif valor == PIERDE:
+            self.perdidas_evitables[bot] += 1
+
+    def resumen(self):
+        lineas = []
+        for bot in sorted(self.posiciones):
+            posiciones = self.posiciones[bot]
+            lineas.append(
+                f"Bot {bot}: {posiciones} posiciones, óptima en "
+                f"{self.optimas[bot] / posiciones:.1%}, ganadas seguras que "
+                f"dejó pasar: {self.ganadas_perdidas[bot]}, perdidas "
+                f"evitables: {self.perdidas_evitables[bot]}"
+            )
+        return "\n".join(lineas)
+
+
+def analizar_bots(
+    partidas,
+    alineacion="BD",
+    max_cartas=6,
+    profundidad=16,
+    semilla=0,
+    max_turnos=2000,
+    solucionador=None,
+):
+    """
+    Juega partidas entre bots y, en cada turno de un bot en el que entre
+    todas las manos quedan max_cartas o menos, resuelve la posición (con el
+    mazo que hay de verdad) y compara la jugada del bot con la mejor.
+    La jugada del bot es la que hace de verdad en Juego (el turno de
+    estado.turno_de), aunque no siga las reglas: B cumple una penalidad y
+    pasa, D la cumple y juega.
+    """
+    solucionador = solucionador or Solucionador()
+    analisis = Analisis()
+    rng = random.Random(semilla)
+    jugadores = [
+        BOTS[bot](nombre)
+        for bot, nombre in zip(alineacion, nombres_asientos(len(alineacion)))
+    ]
+    juego = Juego(jugadores=jugadores, headless=True, rng=rng)
+    for i in range(partidas):
+        if i:
+            juego.reiniciar()
+        juego.preparar_partida()
+        while juego.ganador is None and juego.turnos < max_turnos:
+            idx = juego.jugador_actual_idx
+            jugador = jugadores[idx]
+            juego.revisar_adna(jugador)
+            if juego.turno_activo:
+                turno = turno_de(type(jugador))
+                if (
+                    turno is not None
+                    and sum(len(j.mano) for j in jugadores) <= max_cartas
+                ):
+                    # con su propio rng: si el turno mezcla no toca el del juego
+                    estado = EstadoJuego.desde_juego(juego, random.Random(0))
+                    solucion = solucionador.resolver(estado, profundidad)
+                    valor = solucionador.valor_turno(
+                        estado, turno, solucion.profundidad
+                    )
+                    analisis.agregar(alineacion[idx], solucion, valor)
+                if juego.jugar_turno(jugador):
+                    juego.ganador = jugador
+                    break
+            juego.avanzar_turno()
+    return analisis
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compara las jugadas de B y D con las de un solucionador exacto"
+    )
+    parser.add_argument("partidas", type=int)
+    parser.add_argument("--alineacion", default="BD")
+    parser.add_argument(
+        "--cartas", type=int, default=6, help="analiza con esta cantidad o menos"
+    )
+    parser.add_argument("--profundidad", type=int, default=16)
+    parser.add_argument("--semilla", default="0")
+    args = parser.parse_args()
+
+    solucionador = Solucionador()
+    inicio = time.perf_counter()
+    analisis = analizar_bots(
+        args.partidas,
+        alineacion=args.alineacion,
+        max_cartas=args.cartas,
+        profundidad=args.profundidad,
+        semilla=args.semilla,
+        solucionador=solucionador,
+    )
+    segundos = time.perf_counter() - inicio
+    print(analisis.resumen())
+    print(
+        f"{solucionador.nodos} nodos en {segundos:.1f} s "
+        f"({solucionador.nodos / segundos:.0f}/s), "
+        f"{solucionador.aciertos} desde la tabla"
+    )
@@ -0,0 +1,696 @@
+import argparse
+import json
+import math
+import os
+import random
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from app import (
+    REGLAMENTO,
+    CacheDecisiones,
+    JugadorBotB,
+    JugadorBotD,
+    JugadorHeuristico,
+    nombres_asientos,
+    simular,
+)
+from bot_montecarlo import JugadorMontecarlo
+from instrumentacion import Instrumentacion
+from registro import EscritorRegistros, jugar_grabando
+from reglamento import Reglamento
+from resultados import AlmacenResultados
+
+# bots que pueden anotarse en un torneo, por nombre corto
+BOTS = {
+    "B": JugadorBotB,
+    "D": JugadorBotD,
+    "M": JugadorMontecarlo,
+}
+
+# caches de jugadas de cada proceso, por (bot, capacidad): duran entre tandas
+_caches = {}
+
+
+class EstadisticasTorneo:
+    """
+    Acumula victorias y turnos de un montón de partidas.
+    Cada worker arma la suya y al final se combinan todas.
+    """
+
+    def __init__(self):
+        self.partidas = 0
+        self.sin_ganador = 0
+        self.turnos = 0
+        self.mezclas = 0
+        # por nombre de bot
+        self.victorias = Counter()
+        self.asientos = Counter()  # cuántas veces se sentó cada bot
+        # por posición en la mesa (0 es el que arranca)
+        self.victorias_asiento = Counter()
+        # (ganador, perdedor): veces que un bot le ganó a otro sentado en la
+        # misma mesa. El ganador le gana a cada uno de los demás (para el Elo)
+        self.duelos = Counter()
+        # mediciones por turno, solo si el torneo se instrumenta
+        self.instrumentacion = None
+        # consultas a las caches de jugadas, por bot (si se usan)
+        self.aciertos_cache = Counter()
+        self.fallos_cache = Counter()
+
+    def agregar(self, bots, resultado):
+        """
+        Suma una partida. bots son los nombres de los bots por asiento
+        """
+        self.partidas += 1
+        self.turnos += resultado.turnos
+        self.mezclas += resultado.mezclas
+        self.asientos.update(bots)
+        if resultado.ganador_idx is None:
+            self.sin_ganador += 1
+        else:
+            ganador = bots[resultado.ganador_idx]
+            self.victorias[ganador] += 1
+            self.victorias_asiento[resultado.ganador_idx] += 1
+            for bot in bots:
+                if bot != ganador:
+                    self.duelos[ganador, bot] += 1
+
+    def agregar_mesa(self, bots, partidas, ganadas, turnos, mezclas):
+        """
+        Suma de una vez muchas partidas con los mismos bots por asiento:
+        ganadas son las victorias de cada asiento y turnos y mezclas los
+        totales (lo que devuelve AlmacenResultados.por_mesa)
+        """
+        self.partidas += partidas
+        self.sin_ganador += partidas - sum(ganadas)
+        self.turnos += turnos
+        self.mezclas += mezclas
+        for bot in bots:
+            self.asientos[bot] += partidas
+        for asiento, victorias in enumerate(ganadas):
+            ganador = bots[asiento]
+            self.victorias[ganador] += victorias
+            self.victorias_asiento[asiento] += victorias
+            for bot in bots:
+                if bot != ganador:
+                    self.duelos[ganador, bot] += victorias
+
+    def combinar(self, otra):
+        self.partidas += otra.partidas
+        self.sin_ganador += otra.sin_ganador
+        self.turnos += otra.turnos
+        self.mezclas += otra.mezclas
+        self.victorias.update(otra.victorias)
+        self.asientos.update(otra.asientos)
+        self.victorias_asiento.update(otra.victorias_asiento)
+        self.duelos.update(otra.duelos)
+        self.aciertos_cache.update(otra.aciertos_cache)
+        self.fallos_cache.update(otra.fallos_cache)
+        if otra.instrumentacion is not None:
+            if self.instrumentacion is None:
+                self.instrumentacion = Instrumentacion(por_clase=True)
+            self.instrumentacion.combinar(otra.instrumentacion)
+        return self
+
+    def tasa_victorias(self, bot):
+        """
+        Victorias por asiento ocupado, así es comparable aunque un bot
+        tenga más lugares en la mesa que otro
+        """
+        if not self.asientos[bot]:
+            return 0.0
+        return self.victorias[bot] / self.asientos[bot]
+
+    def turnos_promedio(self):
+        return self.turnos / self.partidas if self.partidas else 0.0
+
+    def resumen(self):
+        lineas = [
+            f"Partidas: {self.partidas} (sin ganador: {self.sin_ganador})",
+            f"Turnos promedio: {self.turnos_promedio():.1f}",
+            f"Mezclas por partida: {self.mezclas / max(self.partidas, 1):.2f}",
+        ]
+        for bot in sorted(self.asientos):
+            lineas.append(
+                f"  Bot {bot}: {self.victorias[bot]} victorias "
+                f"({self.tasa_victorias(bot):.2%} por asiento)"
+            )
+        for asiento in sorted(self.victorias_asiento):
+            lineas.append(
+                f"  Asiento {asiento}: {self.victorias_asiento[asiento]} victorias"
+            )
+        if len(self.asientos) > 1:
+            lineas.append("Elo (cada ganador le gana a los demás de la mesa):")
+            for bot, elo in sorted(tabla_elo(self.duelos).items(), key=lambda x: -x[1]):
+                lineas.append(f"  Bot {bot}: {elo:+.0f}")
+        for bot in sorted(self.fallos_cache):
+            aciertos, fallos = self.aciertos_cache[bot], self.fallos_cache[bot]
+            lineas.append(
+                f"Cache de jugadas de {bot}: {aciertos / (aciertos + fallos):.1%} "
+                f"aciertos ({aciertos + fallos} consultas)"
+            )
+        if self.instrumentacion is not None:
+            lineas.append(self.instrumentacion.resumen())
+        return "\n".join(lineas)
+
+
+def permutaciones_distintas(alineacion):
+    """
+    Las distintas formas de sentar a los bots, en orden. Con mesas grandes
+    no se puede pasar por todas las permutaciones (10 asientos son 3.6
+    millones) y casi todas se repiten, así que se arman sin repetir.
+    """
+    cantidades = Counter(alineacion)
+    actual = []
+
+    def armar():
+        if len(actual) == len(alineacion):
+            yield tuple(actual)
+            return
+        for bot in sorted(cantidades):
+            if cantidades[bot]:
+                cantidades[bot] -= 1
+                actual.append(bot)
+                yield from armar()
+                actual.pop()
+                cantidades[bot] += 1
+
+    return list(armar())
+
+
+def armar_tandas(n, alineacion, tam_tanda, semilla):
+    """
+    Parte las n partidas en tandas. Cada tanda usa una de las permutaciones
+    de asientos (rotando) y su propia semilla derivada de la semilla del torneo,
+    así el resultado no depende de cuántos procesos haya ni en qué orden terminen.
+    """
+    permutaciones = permutaciones_distintas(alineacion)
+    tandas = []
+    restantes = n
+    i = 0
+    while restantes > 0:
+        cantidad = min(tam_tanda, restantes)
+        bots = permutaciones[i % len(permutaciones)]
+        tandas.append((bots, f"{semilla}:{i}", cantidad))
+        restantes -= cantidad
+        i += 1
+    return tandas
+
+
+def _cache_de(bot, capacidad):
+    cache = _caches.get((bot, capacidad))
+    if cache is None:
+        cache = _caches[bot, capacidad] = CacheDecisiones(capacidad)
+    return cache
+
+
+def jugar_tanda(
+    tanda, grabar=False, instrumentar=False, cache_decisiones=None, resumenes=False
+):
+    """
+    Lo que corre cada worker: juega una tanda con su propio random.Random.
+    Devuelve las estadísticas, si grabar las partidas codificadas (las
+    mismas partidas que sin grabar) y si resumenes (ganador_idx, turnos,
+    mezclas) de cada partida, para guardarlas en resultados.py.
+    Con cache_decisiones (capacidad) los bots heurísticos usan la cache de
+    jugadas del proceso; las partidas son las mismas que sin cache.
+    """
+    bots, semilla, cantidad = tanda
+    rng = random.Random(semilla)
+    clases = [BOTS[bot] for bot in bots]
+    estadisticas = EstadisticasTorneo()
+    instrumentacion = None
+    if instrumentar:
+        instrumentacion = estadisticas.instrumentacion = Instrumentacion(por_clase=True)
+    caches = {}
+    if cache_decisiones:
+        caches = {
+            bot: _cache_de(bot, cache_decisiones)
+            for bot in set(bots)
+            if issubclass(BOTS[bot], JugadorHeuristico)
+        }
+        clases = [
+            partial(clase, cache=caches[bot]) if bot in caches else clase
+            for clase, bot in zip(clases, bots)
+        ]
+    antes = {bot: (cache.aciertos, cache.fallos) for bot, cache in caches.items()}
+
+    partidas = []
+    if not grabar:
+        resultados = simular(
+            cantidad, clases=clases, rng=rng, instrumentacion=instrumentacion
+        )
+    else:
+        resultados = []
+        nombres = nombres_asientos(len(clases))
+        for _ in range(cantidad):
+            jugadores = [clase(nombre) for clase, nombre in zip(clases, nombres)]
+            resultado, datos = jugar_grabando(
+                jugadores, rng=rng, instrumentacion=instrumentacion
+            )
+            resultados.append(resultado)
+            partidas.append(datos)
+    for resultado in resultados:
+        estadisticas.agregar(bots, resultado)
+
+    for bot, cache in caches.items():
+        aciertos, fallos = antes[bot]
+        estadisticas.aciertos_cache[bot] += cache.aciertos - aciertos
+        estadisticas.fallos_cache[bot] += cache.fallos - fallos
+    if resumenes:
+        resumenes = [(r.ganador_idx, r.turnos, r.mezclas) for r in resultados]
+    return estadisticas, partidas, resumenes or []
+
+
+def torneo(
+    n,
+    alineacion=("B", "D", "B", "D"),
+    semilla=0,
+    procesos=None,
+    tam_tanda=500,
+    registro=None,
+    instrumentar=False,
+    cache_decisiones=None,
+    resultados=None,
+):
+    """
+    Juega n partidas headless repartidas en un pool de procesos
+    y devuelve las estadísticas combinadas.
+    Con registro (ruta de archivo) graba todas las partidas, ver registro.py.
+    Con instrumentar las estadísticas traen las mediciones por turno.
+    Con cache_decisiones B y D usan una cache de jugadas de esa capacidad.
+    Con resultados (ruta de una base SQLite, ver resultados.py) guarda el
+    resumen de cada partida y qué tandas terminaron: si el mismo torneo
+    (mismos n, alineación, semilla, tanda y reglamento) ya estaba empezado, sigue desde
+    donde quedó y las estadísticas incluyen lo jugado antes (menos las
+    mediciones de instrumentar, que son solo de esta corrida).
+    """
+    if registro is not None and resultados is not None:
+        # al retomar el registro quedaría con las partidas de una sola corrida
+        raise ValueError("registro y resultados no se pueden usar juntos")
+    tandas = list(enumerate(armar_tandas(n, alineacion, tam_tanda, semilla)))
+    total = EstadisticasTorneo()
+    almacen = None
+    if resultados is not None:
+        almacen = AlmacenResultados(resultados)
+        id_torneo = almacen.torneo(
+            alineacion, semilla, n, tam_tanda, REGLAMENTO.clave()
+        )
+        terminadas = almacen.tandas_terminadas(id_torneo)
+        for asientos, partidas, ganadas, turnos, mezclas in almacen.por_mesa(id_torneo):
+            total.agregar_mesa(tuple(asientos), partidas, ganadas, turnos, mezclas)
+        tandas = [(i, tanda) for i, tanda in tandas if i not in terminadas]
+
+    jugar = partial(
+        jugar_tanda,
+        grabar=registro is not None,
+        instrumentar=instrumentar,
+        cache_decisiones=cache_decisiones,
+        resumenes=almacen is not None,
+    )
+    escritor = EscritorRegistros(registro) if registro is not None else None
+
+    try:
+        # con procesos=1 sin pool, útil para depurar
+        jugadas = _en_orden(jugar, [tanda for _, tanda in tandas], procesos)
+        for (i, tanda), (estadisticas, partidas, resumenes) in zip(tandas, jugadas):
+            # las tandas llegan en orden, así el archivo no depende del pool
+            total.combinar(estadisticas)
+            for datos in partidas:
+                escritor.escribir(datos)
+            if almacen is not None:
+                almacen.agregar_tanda(id_torneo, i, tanda, resumenes)
+    finally:
+        if escritor is not None:
+            escritor.cerrar()
+        if almacen is not None:
+            almacen.cerrar()
+    return total
+
+
+def verificar_cache(
+    n,
+    alineacion=("B", "D", "B", "D"),
+    capacidades=(16, 1 << 16),
+    semilla=0,
+    tam_tanda=500,
+):
+    """
+    Juega las mismas tandas sin cache de jugadas y con una cache de cada
+    capacidad (la chica obliga a desalojar) y las compara partida por
+    partida: cada turno grabado (qué jugó cada uno, qué tomó, penalidades y
+    Adná) y cada resultado tienen que ser iguales. Si algo difiere, o si la
+    cache más chica no llegó a desalojar nada, ValueError.
+    Devuelve, por capacidad y por bot, (tasa de aciertos, desalojos).
+    """
+    tandas = armar_tandas(n, alineacion, tam_tanda, semilla)
+    referencia = [jugar_tanda(tanda, grabar=True, resumenes=True) for tanda in tandas]
+    informe = {}
+    for capacidad in capacidades:
+        # cada capacidad arranca con su cache vacía
+        for clave in [clave for clave in _caches if clave[1] == capacidad]:
+            del _caches[clave]
+        for tanda, (_, partidas, resumenes) in zip(tandas, referencia):
+            _, con_cache, resumenes_cache = jugar_tanda(
+                tanda, grabar=True, cache_decisiones=capacidad, resumenes=True
+            )
+            if con_cache != partidas or resumenes_cache != resumenes:
+                raise ValueError(
+                    f"Con cache de {capacidad} la tanda {tanda[1]} no se jugó igual"
+                )
+        # cada fallo guarda una clave nueva: las que ya no están se desalojaron
+        informe[capacidad] = {
+            bot: (cache.tasa_aciertos(), cache.fallos - len(cache.jugadas))
+            for (bot, de_capacidad), cache in _caches.items()
+            if de_capacidad == capacidad
+        }
+    chica = min(capacidades)
+    if not any(desalojos for _, desalojos in informe[chica].values()):
+        raise ValueError(
+            f"La cache de {chica} no desalojó nada: hacen falta más partidas"
+        )
+    return informe
+
+
+def _en_orden(jugar, tandas, procesos):
+    """
+    Resultados de las tandas en orden, a medida que están. Con pool deja
+    unas pocas tandas corriendo por proceso y no manda más de las que se
+    van a leer, así cortar antes no deja trabajo encolado.
+    """
+    if procesos == 1:
+        yield from map(jugar, tandas)
+        return
+    procesos = procesos or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        pendientes = []
+        tandas = iter(tandas)
+        try:
+            while True:
+                while len(pendientes) < 2 * procesos:
+                    tanda = next(tandas, None)
+                    if tanda is None:
+                        break
+                    pendientes.append(pool.submit(jugar, tanda))
+                if not pendientes:
+                    return
+                yield pendientes.pop(0).result()
+        finally:
+            for pendiente in pendientes:
+                pendiente.cancel()
+
+
+# --- Elo y prueba secuencial ---
+
+
+def elo_de(proporcion):
+    """
+    Diferencia de Elo que corresponde a ganar esa proporción de los duelos
+    """
+    proporcion = min(max(proporcion, 1e-9), 1 - 1e-9)
+    return -400 * math.log10(1 / proporcion - 1)
+
+
+def proporcion_de(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def tabla_elo(duelos, iteraciones=200):
+    """
+    Elo de cada bot a partir de los duelos (Bradley-Terry por el método
+    MM), con promedio 0. Cada par que se cruzó suma media victoria virtual
+    de cada lado, así un bot que nunca ganó no queda en menos infinito.
+    """
+    bots = sorted({bot for par in duelos for bot in par})
+    cruces = {}  # (a, b) -> victorias de a sobre b, con las virtuales
+    for a in bots:
+        for b in bots:
+            if a != b and (duelos[a, b] or duelos[b, a]):
+                cruces[a, b] = duelos[a, b] + 0.5
+    fuerza = dict.fromkeys(bots, 1.0)
+    for _ in range(iteraciones):
+        nueva = {}
+        for a in bots:
+            ganadas = 0.0
+            denominador = 0.0
+            for b in bots:
+                if (a, b) in cruces:
+                    ganadas += cruces[a, b]
+                    denominador += (cruces[a, b] + cruces[b, a]) / (
+                        fuerza[a] + fuerza[b]
+                    )
+            nueva[a] = ganadas / denominador if denominador else 1.0
+        # promedio geométrico 1 (Elo promedio 0)
+        escala = math.exp(sum(math.log(f) for f in nueva.values()) / len(nueva))
+        fuerza = {bot: f / escala for bot, f in nueva.items()}
+    return {bot: 400 * math.log10(f) for bot, f in fuerza.items()}
+
+
+def llr_sprt(ganadas, perdidas, elo0, elo1):
+    """
+    Log del cociente de verosimilitud de H1 (la diferencia es elo1) contra
+    H0 (es elo0), contando cada partida decidida como una tirada de moneda
+    """
+    p0 = proporcion_de(elo0)
+    p1 = proporcion_de(elo1)
+    return ganadas * math.log(p1 / p0) + perdidas * math.log((1 - p1) / (1 - p0))
+
+
+def intervalo_wilson(ganadas, total, confianza=0.95):
+    """
+    Intervalo de confianza de una proporción (Wilson)
+    """
+    if not total:
+        return 0.0, 1.0
+    z = _cuantil_normal(1 - (1 - confianza) / 2)
+    p = ganadas / total
+    centro = (p + z * z / (2 * total)) / (1 + z * z / total)
+    radio = (
+        z
+        * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+        / (1 + z * z / total)
+    )
+    return centro - radio, centro + radio
+
+
+def _cuantil_normal(p):
+    # bisección sobre la normal acumulada, no hace falta más precisión
+    bajo, alto = -10.0, 10.0
+    for _ in range(100):
+        medio = (bajo + alto) / 2
+        if (1 + math.erf(medio / math.sqrt(2))) / 2 < p:
+            bajo = medio
+        else:
+            alto = medio
+    return (bajo + alto) / 2
+
+
+# resultado de una prueba secuencial. decision es "H1" (el candidato está
+# elo1 arriba), "H0" (no llega: está en elo0 o peor) o None si se terminaron
+# las partidas sin decidir
+ResultadoSecuencial = namedtuple(
+    "ResultadoSecuencial",
+    [
+        "candidato",
+        "base",
+        "decision",
+        "partidas",
+        "ganadas",
+        "perdidas",
+        "llr",
+        "limites",
+        "elo",
+        "intervalo_elo",
+        "estadisticas",
+    ],
+)
+
+
+def torneo_secuencial(
+    candidato,
+    base,
+    alineacion=None,
+    elo0=0.0,
+    elo1=20.0,
+    alfa=0.05,
+    beta=0.05,
+    max_partidas=1_000_000,
+    semilla=0,
+    procesos=None,
+    tam_tanda=100,
+):
+    """
+    Candidato contra base hasta que la diferencia quede decidida (SPRT):
+    H0 es que el candidato está elo0 arriba de la base y H1 que está elo1,
+    con errores alfa y beta. Se juega en tandas que rotan los asientos y
+    la prueba se mira después de cada vuelta completa de permutaciones,
+    así la ventaja de arrancar primero se cancela.
+    Una partida decidida cuenta como ganada si ganó un asiento del candidato.
+    """
+    if alineacion is None:
+        alineacion = (candidato, base) * 2
+    alineacion = tuple(alineacion)
+    if set(alineacion) != {candidato, base} or alineacion.count(
+        candidato
+    ) != alineacion.count(base):
+        raise ValueError(
+            "La alineación tiene que tener la misma cantidad de asientos "
+            "del candidato y de la base"
+        )
+
+    vuelta = len(permutaciones_distintas(alineacion))
+    tandas = armar_tandas(max_partidas, alineacion, tam_tanda, semilla)
+    inferior = math.log(beta / (1 - alfa))
+    superior = math.log((1 - beta) / alfa)
+
+    total = EstadisticasTorneo()
+    decision = None
+    llr = 0.0
+    for i, (estadisticas, _, _) in enumerate(_en_orden(jugar_tanda, tandas, procesos)):
+        total.combinar(estadisticas)
+        if (i + 1) % vuelta:
+            continue
+        llr = llr_sprt(total.victorias[candidato], total.victorias[base], elo0, elo1)
+        if llr >= superior:
+            decision = "H1"
+            break
+        if llr <= inferior:
+            decision = "H0"
+            break
+
+    ganadas = total.victorias[candidato]
+    perdidas = total.victorias[base]
+    if decision is None:
+        # si max_partidas cortó a mitad de una vuelta, que el LLR cuente
+        # las mismas partidas que el resto del resultado
+        llr = llr_sprt(ganadas, perdidas, elo0, elo1)
+    decididas = ganadas + perdidas
+    bajo, alto = intervalo_wilson(ganadas, decididas, 1 - alfa)
+    return ResultadoSecuencial(
+        candidato,
+        base,
+        decision,
+        total.partidas,
+        ganadas,
+        perdidas,
+        llr,
+        (inferior, superior),
+        elo_de(ganadas / decididas) if decididas else 0.0,
+        (elo_de(bajo), elo_de(alto)),
+        total,
+    )
+
+
+def resumen_secuencial(resultado, elo0, elo1):
+    r = resultado
+    if r.decision == "H1":
+        conclusion = f"{r.candidato} está al menos {elo1:+.0f} Elo arriba de {r.base}"
+    elif r.decision == "H0":
+        conclusion = f"{r.candidato} no llega a {elo1:+.0f} Elo sobre {r.base} (H0)"
+    else:
+        conclusion = "sin decidir, se terminaron las partidas"
+    return "\n".join(
+        [
+            f"SPRT {r.candidato} contra {r.base} (H0: {elo0:+.0f}, H1: {elo1:+.0f})",
+            f"Partidas: {r.partidas} ({r.ganadas} ganó {r.candidato}, "
+            f"{r.perdidas} {r.base}, {r.estadisticas.sin_ganador} sin ganador)",
+            f"LLR: {r.llr:.2f} (límites {r.limites[0]:.2f}, {r.limites[1]:.2f})",
+            f"Elo de {r.candidato}: {r.elo:+.1f} "
+            f"[{r.intervalo_elo[0]:+.1f}, {r.intervalo_elo[1]:+.1f}]",
+            f"Resultado: {conclusion}",
+        ]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Torneo de bots de ADNA")
+    parser.add_argument("partidas", type=int, help="con --sprt, el máximo")
+    parser.add_argument(
+        "--alineacion", help="bots por asiento (BDBD, o candidato y base con --sprt)"
+    )
+    parser.add_argument("--semilla", default="0")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument(
+        "--tanda", type=int, help="partidas por tanda (500, 100 con --sprt)"
+    )
+    parser.add_argument("--registro", default=None, help="archivo para grabar")
+    parser.add_argument(
+        "--resultados",
+        help="base SQLite donde guardar cada partida; si se corta, se retoma",
+    )
+    parser.add_argument(
+        "--instrumentar", help="guarda las mediciones por turno en este JSON"
+    )
+    parser.add_argument(
+        "--cache-decisiones",
+        type=int,
+        metavar="N",
+        help="B y D recuerdan hasta N jugadas por proceso (LRU)",
+    )
+    parser.add_argument(
+        "--sprt",
+        nargs=2,
+        metavar=("CANDIDATO", "BASE"),
+        help="prueba secuencial: juega hasta que la diferencia quede decidida",
+    )
+    parser.add_argument(
+        "--verificar-cache",
+        action="store_true",
+        help="juega las partidas con y sin cache de jugadas y verifica que sean iguales",
+    )
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=20.0)
+    parser.add_argument("--alfa", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if REGLAMENTO.huella() != Reglamento().huella():
+        # una variante (ADNA_REGLAMENTO): que quede claro con cuál se jugó
+        print(f"Reglamento: {REGLAMENTO.clave()}")
+    if args.verificar_cache:
+        informe = verificar_cache(
+            args.partidas,
+            alineacion=tuple(args.alineacion or "BDBD"),
+            semilla=args.semilla,
+            tam_tanda=args.tanda or 500,
+        )
+        print(f"Con y sin cache: las mismas {args.partidas} partidas, turno por turno")
+        for capacidad, bots in informe.items():
+            for bot, (tasa, desalojos) in sorted(bots.items()):
+                print(
+                    f"  Capacidad {capacidad}, bot {bot}: {tasa:.1%} aciertos, "
+                    f"{desalojos} desalojos"
+                )
+    elif args.sprt:
+        candidato, base = args.sprt
+        resultado = torneo_secuencial(
+            candidato,
+            base,
+            alineacion=args.alineacion,
+            elo0=args.elo0,
+            elo1=args.elo1,
+            alfa=args.alfa,
+            beta=args.beta,
+            max_partidas=args.partidas,
+            semilla=args.semilla,
+            procesos=args.procesos,
+            tam_tanda=args.tanda or 100,
+        )
+        print(resumen_secuencial(resultado, args.elo0, args.elo1))
+    else:
+        estadisticas = torneo(
+            args.partidas,
+            alineacion=tuple(args.alineacion or "BDBD"),
+            semilla=args.semilla,
+            procesos=args.procesos,
+            tam_tanda=args.tanda or 500,
+            registro=args.registro,
+            instrumentar=args.instrumentar is not None,
+            cache_decisiones=args.cache_decisiones,
+            resultados=args.resultados,
+        )
+        print(estadisticas.resumen())
+        if args.instrumentar:
+            with open(args.instrumentar, "w") as archivo:
+                json.dump(estadisticas.instrumentacion.como_dict(), archivo, indent=2)